@@ -1,10 +1,19 @@
 import os
+import click
 from flask import Flask
 from flask_login import LoginManager
 from flask_migrate import Migrate
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from config import config
 from models import db
-from routes import task_bp, issue_bp, workflow_bp, analytics_bp, main_bp, auth_bp
+from models.search_index import include_in_migrations
+from services.analytics_cache import analytics_cache
+from services.conflict_index import conflict_index
+from services.similar_issue_index import similar_issue_index
+from services.task_events import task_events
+from services.analytics_snapshot import analytics_snapshot
+from routes import task_bp, issue_bp, workflow_bp, analytics_bp, main_bp, auth_bp, dashboard_bp, export_bp, calendar_bp, search_bp
 from init_default_workflows import init_default_workflows
 
 login_manager = LoginManager()
@@ -27,8 +36,15 @@ def create_app(config_name=None):
 
     # 初始化扩展
     db.init_app(app)
+    configure_sqlite(app)
     login_manager.init_app(app)
-    migrate = Migrate(app, db)
+    analytics_cache.init_app(app)
+    conflict_index.init_app(app)
+    similar_issue_index.init_app(app)
+    task_events.init_app(app)
+    analytics_snapshot.init_app(app)
+    # 全文检索虚拟表不在ORM元数据中，自动生成迁移时忽略
+    migrate = Migrate(app, db, include_name=include_in_migrations)
 
     # 注册蓝图
     app.register_blueprint(auth_bp)
@@ -37,10 +53,82 @@ def create_app(config_name=None):
     app.register_blueprint(issue_bp)
     app.register_blueprint(workflow_bp)
     app.register_blueprint(analytics_bp)
+    app.register_blueprint(dashboard_bp)
+    app.register_blueprint(export_bp)
+    app.register_blueprint(calendar_bp)
+    app.register_blueprint(search_bp)
+
+    # 注册命令行命令
+    register_commands(app)
 
     return app
 
 
+def configure_sqlite(app):
+    """为基于文件的SQLite主库的每个新连接设置日志模式（SQLITE_JOURNAL_MODE）"""
+    journal_mode = app.config.get('SQLITE_JOURNAL_MODE')
+    url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    if not journal_mode or url.get_backend_name() != 'sqlite' or not url.database or url.database == ':memory:':
+        return
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'connect')
+    def set_journal_mode(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f'PRAGMA journal_mode={journal_mode}')
+        cursor.close()
+
+
+def register_commands(app):
+    """注册Flask命令行命令"""
+
+    @app.cli.command('promote-overdue-tasks')
+    def promote_overdue_tasks_command():
+        """将已过期的pending任务批量更新为in_progress（可由定时任务调用）"""
+        from services import TaskService
+        count = TaskService.promote_overdue_tasks()
+        print(f"已更新 {count} 个过期任务的状态")
+
+    @app.cli.command('rebuild-task-rollup')
+    @click.option('--chunk-size', default=1000, show_default=True, help='每批读取的任务数')
+    def rebuild_task_rollup_command(chunk_size):
+        """根据现有任务重建每日完成汇总表"""
+        from services import RollupService
+        count = RollupService.rebuild(chunk_size=chunk_size)
+        print(f"每日完成汇总已重建，共 {count} 行")
+
+    @app.cli.command('prune-task-tombstones')
+    def prune_task_tombstones_command():
+        """删除超过保留期的任务删除记录（可由定时任务调用）"""
+        from services import TaskService
+        count = TaskService.prune_tombstones()
+        print(f"已删除 {count} 条过期的任务删除记录")
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index_command():
+        """根据现有任务、问题和复盘评论重建全文检索索引"""
+        from services import SearchService
+        count = SearchService.rebuild()
+        print(f"全文检索索引已重建，共 {count} 条")
+
+    @app.cli.command('refresh-analytics-snapshot')
+    def refresh_analytics_snapshot_command():
+        """立即刷新分析只读快照（也可由定时任务调用）"""
+        if not analytics_snapshot.enabled:
+            print("分析快照未启用")
+            return
+        analytics_snapshot.refresh()
+        print(f"分析快照已刷新：{analytics_snapshot.path}")
+
+    @app.cli.command('rebuild-issue-signatures')
+    def rebuild_issue_signatures_command():
+        """根据现有问题重建相似问题推荐使用的MinHash签名"""
+        from services import IssueService
+        count = IssueService.rebuild_signatures()
+        print(f"问题签名已重建，共 {count} 条")
+
+
 if __name__ == '__main__':
     app = create_app()
 
@@ -14,6 +14,9 @@ class Config:
         return 'sqlite:///' + os.path.join(base_dir, 'instance', 'work_calendar.db')
     
     SQLALCHEMY_DATABASE_URI = get_database_uri()
+    # 主库的日志模式，为空时不修改数据库文件当前的模式。WAL模式下读事务（包括分析快照的备份）
+    # 不阻塞写入；数据库文件位于不支持WAL的网络文件系统时设置为DELETE
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE')
     
     # 应用配置
     DEBUG = True
@@ -74,7 +77,28 @@ class Config:
     # 任务状态配置
     VALID_TASK_STATUSES = ['pending', 'in_progress', 'completed']
     VALID_PRIORITIES = ['low', 'medium', 'high']
+    PRIORITY_WEIGHTS = {'low': 1, 'medium': 2, 'high': 3}  # 工作负荷统计中的优先级权重
     VALID_ISSUE_STATUSES = ['open', 'resolved']
+    
+    # 任务增量同步配置
+    TASK_TOMBSTONE_RETENTION_DAYS = 30  # 任务删除记录保留天数，更早的同步令牌需要全量刷新
+    # 任务变更推送（SSE）：订阅保存在进程内存中，每个连接长期占用一个工作线程，
+    # 只适合单进程的多线程部署（或gevent等异步工作进程）；多进程同步WSGI部署请保持关闭
+    TASK_EVENT_STREAM_ENABLED = os.environ.get('TASK_EVENT_STREAM_ENABLED', 'false').lower() == 'true'
+    TASK_EVENT_HEARTBEAT = 15  # 任务变更推送连接空闲时的心跳间隔（秒）
+    
+    # 相似问题推荐配置
+    ISSUE_SIMILARITY_THRESHOLD = 0.5  # 推荐的最低估计相似度（标题和描述字符shingle的Jaccard相似度）
+    ISSUE_SIMILARITY_LIMIT = 5  # 最多推荐的问题数
+    
+    # 分析结果缓存配置
+    ANALYTICS_CACHE_SIZE = 512  # 最多缓存的结果数
+    ANALYTICS_CACHE_TTL = 300  # 缓存过期时间（秒）
+    
+    # 分析只读快照配置：分析查询读取定期刷新的主库副本
+    ANALYTICS_SNAPSHOT_ENABLED = os.environ.get('ANALYTICS_SNAPSHOT_ENABLED', 'false').lower() == 'true'
+    ANALYTICS_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'analytics_snapshot.db')
+    ANALYTICS_SNAPSHOT_INTERVAL = 60  # 快照刷新间隔（秒），多个WSGI进程中只有一个进程刷新
 
 class DevelopmentConfig(Config):
     """开发环境配置"""
@@ -84,6 +108,8 @@ class ProductionConfig(Config):
     """生产环境配置"""
     DEBUG = False
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'production-secret-key'
+    # 生产环境多个WSGI进程并发写入，默认使用WAL模式
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
 
 class TestingConfig(Config):
     """测试环境配置"""
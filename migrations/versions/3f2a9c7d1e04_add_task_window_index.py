@@ -0,0 +1,26 @@
+"""Add composite index for calendar date-window queries
+
+Revision ID: 3f2a9c7d1e04
+Revises: cf5ffa9d50a9
+Create Date: 2026-10-17 09:12:41.118203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2a9c7d1e04'
+down_revision = 'cf5ffa9d50a9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.create_index('ix_tasks_user_start_deadline', ['user_id', 'start_date', 'deadline'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_tasks_user_start_deadline')
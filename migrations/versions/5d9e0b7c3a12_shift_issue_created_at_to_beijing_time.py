@@ -0,0 +1,33 @@
+"""Shift issues.created_at written with the old UTC default to Beijing time
+
+Revision ID: 5d9e0b7c3a12
+Revises: a1e6c3f08d94
+Create Date: 2026-10-17 21:42:37.905116
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5d9e0b7c3a12'
+down_revision = 'a1e6c3f08d94'
+branch_labels = None
+depends_on = None
+
+
+# Issue.created_at的默认值由UTC改为北京时间（与resolved_at和任务的时间一致），
+# 已有的行都是按UTC写入的，统一加8小时。datetime()会丢掉小数秒，再把原值第20位起的小数部分拼回去。
+# 部署时需先执行升级再重新加载应用，否则重新加载后新写入的北京时间也会被加8小时。
+SHIFT_SQL = '''
+UPDATE issues
+SET created_at = datetime(created_at, '{offset}') || substr(created_at, 20)
+WHERE created_at IS NOT NULL
+'''
+
+
+def upgrade():
+    op.execute(SHIFT_SQL.format(offset='+8 hours'))
+
+
+def downgrade():
+    op.execute(SHIFT_SQL.format(offset='-8 hours'))
@@ -0,0 +1,37 @@
+"""Add issue_signatures table for similar-issue suggestions
+
+Revision ID: 6c1d9a4e2b78
+Revises: b93e27c4d8f5
+Create Date: 2026-10-17 19:48:26.530917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6c1d9a4e2b78'
+down_revision = 'b93e27c4d8f5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 升级后执行 flask rebuild-issue-signatures 为已有问题计算签名
+    op.create_table('issue_signatures',
+    sa.Column('issue_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('signature', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['issue_id'], ['issues.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('issue_id')
+    )
+    with op.batch_alter_table('issue_signatures', schema=None) as batch_op:
+        batch_op.create_index('ix_issue_signatures_user', ['user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('issue_signatures', schema=None) as batch_op:
+        batch_op.drop_index('ix_issue_signatures_user')
+
+    op.drop_table('issue_signatures')
@@ -0,0 +1,38 @@
+"""Add task_daily_rollup table
+
+Revision ID: 8b41d0e6c2a7
+Revises: 3f2a9c7d1e04
+Create Date: 2026-10-17 10:03:18.540317
+
+升级后执行 `flask rebuild-task-rollup` 以根据已有任务回填汇总数据。
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b41d0e6c2a7'
+down_revision = '3f2a9c7d1e04'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('task_daily_rollup',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('task_type', sa.String(length=50), nullable=False),
+    sa.Column('completed_count', sa.Integer(), nullable=False),
+    sa.Column('total_elapsed_days', sa.Integer(), nullable=False),
+    sa.Column('elapsed_count', sa.Integer(), nullable=False),
+    sa.Column('deleted_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'day', 'task_type', name='uq_task_daily_rollup_user_day_type')
+    )
+
+
+def downgrade():
+    op.drop_table('task_daily_rollup')
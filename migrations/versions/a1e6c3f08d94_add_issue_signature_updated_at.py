@@ -0,0 +1,30 @@
+"""Add issue_signatures.updated_at so other processes can detect stale similar-issue indexes
+
+Revision ID: a1e6c3f08d94
+Revises: 6c1d9a4e2b78
+Create Date: 2026-10-17 21:05:12.418350
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1e6c3f08d94'
+down_revision = '6c1d9a4e2b78'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('issue_signatures', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+        batch_op.drop_index('ix_issue_signatures_user')
+        batch_op.create_index('ix_issue_signatures_user_updated', ['user_id', 'updated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('issue_signatures', schema=None) as batch_op:
+        batch_op.drop_index('ix_issue_signatures_user_updated')
+        batch_op.create_index('ix_issue_signatures_user', ['user_id'], unique=False)
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,26 @@
+"""Add (user_id, status, created_at) index to issues
+
+Revision ID: a7d3e58c0f21
+Revises: e29b4f6a7d13
+Create Date: 2026-10-17 15:42:18.306117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3e58c0f21'
+down_revision = 'e29b4f6a7d13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('issues', schema=None) as batch_op:
+        batch_op.create_index('ix_issues_user_status_created', ['user_id', 'status', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('issues', schema=None) as batch_op:
+        batch_op.drop_index('ix_issues_user_status_created')
@@ -0,0 +1,34 @@
+"""Add FTS5 full-text search index over tasks, issues and review comments
+
+Revision ID: b93e27c4d8f5
+Revises: f61c0a9b3d52
+Create Date: 2026-10-17 19:05:41.218604
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b93e27c4d8f5'
+down_revision = 'f61c0a9b3d52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 虚拟表结构与models/search_index.py保持一致；升级后执行 flask rebuild-search-index 为已有数据建立索引
+    op.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+            task_id UNINDEXED,
+            title UNINDEXED,
+            body UNINDEXED,
+            owner,
+            title_tokens,
+            body_tokens,
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    """)
+
+
+def downgrade():
+    op.execute('DROP TABLE IF EXISTS search_index')
@@ -0,0 +1,26 @@
+"""Add (task_id, operation_time) index to task_progress_history
+
+Revision ID: c5e7a1f93b60
+Revises: 8b41d0e6c2a7
+Create Date: 2026-10-17 11:20:05.772941
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e7a1f93b60'
+down_revision = '8b41d0e6c2a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('task_progress_history', schema=None) as batch_op:
+        batch_op.create_index('ix_task_progress_history_task_time', ['task_id', 'operation_time'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('task_progress_history', schema=None) as batch_op:
+        batch_op.drop_index('ix_task_progress_history_task_time')
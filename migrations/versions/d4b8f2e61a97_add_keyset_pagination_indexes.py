@@ -0,0 +1,38 @@
+"""Add indexes for keyset pagination of tasks, issues and review comments
+
+Revision ID: d4b8f2e61a97
+Revises: a7d3e58c0f21
+Create Date: 2026-10-17 17:05:41.918230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4b8f2e61a97'
+down_revision = 'a7d3e58c0f21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.create_index('ix_tasks_user_created', ['user_id', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('issues', schema=None) as batch_op:
+        batch_op.create_index('ix_issues_user_created', ['user_id', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('task_review_comment', schema=None) as batch_op:
+        batch_op.create_index('ix_task_review_comment_task_created', ['task_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('task_review_comment', schema=None) as batch_op:
+        batch_op.drop_index('ix_task_review_comment_task_created')
+
+    with op.batch_alter_table('issues', schema=None) as batch_op:
+        batch_op.drop_index('ix_issues_user_created')
+
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_tasks_user_created')
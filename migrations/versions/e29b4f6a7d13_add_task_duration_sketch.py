@@ -0,0 +1,35 @@
+"""Add task_duration_sketch table
+
+Revision ID: e29b4f6a7d13
+Revises: c5e7a1f93b60
+Create Date: 2026-10-17 12:41:37.208114
+
+升级后执行 `flask rebuild-task-rollup` 以根据已有任务生成草图。
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e29b4f6a7d13'
+down_revision = 'c5e7a1f93b60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('task_duration_sketch',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('task_type', sa.String(length=50), nullable=False),
+    sa.Column('sketch', sa.Text(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'task_type', name='uq_task_duration_sketch_user_type')
+    )
+
+
+def downgrade():
+    op.drop_table('task_duration_sketch')
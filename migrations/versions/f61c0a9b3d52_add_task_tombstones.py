@@ -0,0 +1,42 @@
+"""Add task_tombstones table and (user_id, updated_at) index to tasks
+
+Revision ID: f61c0a9b3d52
+Revises: d4b8f2e61a97
+Create Date: 2026-10-17 18:12:09.447125
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f61c0a9b3d52'
+down_revision = 'd4b8f2e61a97'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('task_tombstones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('task_tombstones', schema=None) as batch_op:
+        batch_op.create_index('ix_task_tombstones_user_deleted', ['user_id', 'deleted_at'], unique=False)
+
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.create_index('ix_tasks_user_updated', ['user_id', 'updated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_tasks_user_updated')
+
+    with op.batch_alter_table('task_tombstones', schema=None) as batch_op:
+        batch_op.drop_index('ix_task_tombstones_user_deleted')
+
+    op.drop_table('task_tombstones')
@@ -9,5 +9,10 @@ from .workflow import Workflow
 from .task_progress_history import TaskProgressHistory
 from .task_review_comment import TaskReviewComment
 from .user import User
+from .task_daily_rollup import TaskDailyRollup
+from .task_duration_sketch import TaskDurationSketch
+from .task_tombstone import TaskTombstone
+from .issue_signature import IssueSignature
+from . import search_index  # 注册全文检索虚拟表的建表和删表事件
 
-__all__ = ['db', 'Task', 'Issue', 'Workflow', 'TaskProgressHistory', 'TaskReviewComment', 'User']
\ No newline at end of file
+__all__ = ['db', 'Task', 'Issue', 'Workflow', 'TaskProgressHistory', 'TaskReviewComment', 'User', 'TaskDailyRollup', 'TaskDurationSketch', 'TaskTombstone', 'IssueSignature']
\ No newline at end of file
@@ -1,16 +1,22 @@
-from datetime import datetime
 from . import db
+from .task import beijing_now
 
 class Issue(db.Model):
     """问题模型"""
     __tablename__ = 'issues'
+    __table_args__ = (
+        # 问题分析按用户、状态和创建时间过滤与分组时使用
+        db.Index('ix_issues_user_status_created', 'user_id', 'status', 'created_at'),
+        # 问题列表按 (created_at, id) 键集分页时使用
+        db.Index('ix_issues_user_created', 'user_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
     priority = db.Column(db.String(20), default='medium')  # low, medium, high
     status = db.Column(db.String(20), default='open')  # open, resolved
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=beijing_now)  # 与resolved_at一致使用北京时间
     resolved_at = db.Column(db.DateTime)
     solutions = db.Column(db.Text)  # 解决方案列表，JSON格式存储
     successful_solution = db.Column(db.Text)  # 成功的解决方案
@@ -0,0 +1,18 @@
+from . import db
+from .task import beijing_now
+
+class IssueSignature(db.Model):
+    """问题文本的MinHash签名，相似问题索引启动时直接加载，无需重新计算"""
+    __tablename__ = 'issue_signatures'
+    __table_args__ = (
+        # 相似问题索引按用户加载签名，并按用户读取签名数和最后更新时间判断内存索引是否过期
+        db.Index('ix_issue_signatures_user_updated', 'user_id', 'updated_at'),
+    )
+    
+    issue_id = db.Column(db.Integer, db.ForeignKey('issues.id'), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    signature = db.Column(db.LargeBinary, nullable=False)  # uint32数组的字节序列
+    updated_at = db.Column(db.DateTime, default=beijing_now, onupdate=beijing_now)
+    
+    def __repr__(self):
+        return f'<IssueSignature {self.issue_id}>'
@@ -0,0 +1,29 @@
+from sqlalchemy import DDL, event
+from . import db
+
+# 全文检索虚拟表名，FTS5还会创建以该名称为前缀的影子表
+SEARCH_INDEX_TABLE = 'search_index'
+
+# 全文检索索引（SQLite FTS5虚拟表）
+# rowid由结果类型和原记录ID编码而成；task_id/title/body只存储不索引，用于返回结果和生成摘要；
+# owner存放用户令牌，title_tokens/body_tokens存放中文二元分词后的文本，三者参与检索。
+# 虚拟表不属于ORM元数据，通过元数据的创建/删除事件随db.create_all和db.drop_all一起维护。
+SEARCH_INDEX_DDL = f'''
+CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_INDEX_TABLE} USING fts5(
+    task_id UNINDEXED,
+    title UNINDEXED,
+    body UNINDEXED,
+    owner,
+    title_tokens,
+    body_tokens,
+    tokenize = 'unicode61 remove_diacritics 2'
+)
+'''
+
+event.listen(db.metadata, 'after_create', DDL(SEARCH_INDEX_DDL).execute_if(dialect='sqlite'))
+event.listen(db.metadata, 'before_drop', DDL(f'DROP TABLE IF EXISTS {SEARCH_INDEX_TABLE}').execute_if(dialect='sqlite'))
+
+
+def include_in_migrations(name, type_, parent_names) -> bool:
+    """自动生成迁移时忽略全文检索虚拟表及其影子表"""
+    return not (type_ == 'table' and name and name.startswith(SEARCH_INDEX_TABLE))
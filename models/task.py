@@ -8,6 +8,14 @@ def beijing_now():
 class Task(db.Model):
     """任务模型"""
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # 日历按时间窗口查询任务时使用
+        db.Index('ix_tasks_user_start_deadline', 'user_id', 'start_date', 'deadline'),
+        # 任务列表按 (created_at, id) 键集分页时使用
+        db.Index('ix_tasks_user_created', 'user_id', 'created_at', 'id'),
+        # 增量同步按用户和更新时间范围读取
+        db.Index('ix_tasks_user_updated', 'user_id', 'updated_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -59,11 +67,8 @@ class Task(db.Model):
         today = date.today()
         
         # 如果有截止日期且已过期，状态为"in_progress"（进行中）
+        # 只读计算，持久化由 TaskService.promote_overdue_tasks 批量完成
         if self.deadline and self.deadline < today:
-            # 如果状态是pending，自动更新为in_progress
-            if self.status == 'pending':
-                self.status = 'in_progress'
-                db.session.commit()
             return 'in_progress'
         
         # 如果开始日期小于或等于当前日期，状态为"进行中"
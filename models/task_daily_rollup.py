@@ -0,0 +1,32 @@
+from . import db
+
+class TaskDailyRollup(db.Model):
+    """任务每日完成汇总模型（按用户、日期、任务类型预聚合）"""
+    __tablename__ = 'task_daily_rollup'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'day', 'task_type', name='uq_task_daily_rollup_user_day_type'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    day = db.Column(db.Date, nullable=False)  # 完成日期（删除记录为删除日期）
+    task_type = db.Column(db.String(50), nullable=False)
+    completed_count = db.Column(db.Integer, nullable=False, default=0)  # 当日完成的任务数
+    total_elapsed_days = db.Column(db.Integer, nullable=False, default=0)  # 完成耗时天数之和
+    elapsed_count = db.Column(db.Integer, nullable=False, default=0)  # 参与耗时统计的任务数
+    deleted_count = db.Column(db.Integer, nullable=False, default=0)  # 当日删除的任务数
+    
+    def to_dict(self):
+        """转换为字典格式"""
+        return {
+            'user_id': self.user_id,
+            'day': self.day.isoformat() if self.day else None,
+            'task_type': self.task_type,
+            'completed_count': self.completed_count,
+            'total_elapsed_days': self.total_elapsed_days,
+            'elapsed_count': self.elapsed_count,
+            'deleted_count': self.deleted_count
+        }
+    
+    def __repr__(self):
+        return f'<TaskDailyRollup {self.user_id} {self.day} {self.task_type}>'
@@ -0,0 +1,18 @@
+from . import db
+from models.task import beijing_now
+
+class TaskDurationSketch(db.Model):
+    """任务完成时长分位数草图模型（按用户和任务类型保存）"""
+    __tablename__ = 'task_duration_sketch'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'task_type', name='uq_task_duration_sketch_user_type'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    task_type = db.Column(db.String(50), nullable=False)
+    sketch = db.Column(db.Text, nullable=False)  # KLL草图，JSON格式存储
+    updated_at = db.Column(db.DateTime, default=beijing_now, onupdate=beijing_now)
+    
+    def __repr__(self):
+        return f'<TaskDurationSketch {self.user_id} {self.task_type}>'
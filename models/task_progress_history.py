@@ -4,6 +4,10 @@ from . import db
 class TaskProgressHistory(db.Model):
     """任务进度历史模型"""
     __tablename__ = 'task_progress_history'
+    __table_args__ = (
+        # 按任务顺序读取进展变更记录以及按 (operation_time, id) 分页时使用（SQLite索引隐含主键rowid）
+        db.Index('ix_task_progress_history_task_time', 'task_id', 'operation_time'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     task_id = db.Column(db.Integer, db.ForeignKey('tasks.id'), nullable=False)
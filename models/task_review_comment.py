@@ -4,6 +4,10 @@ from . import db
 class TaskReviewComment(db.Model):
     """任务复盘评论模型"""
     __tablename__ = 'task_review_comment'
+    __table_args__ = (
+        # 按 (created_at, id) 键集分页读取任务评论时使用
+        db.Index('ix_task_review_comment_task_created', 'task_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     task_id = db.Column(db.Integer, db.ForeignKey('tasks.id'), nullable=False)
@@ -0,0 +1,18 @@
+from . import db
+from .task import beijing_now
+
+class TaskTombstone(db.Model):
+    """任务删除记录（墓碑），用于增量同步把删除传播到客户端"""
+    __tablename__ = 'task_tombstones'
+    __table_args__ = (
+        # 增量同步按用户和删除时间范围读取
+        db.Index('ix_task_tombstones_user_deleted', 'user_id', 'deleted_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    task_id = db.Column(db.Integer, nullable=False)  # 已删除任务的ID（任务行已不存在，不设外键）
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=beijing_now)
+    
+    def __repr__(self):
+        return f'<TaskTombstone {self.task_id}>'
@@ -5,5 +5,9 @@ from .workflow_routes import workflow_bp
 from .analytics_routes import analytics_bp
 from .main_routes import main_bp
 from .auth_routes import auth_bp
+from .dashboard_routes import dashboard_bp
+from .export_routes import export_bp
+from .calendar_routes import calendar_bp
+from .search_routes import search_bp
 
-__all__ = ['task_bp', 'issue_bp', 'workflow_bp', 'analytics_bp', 'main_bp', 'auth_bp']
\ No newline at end of file
+__all__ = ['task_bp', 'issue_bp', 'workflow_bp', 'analytics_bp', 'main_bp', 'auth_bp', 'dashboard_bp', 'export_bp', 'calendar_bp', 'search_bp']
\ No newline at end of file
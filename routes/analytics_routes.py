@@ -1,6 +1,11 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
-from services import AnalyticsService
+from datetime import date, timedelta
+from services import AnalyticsService, WorkflowAnalyticsService, ForecastService, IssueAnalyticsService
+from services.analytics_service import SERIES_BUCKETS, SERIES_METRICS
+from services.analytics_cache import analytics_cache
+from services.analytics_snapshot import analytics_snapshot
+from routes.utils import parse_date_arg
 
 analytics_bp = Blueprint('analytics', __name__, url_prefix='/api')
 
@@ -8,10 +13,19 @@ analytics_bp = Blueprint('analytics', __name__, url_prefix='/api')
 @login_required
 def get_analytics():
     """获取分析统计数据"""
+    months = request.args.get('months', 6, type=int)
+    if not 1 <= months <= 36:
+        return jsonify({'error': '月份数必须在1到36之间'}), 400
+    
     try:
         # 添加用户隔离，只获取当前用户的分析数据
-        data = AnalyticsService.get_analytics_data(user_id=current_user.id)
-        return jsonify(data)
+        # 启用分析快照时缓存键包含快照代数，快照刷新后重新计算
+        data = analytics_cache.get_or_compute(
+            current_user.id, 'analytics',
+            lambda: AnalyticsService.get_analytics_data(user_id=current_user.id, months=months),
+            months, analytics_snapshot.generation
+        )
+        return jsonify(analytics_snapshot.annotate(data))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -21,7 +35,153 @@ def get_statistics():
     """获取任务统计信息"""
     try:
         # 添加用户隔离，只获取当前用户的统计数据
-        data = AnalyticsService.get_task_statistics(user_id=current_user.id)
+        data = analytics_cache.get_or_compute(
+            current_user.id, 'statistics',
+            lambda: AnalyticsService.get_task_statistics(user_id=current_user.id),
+            analytics_snapshot.generation
+        )
+        return jsonify(analytics_snapshot.annotate(data))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@analytics_bp.route('/analytics/series')
+@login_required
+def get_series():
+    """获取任意时间范围和粒度的任务时间序列"""
+    try:
+        end = parse_date_arg('to', date.today())
+        start = parse_date_arg('from', end - timedelta(days=29))
+    except ValueError as e:
+        return jsonify({'error': f'日期格式错误: {str(e)}'}), 400
+    
+    bucket = request.args.get('bucket', 'day')
+    metric = request.args.get('metric', 'completed')
+    if bucket not in SERIES_BUCKETS:
+        return jsonify({'error': '无效的时间粒度'}), 400
+    if metric not in SERIES_METRICS:
+        return jsonify({'error': '无效的统计指标'}), 400
+    if start > end:
+        return jsonify({'error': '起始日期必须早于或等于结束日期'}), 400
+    if (end - start).days > 3660:
+        return jsonify({'error': '时间范围不能超过10年'}), 400
+    
+    try:
+        data = analytics_cache.get_or_compute(
+            current_user.id, 'series',
+            lambda: AnalyticsService.get_time_series(current_user.id, start, end, bucket, metric),
+            start, end, bucket, metric, analytics_snapshot.generation
+        )
+        return jsonify(analytics_snapshot.annotate(data))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@analytics_bp.route('/analytics/workflow-steps')
+@login_required
+def get_workflow_step_stats():
+    """获取各工作流步骤的停留时间统计"""
+    try:
+        data = analytics_cache.get_or_compute(
+            current_user.id, 'workflow-steps',
+            lambda: WorkflowAnalyticsService.get_step_dwell_times(user_id=current_user.id)
+        )
+        return jsonify(data)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@analytics_bp.route('/analytics/cumulative-flow')
+@login_required
+def get_cumulative_flow():
+    """获取累积流图和每日吞吐量数据"""
+    try:
+        end = parse_date_arg('to', date.today())
+        start = parse_date_arg('from', end - timedelta(days=29))
+    except ValueError as e:
+        return jsonify({'error': f'日期格式错误: {str(e)}'}), 400
+    
+    if start > end:
+        return jsonify({'error': '起始日期必须早于或等于结束日期'}), 400
+    if (end - start).days > 731:
+        return jsonify({'error': '时间范围不能超过两年'}), 400
+    
+    try:
+        # 缓存键包含当天日期，跨过日期边界后重新计算
+        data = analytics_cache.get_or_compute(
+            current_user.id, 'cumulative-flow',
+            lambda: WorkflowAnalyticsService.get_cumulative_flow(current_user.id, start, end),
+            start, end, date.today()
+        )
+        return jsonify(data)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@analytics_bp.route('/analytics/forecast')
+@login_required
+def get_forecast():
+    """预测未完成任务的完成日期，并标记可能无法按时完成的任务"""
+    simulations = request.args.get('simulations', 2000, type=int)
+    if not 100 <= simulations <= 20000:
+        return jsonify({'error': '模拟次数必须在100到20000之间'}), 400
+    
+    try:
+        # 结果缓存到下一次任务写入（或日期变化）为止
+        data = analytics_cache.get_or_compute(
+            current_user.id, 'forecast',
+            lambda: ForecastService.forecast_backlog(current_user.id, simulations=simulations),
+            simulations, date.today()
+        )
+        return jsonify(data)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@analytics_bp.route('/analytics/workload')
+@login_required
+def get_workload():
+    """获取每天按优先级加权的任务负荷，用于日历热力图"""
+    try:
+        start = parse_date_arg('from', date.today().replace(day=1))
+        end = parse_date_arg('to', start + timedelta(days=41))
+    except ValueError as e:
+        return jsonify({'error': f'日期格式错误: {str(e)}'}), 400
+    
+    if start > end:
+        return jsonify({'error': '起始日期必须早于或等于结束日期'}), 400
+    if (end - start).days > 3660:
+        return jsonify({'error': '时间范围不能超过10年'}), 400
+    include_completed = request.args.get('include_completed', 'false').lower() == 'true'
+    
+    try:
+        data = analytics_cache.get_or_compute(
+            current_user.id, 'workload',
+            lambda: AnalyticsService.get_workload(current_user.id, start, end, include_completed),
+            start, end, include_completed, analytics_snapshot.generation
+        )
+        return jsonify(analytics_snapshot.annotate(data))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@analytics_bp.route('/analytics/issues')
+@login_required
+def get_issue_analytics():
+    """获取问题分析数据：解决耗时、未解决问题账龄和每月解决率"""
+    months = request.args.get('months', 6, type=int)
+    if not 1 <= months <= 36:
+        return jsonify({'error': '月份数必须在1到36之间'}), 400
+    
+    try:
+        # 账龄随日期变化，缓存键包含当天日期
+        data = analytics_cache.get_or_compute(
+            current_user.id, 'issues',
+            lambda: IssueAnalyticsService.get_issue_analytics(user_id=current_user.id, months=months),
+            months, date.today()
+        )
         return jsonify(data)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+@analytics_bp.route('/analytics/cache-stats')
+@login_required
+def get_cache_stats():
+    """获取分析缓存命中统计（仅管理员）"""
+    if not current_user.is_admin:
+        return jsonify({'error': '无权访问'}), 403
+    return jsonify(analytics_cache.stats())
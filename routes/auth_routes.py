@@ -3,6 +3,8 @@ from flask_login import login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 from services.auth_service import AuthService
 from services.workflow_service import WorkflowService
+from services.analytics_service import AnalyticsService
+from services.analytics_snapshot import analytics_snapshot
 from models import User, db
 from functools import wraps
 
@@ -142,6 +144,25 @@ def admin_dashboard():
                           pagination=pagination,
                           search=search)
 
+@auth_bp.route('/admin/analytics')
+@login_required
+@admin_required
+def admin_analytics():
+    """组织分析页面：各用户任务统计和全组织汇总"""
+    data = AnalyticsService.get_org_statistics()
+    return render_template('auth/admin_analytics.html', data=data)
+
+@auth_bp.route('/admin/analytics/data')
+@login_required
+@admin_required
+def admin_analytics_data():
+    """组织分析数据接口"""
+    try:
+        data = AnalyticsService.get_org_statistics()
+        return jsonify(analytics_snapshot.annotate(data))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # 旧版admin_users路由已被移除，使用admin_dashboard替代
 
 @auth_bp.route('/admin/users/create', methods=['GET', 'POST'])
@@ -236,8 +257,7 @@ def delete_user(user_id):
         flash('不能删除当前登录的管理员账号', 'danger')
         return redirect(url_for('auth.admin_dashboard'))
     
-    db.session.delete(user)
-    db.session.commit()
+    AuthService.delete_user(user)
     
     flash(f'用户 {user.username} 已被删除', 'success')
     return redirect(url_for('auth.admin_dashboard'))
\ No newline at end of file
@@ -0,0 +1,42 @@
+from datetime import date, datetime
+from flask import Blueprint, request, jsonify
+from flask_login import login_required, current_user
+from services import CalendarService
+from routes.utils import parse_date_arg
+
+calendar_bp = Blueprint('calendar', __name__, url_prefix='/api/calendar')
+
+@calendar_bp.route('/events')
+@login_required
+def get_events():
+    """获取当前用户与时间窗口重叠的日历事件（FullCalendar事件格式）"""
+    include_completed = request.args.get('include_completed', 'false').lower() == 'true'
+    try:
+        start = parse_date_arg('start')
+        end = parse_date_arg('end')
+    except ValueError as e:
+        return jsonify({'error': f'日期格式错误: {str(e)}'}), 400
+
+    events = CalendarService.get_events(current_user.id, start, end, include_completed=include_completed)
+    return jsonify(events)
+
+@calendar_bp.route('/density')
+@login_required
+def get_density():
+    """获取当前用户某月每天的进行中和已延期任务数，month格式为YYYY-MM，默认为当月"""
+    month = request.args.get('month')
+    try:
+        month_start = datetime.strptime(month, '%Y-%m').date() if month else date.today()
+    except ValueError:
+        return jsonify({'error': '月份格式错误，应为YYYY-MM'}), 400
+
+    return jsonify(CalendarService.get_density(current_user.id, month_start))
+
+@calendar_bp.route('/events/<int:task_id>/description')
+@login_required
+def get_event_description(task_id):
+    """获取日历提示中显示的任务描述"""
+    description = CalendarService.get_event_description(current_user.id, task_id)
+    if description is None:
+        return jsonify({'error': '任务不存在'}), 404
+    return jsonify(description)
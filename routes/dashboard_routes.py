@@ -0,0 +1,25 @@
+from flask import Blueprint, request, jsonify
+from flask_login import login_required, current_user
+from services import DashboardService
+from services.dashboard_service import DASHBOARD_SECTIONS
+
+dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/api/dashboard')
+
+@dashboard_bp.route('')
+@login_required
+def get_dashboard():
+    """一次性获取首页所需数据，可通过sections参数选择数据块"""
+    sections_arg = request.args.get('sections')
+    if sections_arg:
+        sections = [section.strip() for section in sections_arg.split(',') if section.strip()]
+        invalid = [section for section in sections if section not in DASHBOARD_SECTIONS]
+        if invalid:
+            return jsonify({'error': f'无效的数据块: {", ".join(invalid)}'}), 400
+    else:
+        sections = DASHBOARD_SECTIONS
+    
+    try:
+        data = DashboardService.get_dashboard(current_user.id, sections)
+        return jsonify(data)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
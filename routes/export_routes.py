@@ -0,0 +1,31 @@
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from flask_login import login_required, current_user
+from models.task import beijing_now
+from services import ExportService
+from services.export_service import EXPORT_FORMATS, EXPORT_RESOURCES
+
+export_bp = Blueprint('export', __name__, url_prefix='/api/export')
+
+# 导出格式对应的MIME类型
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8'
+}
+
+@export_bp.route('/<resource>')
+@login_required
+def export_resource(resource):
+    """流式导出当前用户的任务、任务历史、复盘评论或问题"""
+    fmt = request.args.get('format', 'csv')
+    if resource not in EXPORT_RESOURCES:
+        return jsonify({'error': '无效的导出数据'}), 404
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': '无效的导出格式'}), 400
+    
+    filename = f'{resource}_{beijing_now().strftime("%Y%m%d_%H%M%S")}.{fmt}'
+    # 生成器在响应发送期间运行，需要保留请求上下文以使用数据库会话
+    return Response(
+        stream_with_context(ExportService.stream(resource, fmt, current_user.id)),
+        mimetype=EXPORT_MIMETYPES[fmt],
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
 from services import IssueService
+from routes.utils import parse_page_args
 
 issue_bp = Blueprint('issue', __name__, url_prefix='/api/issues')
 
@@ -8,10 +9,29 @@ issue_bp = Blueprint('issue', __name__, url_prefix='/api/issues')
 @login_required
 def get_issues():
     """获取所有问题"""
+    # 传入limit或cursor时按创建时间倒序分页返回，否则返回全部问题
+    if 'limit' in request.args or 'cursor' in request.args:
+        try:
+            limit, cursor = parse_page_args()
+            page = IssueService.get_issues_page(user_id=current_user.id, limit=limit, cursor=cursor)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify(page)
+    
     # 添加用户隔离，只获取当前用户的问题
     issues = IssueService.get_all_issues(user_id=current_user.id)
     return jsonify(issues)
 
+@issue_bp.route('/similar')
+@login_required
+def get_similar_issues():
+    """按标题和描述查找当前用户近似重复的问题（提交前提示用）"""
+    title = request.args.get('title', '')
+    description = request.args.get('description', '')
+    if not title.strip() and not description.strip():
+        return jsonify({'error': '标题和描述不能都为空'}), 400
+    return jsonify({'similar_issues': IssueService.find_similar_issues(current_user.id, title, description)})
+
 @issue_bp.route('/<int:issue_id>')
 @login_required
 def get_issue(issue_id):
@@ -37,7 +57,10 @@ def add_issue():
         
         # 创建问题时传递当前用户ID
         issue = IssueService.create_issue(data, user_id=current_user.id)
-        return jsonify({'success': True, 'id': issue.id})
+        # 推荐近似重复的历史问题，优先已有成功解决方案的问题
+        similar = IssueService.find_similar_issues(current_user.id, issue.title, issue.description,
+                                                   exclude_issue_id=issue.id)
+        return jsonify({'success': True, 'id': issue.id, 'similar_issues': similar})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
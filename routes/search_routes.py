@@ -0,0 +1,31 @@
+from flask import Blueprint, request, jsonify
+from flask_login import login_required, current_user
+from services import SearchService
+from services.search_service import SEARCH_KINDS
+
+search_bp = Blueprint('search', __name__, url_prefix='/api/search')
+
+# 每次检索最多返回的结果数
+MAX_SEARCH_RESULTS = 50
+
+@search_bp.route('')
+@login_required
+def search():
+    """全文检索当前用户的任务、问题和复盘评论，type可选task、issue、comment（逗号分隔）"""
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': '检索词不能为空'}), 400
+
+    kinds = [kind for kind in request.args.get('type', '').split(',') if kind]
+    if any(kind not in SEARCH_KINDS for kind in kinds):
+        return jsonify({'error': '无效的检索类型'}), 400
+
+    try:
+        limit = int(request.args.get('limit', 20))
+    except ValueError:
+        return jsonify({'error': '结果数必须是整数'}), 400
+    if not 1 <= limit <= MAX_SEARCH_RESULTS:
+        return jsonify({'error': f'结果数必须在1到{MAX_SEARCH_RESULTS}之间'}), 400
+
+    results = SearchService.search(current_user.id, query, kinds=kinds, limit=limit)
+    return jsonify({'query': query, 'results': results})
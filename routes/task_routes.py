@@ -1,17 +1,48 @@
-from flask import Blueprint, request, jsonify
+from datetime import datetime, date
+from flask import Blueprint, Response, request, jsonify, current_app
 from flask_login import login_required, current_user
 from services import TaskService
+from routes.utils import parse_date_arg, parse_page_args
+from services.task_events import task_events
 
 task_bp = Blueprint('task', __name__, url_prefix='/api/tasks')
 
+def _parse_task_date(value):
+    """解析任务表单中的日期或日期时间字符串，为空时返回None"""
+    if not value:
+        return None
+    if 'T' in value:
+        return datetime.strptime(value, '%Y-%m-%dT%H:%M').date()
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
 @task_bp.route('')
 @login_required
 def get_tasks():
     """获取所有任务"""
     exclude_completed = request.args.get('exclude_completed', 'false').lower() == 'true'
     status = request.args.get('status')
+    
+    # 可选的时间窗口（FullCalendar会传入ISO格式的start/end）
+    try:
+        start = parse_date_arg('start')
+        end = parse_date_arg('end')
+    except ValueError as e:
+        return jsonify({'error': f'日期格式错误: {str(e)}'}), 400
+    
+    # 传入limit或cursor时按创建时间倒序分页返回，否则返回全部任务
+    if 'limit' in request.args or 'cursor' in request.args:
+        try:
+            limit, cursor = parse_page_args()
+            page = TaskService.get_tasks_page(exclude_completed=exclude_completed, status=status,
+                                              user_id=current_user.id, start=start, end=end,
+                                              limit=limit, cursor=cursor)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify(page)
+    
     # 添加用户隔离，只获取当前用户的任务
-    tasks = TaskService.get_all_tasks(exclude_completed=exclude_completed, status=status, user_id=current_user.id)
+    tasks = TaskService.get_all_tasks(exclude_completed=exclude_completed, status=status, user_id=current_user.id,
+                                      start=start, end=end)
     return jsonify(tasks)
 
 @task_bp.route('', methods=['POST'])
@@ -23,37 +54,81 @@ def add_task():
         if not data:
             return jsonify({'success': False, 'error': '无效的请求数据'}), 400
         
+        # 支持两种格式：日期格式和日期时间格式 (YYYY-MM-DDThh:mm)
+        try:
+            start_date = _parse_task_date(data.get('start_date')) or date.today()
+            deadline = _parse_task_date(data.get('deadline'))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': f'日期格式错误: {str(e)}'}), 400
+        
         # 验证起始日期必须早于或等于截止日期
-        if data.get('start_date') and data.get('deadline'):
-            from datetime import datetime
-            
-            # 支持两种格式：日期格式和日期时间格式
-            try:
-                # 尝试解析日期时间格式 (YYYY-MM-DDThh:mm)
-                if 'T' in data['start_date']:
-                    start_date = datetime.strptime(data['start_date'], '%Y-%m-%dT%H:%M')
-                else:
-                    start_date = datetime.strptime(data['start_date'], '%Y-%m-%d')
-                    
-                if 'T' in data['deadline']:
-                    deadline = datetime.strptime(data['deadline'], '%Y-%m-%dT%H:%M')
-                else:
-                    deadline = datetime.strptime(data['deadline'], '%Y-%m-%d')
-            except ValueError as e:
-                return jsonify({'success': False, 'error': f'日期格式错误: {str(e)}'}), 400
-            
-            if start_date > deadline:
-                return jsonify({'success': False, 'error': '起始日期必须早于或等于截止日期'}), 400
+        if deadline and start_date > deadline:
+            return jsonify({'success': False, 'error': '起始日期必须早于或等于截止日期'}), 400
         
         # 添加当前用户ID到任务数据
         if 'user_id' not in data:
             data['user_id'] = current_user.id
+        
+        # 在写入前检查冲突，此时区间树仍然有效
+        conflicts = TaskService.find_conflicts(data['user_id'], start_date, deadline)
             
         task = TaskService.create_task(data)
-        return jsonify({'success': True, 'id': task.id})
+        result = {'success': True, 'id': task.id}
+        if conflicts:
+            result['conflicts'] = conflicts
+            result['warning'] = f'与{len(conflicts)}个高优先级任务时间重叠'
+        return jsonify(result)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@task_bp.route('/changes')
+@login_required
+def get_task_changes():
+    """增量同步：返回自since令牌以来新建、更新和删除的任务"""
+    try:
+        changes = TaskService.get_changes(current_user.id, request.args.get('since') or None)
+    except ValueError:
+        return jsonify({'error': '无效的同步令牌'}), 400
+    return jsonify(changes)
+
+@task_bp.route('/stream')
+@login_required
+def stream_task_events():
+    """
+    SSE推送当前用户的任务创建、更新和删除事件
+
+    事件由本进程内的订阅中心分发，其他进程处理的写入不会推送到这里，且每个连接长期占用一个工作线程，
+    因此需要TASK_EVENT_STREAM_ENABLED显式开启（单进程多线程或异步工作进程部署）。
+    未开启时返回204，按SSE规范浏览器收到204后不再重连，页面只依靠增量同步。
+    """
+    if not current_app.config.get('TASK_EVENT_STREAM_ENABLED'):
+        return '', 204
+    # 生成器在响应期间长时间运行，不访问数据库，也不保留请求上下文
+    return Response(
+        task_events.stream(current_user.id),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@task_bp.route('/conflicts')
+@login_required
+def get_conflicts():
+    """检查日期区间与当前用户的高优先级任务是否重叠（用于修改任务日期前的提示）"""
+    try:
+        start = parse_date_arg('start')
+        end = parse_date_arg('end')
+    except ValueError as e:
+        return jsonify({'error': f'日期格式错误: {str(e)}'}), 400
+    
+    if start is None:
+        return jsonify({'error': '缺少开始日期'}), 400
+    if end is not None and end < start:
+        return jsonify({'error': '起始日期必须早于或等于截止日期'}), 400
+    
+    exclude_id = request.args.get('exclude_id', type=int)
+    conflicts = TaskService.find_conflicts(current_user.id, start, end, exclude_task_id=exclude_id)
+    return jsonify({'conflicts': conflicts})
+
 @task_bp.route('/<int:task_id>')
 def get_task(task_id):
     """获取单个任务详情"""
@@ -96,8 +171,12 @@ def update_task_status(task_id):
 
 @task_bp.route('/<int:task_id>/history')
 def get_task_history(task_id):
-    """获取任务历史"""
-    result = TaskService.get_task_history(task_id)
+    """获取任务历史，未指定limit时返回全部记录"""
+    try:
+        limit, cursor = parse_page_args(None)
+        result = TaskService.get_task_history(task_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     if 'error' in result:
         return jsonify(result), 404
     
@@ -105,8 +184,12 @@ def get_task_history(task_id):
 
 @task_bp.route('/<int:task_id>/comments')
 def get_task_comments(task_id):
-    """获取任务评论"""
-    result = TaskService.get_task_comments(task_id)
+    """获取任务评论，未指定limit时返回全部评论"""
+    try:
+        limit, cursor = parse_page_args(None)
+        result = TaskService.get_task_comments(task_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     if 'error' in result:
         return jsonify(result), 404
     
@@ -0,0 +1,33 @@
+from datetime import date
+from flask import request
+from services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+def parse_date_arg(name, default=None):
+    """解析查询参数中的日期，兼容 YYYY-MM-DD 和完整的ISO日期时间
+
+    Raises:
+        ValueError: 日期格式无效
+    """
+    value = request.args.get(name)
+    if not value:
+        return default
+    return date.fromisoformat(value[:10])
+
+def parse_page_args(default_limit=DEFAULT_PAGE_SIZE):
+    """解析分页参数limit和cursor，limit限制在1到MAX_PAGE_SIZE之间
+
+    default_limit为None且请求未指定limit时返回None，表示不分页
+
+    Raises:
+        ValueError: limit不是整数或超出范围
+    """
+    limit = request.args.get('limit', default_limit)
+    if limit is None:
+        return None, request.args.get('cursor') or None
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise ValueError('每页条数必须是整数')
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f'每页条数必须在1到{MAX_PAGE_SIZE}之间')
+    return limit, request.args.get('cursor') or None
@@ -22,6 +22,20 @@ def run_tests():
         'tests/test_models.py',  # 模型测试
         'tests/test_services.py',  # 服务层测试
         'tests/test_routes.py',  # API路由测试
+        'tests/test_task_service.py',  # 任务服务测试
+        'tests/test_analytics_service.py',  # 分析服务测试
+        'tests/test_workflow_analytics_service.py',  # 工作流步骤分析测试
+        'tests/test_quantile_sketch.py',  # 分位数草图测试
+        'tests/test_forecast_service.py',  # 完成预测测试
+        'tests/test_interval_tree.py',  # 区间树测试
+        'tests/test_issue_analytics_service.py',  # 问题分析测试
+        'tests/test_analytics_snapshot.py',  # 分析快照测试
+        'tests/test_export_service.py',  # 数据导出测试
+        'tests/test_task_events.py',  # 任务变更推送测试
+        'tests/test_calendar_service.py',  # 日历事件测试
+        'tests/test_search_service.py',  # 全文检索测试
+        'tests/test_minhash.py',  # MinHash/LSH测试
+        'tests/test_similar_issues.py',  # 相似问题推荐测试
         # 'tests/test_frontend.py',  # 前端测试（需要安装selenium）
     ]
     
@@ -3,5 +3,13 @@ from .task_service import TaskService
 from .issue_service import IssueService
 from .workflow_service import WorkflowService
 from .analytics_service import AnalyticsService
+from .rollup_service import RollupService
+from .workflow_analytics_service import WorkflowAnalyticsService
+from .dashboard_service import DashboardService
+from .forecast_service import ForecastService
+from .issue_analytics_service import IssueAnalyticsService
+from .export_service import ExportService
+from .calendar_service import CalendarService
+from .search_service import SearchService
 
-__all__ = ['TaskService', 'IssueService', 'WorkflowService', 'AnalyticsService']
\ No newline at end of file
+__all__ = ['TaskService', 'IssueService', 'WorkflowService', 'AnalyticsService', 'RollupService', 'WorkflowAnalyticsService', 'DashboardService', 'ForecastService', 'IssueAnalyticsService', 'ExportService', 'CalendarService', 'SearchService']
\ No newline at end of file
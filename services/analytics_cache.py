@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+class AnalyticsCache:
+    """分析结果缓存
+
+    按 (用户, 接口, 参数) 缓存计算结果，采用LRU淘汰并带有过期时间。
+    每个用户有一个版本号，任务写入时递增版本号，旧版本的缓存条目随即失效。
+    """
+
+    def __init__(self, max_entries: int = 512, ttl: int = 300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._versions: Dict[Optional[int], int] = {}
+        self._global_version = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def init_app(self, app) -> None:
+        """从应用配置读取缓存大小和过期时间"""
+        self.max_entries = app.config.get('ANALYTICS_CACHE_SIZE', self.max_entries)
+        self.ttl = app.config.get('ANALYTICS_CACHE_TTL', self.ttl)
+        self.clear()
+
+    def _version(self, user_id: Optional[int]) -> tuple:
+        return self._global_version, self._versions.get(user_id, 0)
+
+    def get_or_compute(self, user_id: Optional[int], endpoint: str, compute: Callable[[], Any], *params) -> Any:
+        """
+        返回缓存结果，未命中或已失效时调用compute计算并写入缓存
+
+        Args:
+            user_id: 用户ID
+            endpoint: 接口名称
+            compute: 计算结果的函数
+            params: 参与缓存键的其他参数
+        """
+        key = (user_id, endpoint) + tuple(params)
+        now = time.monotonic()
+        with self._lock:
+            version = self._version(user_id)
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry_version, expires_at, value = entry
+                if entry_version == version and expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            # 计算期间如有写入，版本号已变化，不缓存可能过期的结果
+            if self._version(user_id) == version:
+                self._entries[key] = (version, now + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def bump_user_version(self, user_id: Optional[int]) -> None:
+        """递增用户版本号，使该用户的所有缓存条目失效"""
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+    def bump_all(self) -> None:
+        """使所有用户的缓存条目失效（用于跨用户的批量写入）"""
+        with self._lock:
+            self._global_version += 1
+
+    def clear(self) -> None:
+        """清空缓存和统计计数"""
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._global_version = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """返回缓存命中统计"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 3) if total else 0,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl
+            }
+
+
+analytics_cache = AnalyticsCache()
@@ -1,44 +1,108 @@
-from datetime import datetime, timedelta
+from datetime import datetime, date, timedelta
 from typing import Dict, Any, Optional
-from models import Task
+import numpy as np
+from sqlalchemy import func, case, cast, and_, or_, Integer
+from models import Task, TaskDailyRollup, TaskDurationSketch, User
+from config import Config
+from services.quantile_sketch import KLLSketch
+from services.analytics_snapshot import analytics_snapshot
+from services.time_utils import shift_month
+
+# 已完成任务处理时长（天）：completed_at与created_at相差的整天数+1
+_duration_span = func.julianday(Task.completed_at) - func.julianday(Task.created_at)
+_duration_valid = and_(
+    Task.status == 'completed',
+    Task.created_at.isnot(None),
+    Task.completed_at.isnot(None),
+    _duration_span >= 0
+)
+_duration_days = cast(_duration_span, Integer) + 1
+
+
+# 时间序列支持的粒度和指标
+SERIES_BUCKETS = ('day', 'week', 'month')
+SERIES_METRICS = ('completed', 'created', 'overdue')
+
+
+def _bucket_expr(column, bucket: str):
+    """返回把日期/时间列归入桶起始日期（YYYY-MM-DD）的SQL表达式"""
+    if bucket == 'day':
+        return func.date(column)
+    if bucket == 'week':
+        # 以周一作为一周的开始
+        return func.date(column, 'weekday 0', '-6 days')
+    return func.strftime('%Y-%m-01', column)
+
+
+def _bucket_start(day: date, bucket: str) -> date:
+    """返回日期所在桶的起始日期"""
+    if bucket == 'week':
+        return day - timedelta(days=day.weekday())
+    if bucket == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket(day: date, bucket: str) -> date:
+    """返回下一个桶的起始日期"""
+    if bucket == 'day':
+        return day + timedelta(days=1)
+    if bucket == 'week':
+        return day + timedelta(days=7)
+    return shift_month(datetime(day.year, day.month, 1), 1).date()
+
 
 class AnalyticsService:
     """分析统计服务类"""
     
     @staticmethod
-    def get_analytics_data(user_id: Optional[int] = None) -> Dict[str, Any]:
+    def get_analytics_data(user_id: Optional[int] = None, months: int = 6) -> Dict[str, Any]:
         """
         获取分析统计数据
         
+        从每日完成汇总表（task_daily_rollup）按月份和任务类型做一次分组查询，
+        月度完成数、平均完成时间、完成总数和排名第一的任务类型都由这一次查询的结果汇总得到。
+        
         Args:
             user_id: 用户ID，如果提供则只返回该用户的数据
+            months: 图表包含的月份数（含当前月）
         """
-        # 获取本月完成的任务数
-        current_month = datetime.now().replace(day=1)
-        query = Task.query.filter(
-            Task.status == 'completed',
-            Task.completed_at >= current_month
+        month_col = func.strftime('%Y-%m', TaskDailyRollup.day)
+        query = analytics_snapshot.session().query(
+            month_col,
+            TaskDailyRollup.task_type,
+            func.sum(TaskDailyRollup.completed_count),
+            func.sum(TaskDailyRollup.total_elapsed_days),
+            func.sum(TaskDailyRollup.elapsed_count)
         )
         
         # 添加用户过滤条件
         if user_id is not None:
-            query = query.filter(Task.user_id == user_id)
-            
-        monthly_completed = query.count()
-        
-        # 获取上月完成的任务数
-        last_month = (current_month - timedelta(days=1)).replace(day=1)
-        last_month_query = Task.query.filter(
-            Task.status == 'completed',
-            Task.completed_at >= last_month,
-            Task.completed_at < current_month
-        )
+            query = query.filter(TaskDailyRollup.user_id == user_id)
         
-        # 添加用户过滤条件
-        if user_id is not None:
-            last_month_query = last_month_query.filter(Task.user_id == user_id)
-            
-        last_month_completed = last_month_query.count()
+        rows = query.group_by(month_col, TaskDailyRollup.task_type).all()
+        
+        monthly_counts = {}
+        task_types = {}
+        total_completed = 0
+        total_days = 0
+        task_count = 0
+        for month_key, task_type, count, elapsed_days, elapsed_count in rows:
+            count = int(count or 0)
+            if count == 0:
+                continue
+            total_completed += count
+            total_days += int(elapsed_days or 0)
+            task_count += int(elapsed_count or 0)
+            task_types[task_type] = task_types.get(task_type, 0) + count
+            if month_key:
+                monthly_counts[month_key] = monthly_counts.get(month_key, 0) + count
+        
+        # 本月与上月完成的任务数
+        current_month = datetime.now().replace(day=1)
+        last_month = shift_month(current_month, -1)
+        monthly_completed = monthly_counts.get(current_month.strftime('%Y-%m'), 0)
+        last_month_completed = monthly_counts.get(last_month.strftime('%Y-%m'), 0)
         
         # 计算环比变化
         if last_month_completed > 0:
@@ -47,61 +111,18 @@ class AnalyticsService:
             month_over_month_change = 100 if monthly_completed > 0 else 0
         
         # 计算平均完成时间
-        completed_query = Task.query.filter_by(status='completed')
-        if user_id is not None:
-            completed_query = completed_query.filter_by(user_id=user_id)
-            
-        completed_tasks = completed_query.all()
-        total_days = 0
-        task_count = 0
-        
-        for task in completed_tasks:
-            if task.completed_at and task.created_at:
-                days = (task.completed_at - task.created_at).days
-                total_days += days
-                task_count += 1
-        
         average_days = round(total_days / task_count, 1) if task_count > 0 else 0
         
-        # 获取完成总数
-        total_completed_query = Task.query.filter_by(status='completed')
-        if user_id is not None:
-            total_completed_query = total_completed_query.filter_by(user_id=user_id)
-        total_completed = total_completed_query.count()
-        
-        # 获取排名第一的任务类型
-        task_types = {}
-        tasks_by_type_query = Task.query.filter_by(status='completed')
-        if user_id is not None:
-            tasks_by_type_query = tasks_by_type_query.filter_by(user_id=user_id)
-        tasks_by_type = tasks_by_type_query.with_entities(Task.task_type).all()
-        for (task_type,) in tasks_by_type:
-            if task_type not in task_types:
-                task_types[task_type] = 0
-            task_types[task_type] += 1
-        
         # 获取完成数量最多的任务类型
         top_task_type = max(task_types.items(), key=lambda x: x[1])[0] if task_types else ""
         
-        # 生成图表数据 - 最近6个月的任务完成统计
+        # 生成图表数据 - 最近若干个月的任务完成统计
         chart_labels = []
         chart_data = []
-        
-        for i in range(5, -1, -1):  # 从5个月前到当前月
-            month_start = (datetime.now().replace(day=1) - timedelta(days=32*i)).replace(day=1)
-            if i == 0:
-                month_end = datetime.now()
-            else:
-                month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-            
-            month_completed = Task.query.filter(
-                Task.status == 'completed',
-                Task.completed_at >= month_start,
-                Task.completed_at <= month_end
-            ).count()
-            
+        for i in range(months - 1, -1, -1):  # 从最早的月份到当前月
+            month_start = shift_month(current_month, -i)
             chart_labels.append(f"{month_start.month}月")
-            chart_data.append(month_completed)
+            chart_data.append(monthly_counts.get(month_start.strftime('%Y-%m'), 0))
         
         return {
             'monthly_completed': monthly_completed,
@@ -116,36 +137,250 @@ class AnalyticsService:
             }
         }
     
+    @staticmethod
+    def get_time_series(user_id: Optional[int], start: date, end: date,
+                        bucket: str = 'day', metric: str = 'completed') -> Dict[str, Any]:
+        """
+        获取任意时间范围、任意粒度的任务时间序列
+        
+        分桶在SQL中完成，无论桶的数量多少都只执行一次分组查询。
+        
+        Args:
+            user_id: 用户ID，如果提供则只返回该用户的数据
+            start: 起始日期（包含）
+            end: 结束日期（包含）
+            bucket: 粒度，day、week或month
+            metric: 指标，completed（完成数）、created（创建数）或overdue（到期未按时完成数）
+        """
+        if metric == 'completed':
+            # 完成数直接读取每日完成汇总
+            bucket_col = _bucket_expr(TaskDailyRollup.day, bucket)
+            query = analytics_snapshot.session().query(bucket_col, func.sum(TaskDailyRollup.completed_count)).filter(
+                TaskDailyRollup.day >= start,
+                TaskDailyRollup.day <= end
+            )
+            if user_id is not None:
+                query = query.filter(TaskDailyRollup.user_id == user_id)
+        elif metric == 'created':
+            bucket_col = _bucket_expr(Task.created_at, bucket)
+            query = analytics_snapshot.session().query(bucket_col, func.count(Task.id)).filter(
+                Task.created_at >= datetime.combine(start, datetime.min.time()),
+                Task.created_at < datetime.combine(end + timedelta(days=1), datetime.min.time())
+            )
+            if user_id is not None:
+                query = query.filter(Task.user_id == user_id)
+        else:
+            # 截止日期已过且未在截止日期当天或之前完成的任务，按截止日期分桶
+            last_day = min(end, date.today() - timedelta(days=1))
+            bucket_col = _bucket_expr(Task.deadline, bucket)
+            query = analytics_snapshot.session().query(bucket_col, func.count(Task.id)).filter(
+                Task.deadline >= start,
+                Task.deadline <= last_day,
+                or_(Task.completed_at.is_(None), func.date(Task.completed_at) > Task.deadline)
+            )
+            if user_id is not None:
+                query = query.filter(Task.user_id == user_id)
+        
+        counts = {key: int(value or 0) for key, value in query.group_by(bucket_col).all()}
+        
+        labels = []
+        data = []
+        current = _bucket_start(start, bucket)
+        while current <= end:
+            key = current.isoformat()
+            labels.append(key)
+            data.append(counts.get(key, 0))
+            current = _next_bucket(current, bucket)
+        
+        return {
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'bucket': bucket,
+            'metric': metric,
+            'labels': labels,
+            'data': data
+        }
+    
+    @staticmethod
+    def get_workload(user_id: Optional[int], start: date, end: date,
+                     include_completed: bool = False) -> Dict[str, Any]:
+        """
+        获取每天的任务负荷（按优先级加权的重叠任务数）
+        
+        对任务区间[start_date, deadline]的端点构造差分数组再做前缀和，
+        成本为O(任务数 + 天数)，不需要逐天统计。没有截止日期的任务只占开始日期当天，
+        截止日期早于开始日期的历史数据与日历热力图一样不计入。
+        
+        Args:
+            user_id: 用户ID，如果提供则只统计该用户的任务
+            start: 起始日期（包含）
+            end: 结束日期（包含）
+            include_completed: 是否包含已完成任务
+        """
+        task_end = func.coalesce(Task.deadline, Task.start_date)
+        query = analytics_snapshot.session().query(Task.start_date, task_end, Task.priority).filter(
+            Task.start_date <= end,
+            task_end >= start,
+            # 区间颠倒时结束端的减量会落在开始端之前，把中间几天的负荷减成负数
+            task_end >= Task.start_date
+        )
+        if user_id is not None:
+            query = query.filter(Task.user_id == user_id)
+        if not include_completed:
+            query = query.filter(Task.status != 'completed')
+        rows = query.all()
+        
+        days = (end - start).days + 1
+        # 差分数组多留一位，用于区间结束后一天的减量
+        weighted = np.zeros(days + 1, dtype=np.int64)
+        counts = np.zeros(days + 1, dtype=np.int64)
+        if rows:
+            starts = np.array([max((row[0] - start).days, 0) for row in rows])
+            ends = np.array([min((row[1] - start).days, days - 1) for row in rows]) + 1
+            weights = np.array([Config.PRIORITY_WEIGHTS.get(row[2], Config.PRIORITY_WEIGHTS['medium']) for row in rows])
+            np.add.at(weighted, starts, weights)
+            np.add.at(weighted, ends, -weights)
+            np.add.at(counts, starts, 1)
+            np.add.at(counts, ends, -1)
+        
+        return {
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'labels': [(start + timedelta(days=offset)).isoformat() for offset in range(days)],
+            'load': np.cumsum(weighted)[:days].tolist(),
+            'count': np.cumsum(counts)[:days].tolist(),
+            'weights': Config.PRIORITY_WEIGHTS
+        }
+    
     @staticmethod
     def get_task_statistics(user_id: Optional[int] = None) -> Dict[str, Any]:
         """
         获取任务统计信息
         
+        状态、优先级以及按任务类型的统计均通过分组查询在数据库中完成，
+        查询次数与任务数量无关。
+        
         Args:
             user_id: 用户ID，如果提供则只返回该用户的数据
         """
-        # 基础查询
-        base_query = Task.query
+        # 按状态和优先级分组计数
+        status_priority_query = analytics_snapshot.session().query(Task.status, Task.priority, func.count(Task.id))
         if user_id is not None:
-            base_query = base_query.filter_by(user_id=user_id)
-            
-        total_tasks = base_query.count()
-        pending_tasks = base_query.filter_by(status='pending').count()
-        in_progress_tasks = base_query.filter_by(status='in_progress').count()
-        completed_tasks = base_query.filter_by(status='completed').count()
+            status_priority_query = status_priority_query.filter(Task.user_id == user_id)
+        status_priority_rows = status_priority_query.group_by(Task.status, Task.priority).all()
         
-        # 按优先级统计
-        high_priority = base_query.filter_by(priority='high').count()
-        medium_priority = base_query.filter_by(priority='medium').count()
-        low_priority = base_query.filter_by(priority='low').count()
+        # 按任务类型和状态分组计数，并汇总已完成任务的处理时长
+        type_query = analytics_snapshot.session().query(
+            Task.task_type,
+            Task.status,
+            func.count(Task.id),
+            func.sum(case((_duration_valid, _duration_days), else_=0)),
+            func.sum(case((_duration_valid, 1), else_=0))
+        )
+        if user_id is not None:
+            type_query = type_query.filter(Task.user_id == user_id)
+        type_rows = type_query.group_by(Task.task_type, Task.status).all()
+        
+        # 完成时长分位数读取预先维护的草图，读取成本只与任务类型数有关
+        sketch_query = analytics_snapshot.session().query(TaskDurationSketch.task_type, TaskDurationSketch.sketch)
+        if user_id is not None:
+            sketch_query = sketch_query.filter(TaskDurationSketch.user_id == user_id)
+        sketches = {}
+        for task_type, data in sketch_query.all():
+            sketch = KLLSketch.from_json(data)
+            if task_type in sketches:
+                sketches[task_type].merge(sketch)
+            else:
+                sketches[task_type] = sketch
+        
+        return AnalyticsService._build_task_statistics(status_priority_rows, type_rows, sketches)
+    
+    @staticmethod
+    def get_org_statistics() -> Dict[str, Any]:
+        """
+        获取全部用户的任务统计以及全组织汇总（管理员使用）
+        
+        与get_task_statistics使用相同的分组查询，只是在分组键中加入user_id，
+        按用户的聚合全部在SQL中完成，无论用户多少都只执行固定次数的查询；
+        Python中只把分组结果按用户分区组装成字典。
+        """
+        status_priority_rows = analytics_snapshot.session().query(
+            Task.user_id, Task.status, Task.priority, func.count(Task.id)
+        ).group_by(Task.user_id, Task.status, Task.priority).all()
+        
+        type_rows = analytics_snapshot.session().query(
+            Task.user_id,
+            Task.task_type,
+            Task.status,
+            func.count(Task.id),
+            func.sum(case((_duration_valid, _duration_days), else_=0)),
+            func.sum(case((_duration_valid, 1), else_=0))
+        ).group_by(Task.user_id, Task.task_type, Task.status).all()
+        
+        sketch_rows = analytics_snapshot.session().query(
+            TaskDurationSketch.user_id, TaskDurationSketch.task_type, TaskDurationSketch.sketch
+        ).all()
+        
+        # 按用户分区：(状态优先级分组, 类型分组, 草图)
+        partitions: Dict[Optional[int], tuple] = {}
+        for user_id, *row in status_priority_rows:
+            partitions.setdefault(user_id, ([], [], {}))[0].append(tuple(row))
+        for user_id, *row in type_rows:
+            partitions.setdefault(user_id, ([], [], {}))[1].append(tuple(row))
+        org_sketches: Dict[str, KLLSketch] = {}
+        for user_id, task_type, data in sketch_rows:
+            sketch = KLLSketch.from_json(data)
+            partitions.setdefault(user_id, ([], [], {}))[2][task_type] = sketch
+            org_sketches.setdefault(task_type, KLLSketch()).merge(sketch)
+        
+        user_statistics = {
+            user_id: AnalyticsService._build_task_statistics(status_priority_rows, type_rows, sketches)
+            for user_id, (status_priority_rows, type_rows, sketches) in partitions.items()
+        }
+        
+        usernames = dict(analytics_snapshot.session().query(User.id, User.username).all())
+        empty = AnalyticsService._build_task_statistics([], [], {})
+        users = [
+            {
+                'user_id': user_id,
+                'username': username,
+                'statistics': user_statistics.get(user_id, empty)
+            }
+            for user_id, username in sorted(usernames.items())
+        ]
+        # 历史数据中未关联用户的任务单独列出
+        if None in user_statistics:
+            users.append({'user_id': None, 'username': None, 'statistics': user_statistics[None]})
+        
+        totals = AnalyticsService._build_task_statistics(
+            [row[1:] for row in status_priority_rows],
+            [row[1:] for row in type_rows],
+            org_sketches
+        )
+        return {
+            'user_count': len(usernames),
+            # 只统计在users表中存在的用户，已删除用户遗留的任务只计入组织汇总
+            'active_user_count': len([user_id for user_id in partitions if user_id in usernames]),
+            'users': users,
+            'totals': totals
+        }
+    
+    @staticmethod
+    def _build_task_statistics(status_priority_rows, type_rows, sketches=None) -> Dict[str, Any]:
+        """根据分组查询结果组装任务统计字典"""
+        total_tasks = 0
+        status_breakdown = {'pending': 0, 'in_progress': 0, 'completed': 0}
+        priority_breakdown = {'high': 0, 'medium': 0, 'low': 0}
+        for status, priority, count in status_priority_rows:
+            total_tasks += count
+            if status in status_breakdown:
+                status_breakdown[status] += count
+            if priority in priority_breakdown:
+                priority_breakdown[priority] += count
         
         # 按任务类型统计
         task_types = {}
-        tasks_by_type_query = Task.query
-        if user_id is not None:
-            tasks_by_type_query = tasks_by_type_query.filter_by(user_id=user_id)
-        tasks_by_type = tasks_by_type_query.with_entities(Task.task_type, Task.status, Task.created_at, Task.completed_at).all()
-        for task_type, status, created_at, completed_at in tasks_by_type:
+        for task_type, status, count, total_duration, completed_count in type_rows:
             if task_type not in task_types:
                 task_types[task_type] = {
                     'total': 0, 
@@ -154,26 +389,31 @@ class AnalyticsService:
                     'in_progress': 0,
                     'avg_duration': 0,
                     'total_duration': 0,
-                    'completed_count': 0
+                    'completed_count': 0,
+                    'p50_duration': 0,
+                    'p90_duration': 0,
+                    'p99_duration': 0
                 }
-            task_types[task_type]['total'] += 1
-            task_types[task_type][status] += 1
+            task_types[task_type]['total'] += count
+            if status in ('completed', 'pending', 'in_progress'):
+                task_types[task_type][status] += count
             
-            # 计算已完成任务的平均处理时长
-            if status == 'completed' and created_at and completed_at:
-                # 计算处理时长（结束日期-开始日期+1日）
-                duration = (completed_at - created_at).days + 1
-                if duration > 0:  # 确保时长为正数
-                    task_types[task_type]['total_duration'] += duration
-                    task_types[task_type]['completed_count'] += 1
-        
-        # 计算每种任务类型的平均处理时长
+            # 处理时长（结束日期-开始日期+1日）只统计已完成任务
+            task_types[task_type]['total_duration'] += int(total_duration or 0)
+            task_types[task_type]['completed_count'] += int(completed_count or 0)
+        
+        # 计算每种任务类型的平均处理时长和分位数
         for task_type in task_types:
             if task_types[task_type]['completed_count'] > 0:
                 task_types[task_type]['avg_duration'] = round(
                     task_types[task_type]['total_duration'] / task_types[task_type]['completed_count'], 
                     1
                 )
+            sketch = (sketches or {}).get(task_type)
+            if sketch is not None and sketch.n > 0:
+                task_types[task_type]['p50_duration'] = sketch.quantile(0.5)
+                task_types[task_type]['p90_duration'] = sketch.quantile(0.9)
+                task_types[task_type]['p99_duration'] = sketch.quantile(0.99)
         
         # 过滤掉被删除且从未完成过任务的类型
         # 如果任务类型为空字符串、None或"测试类型"，且该类型下没有已完成的任务，则不在统计中显示
@@ -191,15 +431,8 @@ class AnalyticsService:
         
         return {
             'total_tasks': total_tasks,
-            'status_breakdown': {
-                'pending': pending_tasks,
-                'in_progress': in_progress_tasks,
-                'completed': completed_tasks
-            },
-            'priority_breakdown': {
-                'high': high_priority,
-                'medium': medium_priority,
-                'low': low_priority
-            },
+            'status_breakdown': status_breakdown,
+            'priority_breakdown': priority_breakdown,
             'task_types': sorted_task_types
-        }
\ No newline at end of file
+        }
+
@@ -0,0 +1,212 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from flask import g
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from models import db
+from models.task import beijing_now
+
+try:
+    import fcntl
+except ImportError:  # Windows没有fcntl，只用于单进程的开发环境
+    fcntl = None
+
+class AnalyticsSnapshot:
+    """分析只读快照
+
+    后台线程每隔固定秒数用sqlite3在线备份接口把主库复制到独立的临时文件，再原子替换快照文件，
+    分析查询通过绑定到快照文件的第二个SQLAlchemy引擎（只读、不使用连接池）读取快照，
+    避免重型扫描与交互写入争用主库。快照引擎不注册到SQLALCHEMY_BINDS，db.create_all和迁移不会涉及它。
+    未启用或快照文件尚未生成时，分析查询仍读取主库。
+
+    刷新线程在进程处理第一个请求时启动（命令行和重载器的监控进程不会启动），多个WSGI进程中
+    只有持有快照锁文件的一个进程执行刷新，其余进程每个间隔重试一次，刷新进程退出后由其接替。
+    快照的代数和刷新时间取自快照文件本身，所有进程看到的都是同一份快照。
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.interval = 60
+        self.path: Optional[str] = None
+        self._source_path: Optional[str] = None
+        self._logger = None
+        self._engine = None
+        self._leader_file = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def init_app(self, app) -> None:
+        """
+        读取快照配置并创建快照引擎
+
+        配置项：ANALYTICS_SNAPSHOT_ENABLED、ANALYTICS_SNAPSHOT_PATH、ANALYTICS_SNAPSHOT_INTERVAL。
+        只支持SQLite主库。
+        """
+        self.stop()
+        self.enabled = bool(app.config.get('ANALYTICS_SNAPSHOT_ENABLED'))
+        self.interval = app.config.get('ANALYTICS_SNAPSHOT_INTERVAL', self.interval)
+        self.path = app.config.get('ANALYTICS_SNAPSHOT_PATH')
+        self._logger = app.logger
+        if self._engine is not None:
+            self._engine.dispose()
+            self._engine = None
+        if not self.enabled:
+            return
+
+        url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+        if url.get_backend_name() != 'sqlite' or not url.database or url.database == ':memory:':
+            app.logger.warning('分析快照只支持基于文件的SQLite数据库，已禁用')
+            self.enabled = False
+            return
+        self._source_path = url.database
+
+        # 不使用连接池，每次会话重新打开文件，快照替换后立即读到新文件
+        self._engine = create_engine(f'sqlite:///file:{self.path}?mode=ro&uri=true', poolclass=NullPool)
+
+        @app.before_request
+        def start_snapshot_refresher():
+            self.start()
+
+        @app.teardown_appcontext
+        def close_snapshot_session(exception=None):
+            session = g.pop('analytics_snapshot_session', None)
+            if session is not None:
+                session.close()
+
+    def start(self) -> None:
+        """启动后台刷新线程，已启动时忽略"""
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='analytics-snapshot', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """停止后台刷新线程并释放快照锁"""
+        self._stop.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=5)
+        self._thread = None
+        self._release_leader()
+
+    def _acquire_leader(self) -> bool:
+        """
+        尝试成为唯一的刷新进程
+
+        对快照锁文件加非阻塞排他锁并一直持有，进程退出时由操作系统释放。
+
+        Returns:
+            本进程是否持有快照锁
+        """
+        if self._leader_file is not None or fcntl is None:
+            return True
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        lock_file = open(f'{self.path}.lock', 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._leader_file = lock_file
+        return True
+
+    def _release_leader(self) -> None:
+        if self._leader_file is not None:
+            self._leader_file.close()
+            self._leader_file = None
+
+    def _run(self) -> None:
+        while True:
+            try:
+                if self._acquire_leader():
+                    self.refresh()
+            except Exception:
+                self._logger.exception('刷新分析快照失败')
+            if self._stop.wait(self.interval):
+                break
+
+    def refresh(self) -> None:
+        """用在线备份接口生成新快照并原子替换旧快照"""
+        if not self.enabled or not os.path.exists(self._source_path):
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        # 每次刷新使用独立的临时文件：刷新线程和命令行可能同时刷新，共用临时文件会把写了一半的文件替换到位
+        fd, temp_path = tempfile.mkstemp(prefix='.analytics_snapshot.', suffix='.tmp', dir=directory)
+        os.close(fd)
+        try:
+            source = sqlite3.connect(f'file:{self._source_path}?mode=ro', uri=True)
+            target = sqlite3.connect(temp_path)
+            try:
+                # 主库为WAL模式时备份的读事务不阻塞写入
+                with target:
+                    source.backup(target)
+                # 快照以只读方式打开，改回回滚日志模式，避免替换后残留上一份快照的-wal/-shm文件
+                target.execute('PRAGMA journal_mode=DELETE')
+            finally:
+                target.close()
+                source.close()
+            os.replace(temp_path, self.path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _stat(self) -> Optional[os.stat_result]:
+        if not self.enabled:
+            return None
+        try:
+            return os.stat(self.path)
+        except FileNotFoundError:
+            return None
+
+    @property
+    def generation(self) -> Optional[Tuple[int, int]]:
+        """快照代数：快照文件的(inode, 修改时间)，每次替换都会变化；未启用或尚无快照时为None"""
+        stat = self._stat()
+        return (stat.st_ino, stat.st_mtime_ns) if stat else None
+
+    @property
+    def available(self) -> bool:
+        """快照是否可用于查询"""
+        return self._stat() is not None
+
+    def session(self):
+        """返回分析查询使用的会话：快照可用时为快照库会话（每个请求一个），否则为主库会话"""
+        if not self.available:
+            return db.session
+        if 'analytics_snapshot_session' not in g:
+            g.analytics_snapshot_session = Session(self._engine)
+        return g.analytics_snapshot_session
+
+    def staleness(self) -> Dict[str, Any]:
+        """返回数据来源和快照的陈旧程度"""
+        stat = self._stat()
+        if stat is None:
+            return {'source': 'primary'}
+        return {
+            'source': 'snapshot',
+            'refreshed_at': datetime.fromtimestamp(stat.st_mtime, beijing_now().tzinfo).isoformat(),
+            'age_seconds': round(max(time.time() - stat.st_mtime, 0), 1),
+            'refresh_interval': self.interval
+        }
+
+    def annotate(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """启用快照时在响应数据中附加陈旧程度信息，未启用时原样返回"""
+        if not self.enabled:
+            return data
+        return dict(data, snapshot=self.staleness())
+
+
+analytics_snapshot = AnalyticsSnapshot()
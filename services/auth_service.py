@@ -1,5 +1,7 @@
-from models import db, User
+from models import db, User, IssueSignature
 from services.workflow_service import WorkflowService
+from services.search_service import SearchService
+from services.similar_issue_index import similar_issue_index
 
 class AuthService:
     @staticmethod
@@ -44,6 +46,19 @@ class AuthService:
         """根据ID获取用户"""
         return User.query.get(user_id)
     
+    @staticmethod
+    def delete_user(user):
+        """删除用户，同时删除其全文检索索引行和问题签名
+
+        用户ID可能被之后注册的用户复用，按用户ID限定范围的索引必须随用户一起删除。
+        """
+        user_id = user.id
+        SearchService.remove_user(user_id)
+        IssueSignature.query.filter_by(user_id=user_id).delete()
+        db.session.delete(user)
+        db.session.commit()
+        similar_issue_index.invalidate(user_id)
+    
     @staticmethod
     def create_admin_if_not_exists():
         """确保管理员账号存在"""
@@ -0,0 +1,126 @@
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import func, case
+from sqlalchemy.orm import load_only
+from models import db, Task
+from services.task_service import TaskService
+
+# 日历事件用到的任务列，描述等大字段不在列表中加载
+CALENDAR_EVENT_COLUMNS = (
+    Task.id, Task.title, Task.task_type, Task.start_date, Task.deadline, Task.status, Task.priority, Task.progress
+)
+
+class CalendarService:
+    """日历服务类"""
+
+    @staticmethod
+    def to_event(task: Task) -> Dict[str, Any]:
+        """
+        把任务转换为FullCalendar事件
+
+        结束日期为截止日期的下一天（FullCalendar全天事件的end不包含当天），
+        标题附带进展或状态，extendedProps只保留着色和提示用到的字段。
+        """
+        status = task.get_calculated_status()
+        event = {
+            'id': task.id,
+            'title': f'{task.title} [{task.progress or status}]',
+            'start': task.start_date.isoformat(),
+            'allDay': True,
+            'extendedProps': {
+                'task_type': task.task_type,
+                'status': status,
+                'priority': task.priority,
+                'is_overdue': task.is_overdue()
+            }
+        }
+        if task.deadline:
+            event['end'] = (task.deadline + timedelta(days=1)).isoformat()
+        return event
+
+    @staticmethod
+    def get_events(user_id: Optional[int], start: Optional[date] = None, end: Optional[date] = None,
+                   include_completed: bool = False) -> List[Dict[str, Any]]:
+        """
+        获取与时间窗口重叠的日历事件
+
+        Args:
+            user_id: 用户ID
+            start: 时间窗口起始日期（包含）
+            end: 时间窗口结束日期（不包含），与FullCalendar的范围参数一致
+            include_completed: 是否包含已完成任务
+        """
+        query = TaskService._task_query(exclude_completed=not include_completed, user_id=user_id,
+                                        start=start, end=end)
+        tasks = query.options(load_only(*CALENDAR_EVENT_COLUMNS)).order_by(Task.start_date, Task.id).all()
+        return [CalendarService.to_event(task) for task in tasks]
+
+    @staticmethod
+    def get_event_description(user_id: Optional[int], task_id: int) -> Optional[Dict[str, Any]]:
+        """获取日历提示中显示的任务描述，任务不存在或不属于该用户时返回None"""
+        task = Task.query.options(load_only(Task.id, Task.description)).filter(
+            Task.id == task_id,
+            Task.user_id == user_id
+        ).first()
+        if not task:
+            return None
+        return {'id': task.id, 'description': task.description or ''}
+
+    @staticmethod
+    def get_density(user_id: Optional[int], month: date, today: Optional[date] = None) -> Dict[str, Any]:
+        """
+        统计一个月内每天的进行中任务数和其中已延期的任务数
+
+        任务在[开始日期, 截止日期]内的每一天都计为进行中（没有截止日期的只计开始当天），
+        已延期指截止日期早于今天且未完成。先按开始日期和结束日期各做一次分组计数，
+        再在当月日期上做差分扫描，查询结果行数只与不同日期的数量有关，与任务数无关。
+
+        Args:
+            user_id: 用户ID
+            month: 当月任意一天
+            today: 判断延期的基准日期，默认为今天
+        """
+        today = today or date.today()
+        first_day = month.replace(day=1)
+        next_month = (first_day + timedelta(days=32)).replace(day=1)
+        last_day = next_month - timedelta(days=1)
+
+        end_date = func.coalesce(Task.deadline, Task.start_date)
+        overdue = func.sum(case((Task.deadline < today, 1), else_=0))
+
+        def grouped(column):
+            query = db.session.query(column, func.count(Task.id), overdue).filter(
+                Task.user_id == user_id,
+                Task.status != 'completed',
+                Task.start_date <= last_day,
+                end_date >= first_day,
+                end_date >= Task.start_date
+            )
+            return query.group_by(column).all()
+
+        # 差分数组：任务从开始日起计入，结束日次日起扣除，超出当月的部分截断到月初或月末
+        days = (last_day - first_day).days + 1
+        active_delta = [0] * (days + 1)
+        overdue_delta = [0] * (days + 1)
+        for start, count, overdue_count in grouped(Task.start_date):
+            index = max((start - first_day).days, 0)
+            active_delta[index] += count
+            overdue_delta[index] += overdue_count or 0
+        for end, count, overdue_count in grouped(end_date):
+            index = min((end - first_day).days, days - 1) + 1
+            active_delta[index] -= count
+            overdue_delta[index] -= overdue_count or 0
+
+        result = []
+        active = 0
+        overdue_total = 0
+        for offset in range(days):
+            active += active_delta[offset]
+            overdue_total += overdue_delta[offset]
+            result.append({
+                'date': (first_day + timedelta(days=offset)).isoformat(),
+                'active': active,
+                'overdue': overdue_total
+            })
+
+        return {'month': first_day.strftime('%Y-%m'), 'days': result}
@@ -0,0 +1,97 @@
+import threading
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import func
+from models import db, Task
+from services.interval_tree import IntervalTree
+
+class TaskConflictIndex:
+    """高优先级任务的时间冲突索引
+
+    每个用户一棵区间树，保存该用户未完成的高优先级任务的[开始日期, 截止日期]区间，
+    首次查询时从数据库加载。树保存在进程内存中，其他进程的写入不会通知本进程，
+    因此每次查询前先读取该用户任务的数据版本（任务数和最后更新时间），版本变化时重建；
+    本进程的写入还会由TaskService直接使该用户的树失效。
+    """
+
+    def __init__(self):
+        self._trees: Dict[Optional[int], Tuple[Tuple[Any, Any], IntervalTree]] = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        """应用启动时清空索引"""
+        self.clear()
+
+    @staticmethod
+    def _data_version(user_id: Optional[int]) -> Tuple[Any, Any]:
+        """
+        读取用户任务的数据版本
+
+        任何写入都会更新updated_at，删除会减少任务数，两者都不变说明树仍然有效；
+        查询只读取(user_id, updated_at)索引。
+        """
+        count, last_updated = db.session.query(func.count(Task.id), func.max(Task.updated_at)).filter(
+            Task.user_id == user_id
+        ).one()
+        return count, last_updated
+
+    def _load(self, user_id: Optional[int]) -> IntervalTree:
+        """从数据库构建指定用户的区间树"""
+        rows = db.session.query(Task.id, Task.title, Task.start_date, Task.deadline).filter(
+            Task.user_id == user_id,
+            Task.priority == 'high',
+            Task.status != 'completed',
+            Task.start_date.isnot(None)
+        ).all()
+        return IntervalTree([
+            # 没有截止日期的任务按开始日期当天计算
+            (start_date, deadline or start_date, (task_id, title, start_date, deadline))
+            for task_id, title, start_date, deadline in rows
+        ])
+
+    def find_conflicts(self, user_id: Optional[int], start: date, end: Optional[date] = None,
+                       exclude_task_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        查找与给定日期区间重叠的高优先级任务
+
+        Args:
+            user_id: 用户ID
+            start: 区间开始日期（包含）
+            end: 区间结束日期（包含），为空时按开始日期当天计算
+            exclude_task_id: 需要排除的任务ID（修改已有任务的日期时排除其自身）
+        """
+        end = end or start
+        # 先读版本再加载：加载期间如有写入，保存的版本早于树的内容，下次查询会再重建一次
+        version = self._data_version(user_id)
+        with self._lock:
+            cached = self._trees.get(user_id)
+        if cached is not None and cached[0] == version:
+            tree = cached[1]
+        else:
+            tree = self._load(user_id)
+            with self._lock:
+                self._trees[user_id] = (version, tree)
+
+        return [
+            {
+                'id': task_id,
+                'title': title,
+                'start_date': start_date.isoformat(),
+                'deadline': deadline.isoformat() if deadline else None
+            }
+            for task_id, title, start_date, deadline in tree.overlap(start, end)
+            if task_id != exclude_task_id
+        ]
+
+    def invalidate(self, user_id: Optional[int]) -> None:
+        """丢弃指定用户的区间树，下次查询时重建"""
+        with self._lock:
+            self._trees.pop(user_id, None)
+
+    def clear(self) -> None:
+        """丢弃所有用户的区间树"""
+        with self._lock:
+            self._trees.clear()
+
+
+conflict_index = TaskConflictIndex()
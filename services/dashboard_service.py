@@ -0,0 +1,67 @@
+from typing import Any, Dict, Iterable, Optional
+from services.task_service import TaskService
+from services.issue_service import IssueService
+from services.workflow_service import WorkflowService
+from services.analytics_service import AnalyticsService
+from services.analytics_cache import analytics_cache
+from services.analytics_snapshot import analytics_snapshot
+
+# 仪表盘支持的数据块
+DASHBOARD_SECTIONS = ('tasks', 'completed_tasks', 'analytics', 'statistics', 'issues', 'workflows', 'sync_token')
+
+class DashboardService:
+    """首页仪表盘服务类"""
+    
+    @staticmethod
+    def get_dashboard(user_id: Optional[int], sections: Iterable[str] = DASHBOARD_SECTIONS) -> Dict[str, Any]:
+        """
+        在一次请求中获取首页所需的数据
+        
+        同时请求未完成和已完成任务时只查询一次任务表再按状态拆分；
+        分析数据与 /api/analytics 系列接口共用分析缓存。
+        
+        Args:
+            user_id: 用户ID
+            sections: 需要返回的数据块
+        """
+        sections = set(sections)
+        result = {}
+        
+        # 增量同步令牌在读取任何数据之前生成，客户端以它作为首次增量同步的起点，
+        # 页面加载之后的变更都不会遗漏（重复返回的变更按ID覆盖）
+        if 'sync_token' in sections:
+            result['sync_token'] = TaskService.sync_token()
+        
+        if 'tasks' in sections and 'completed_tasks' in sections:
+            all_tasks = TaskService.get_all_tasks(user_id=user_id)
+            result['tasks'] = [task for task in all_tasks if task['status'] != 'completed']
+            result['completed_tasks'] = [task for task in all_tasks if task['status'] == 'completed']
+        elif 'tasks' in sections:
+            result['tasks'] = TaskService.get_all_tasks(exclude_completed=True, user_id=user_id)
+        elif 'completed_tasks' in sections:
+            result['completed_tasks'] = TaskService.get_all_tasks(status='completed', user_id=user_id)
+        
+        if 'analytics' in sections:
+            result['analytics'] = analytics_cache.get_or_compute(
+                user_id, 'analytics',
+                lambda: AnalyticsService.get_analytics_data(user_id=user_id),
+                6, analytics_snapshot.generation
+            )
+        
+        if 'statistics' in sections:
+            result['statistics'] = analytics_cache.get_or_compute(
+                user_id, 'statistics',
+                lambda: AnalyticsService.get_task_statistics(user_id=user_id),
+                analytics_snapshot.generation
+            )
+        
+        if 'analytics' in sections or 'statistics' in sections:
+            result = analytics_snapshot.annotate(result)
+        
+        if 'issues' in sections:
+            result['issues'] = IssueService.get_all_issues(user_id=user_id)
+        
+        if 'workflows' in sections:
+            result['workflows'] = WorkflowService.get_all_workflows(user_id=user_id)
+        
+        return result
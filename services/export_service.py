@@ -0,0 +1,117 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, Optional, Tuple
+from models import db, Task, TaskProgressHistory, TaskReviewComment, Issue
+
+# 导出支持的格式
+EXPORT_FORMATS = ('csv', 'ndjson')
+
+# 每批从数据库读取的行数，同时也是每次写出的行数
+EXPORT_BATCH_SIZE = 1000
+
+# 以这些字符开头的单元格会被Excel当作公式执行
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _export_columns() -> Dict[str, Tuple[Any, ...]]:
+    """各导出资源对应的列（列名取自模型属性名）"""
+    return {
+        'tasks': (
+            Task.id, Task.title, Task.description, Task.task_type, Task.start_date, Task.deadline,
+            Task.status, Task.priority, Task.progress, Task.created_at, Task.updated_at, Task.completed_at
+        ),
+        'history': (
+            TaskProgressHistory.id, TaskProgressHistory.task_id, TaskProgressHistory.operation_time,
+            TaskProgressHistory.old_status, TaskProgressHistory.new_status,
+            TaskProgressHistory.old_progress, TaskProgressHistory.new_progress
+        ),
+        'comments': (
+            TaskReviewComment.id, TaskReviewComment.task_id, TaskReviewComment.content, TaskReviewComment.created_at
+        ),
+        'issues': (
+            Issue.id, Issue.title, Issue.description, Issue.priority, Issue.status,
+            Issue.created_at, Issue.resolved_at, Issue.solutions, Issue.successful_solution
+        )
+    }
+
+
+EXPORT_RESOURCES = tuple(_export_columns())
+
+
+def _format_value(value: Any) -> Any:
+    """把日期时间转换为ISO字符串"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _escape_csv_cell(value: Any) -> Any:
+    """用户输入的文本可能被当作公式，CSV中加单引号前缀使其按文本显示"""
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class ExportService:
+    """数据导出服务类
+
+    以列查询配合yield_per分批读取，逐批生成CSV或NDJSON文本，
+    内存占用与导出行数无关，配合流式响应可以立即开始输出。
+    """
+
+    @staticmethod
+    def _query(resource: str, user_id: Optional[int]):
+        """构造指定资源的列查询，按主键顺序读取"""
+        columns = _export_columns()[resource]
+        model = columns[0].class_
+        query = db.session.query(*columns)
+        if model in (TaskProgressHistory, TaskReviewComment):
+            query = query.join(Task, Task.id == model.task_id)
+            owner = Task.user_id
+        else:
+            owner = model.user_id
+        if user_id is not None:
+            query = query.filter(owner == user_id)
+        return query.order_by(columns[0]).yield_per(EXPORT_BATCH_SIZE)
+
+    @staticmethod
+    def stream(resource: str, fmt: str, user_id: Optional[int]) -> Iterator[str]:
+        """
+        按批生成导出内容
+
+        Args:
+            resource: 导出资源，tasks、history、comments或issues
+            fmt: 导出格式，csv或ndjson
+            user_id: 用户ID，如果提供则只导出该用户的数据
+        """
+        names = [column.key for column in _export_columns()[resource]]
+        query = ExportService._query(resource, user_id)
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer) if fmt == 'csv' else None
+        if writer is not None:
+            # 带BOM，便于Excel正确识别UTF-8中文
+            buffer.write('\ufeff')
+            writer.writerow(names)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+        count = 0
+        for row in query:
+            values = [_format_value(value) for value in row]
+            if writer is not None:
+                writer.writerow([_escape_csv_cell(value) for value in values])
+            else:
+                buffer.write(json.dumps(dict(zip(names, values)), ensure_ascii=False))
+                buffer.write('\n')
+            count += 1
+            if count % EXPORT_BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue()
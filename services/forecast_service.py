@@ -0,0 +1,163 @@
+from datetime import date, timedelta
+from typing import Dict, Any, List, Optional
+import numpy as np
+from models import db, Task, TaskDailyRollup
+
+class ForecastService:
+    """任务完成预测服务类"""
+
+    @staticmethod
+    def _weekly_throughput(user_id: Optional[int], today: date, history_weeks: int) -> Dict[str, np.ndarray]:
+        """从每日完成汇总读取各任务类型最近若干周的每周完成数（下标0为最近一周）"""
+        # 只取最近history_weeks*7天（不含since当天），每天都落在history_weeks个周槽位之内
+        since = today - timedelta(days=history_weeks * 7)
+        query = db.session.query(
+            TaskDailyRollup.task_type,
+            TaskDailyRollup.day,
+            TaskDailyRollup.completed_count
+        ).filter(
+            TaskDailyRollup.day > since,
+            TaskDailyRollup.day < today,
+            TaskDailyRollup.completed_count > 0
+        )
+        if user_id is not None:
+            query = query.filter(TaskDailyRollup.user_id == user_id)
+
+        throughput: Dict[str, np.ndarray] = {}
+        for task_type, day, completed_count in query.all():
+            weeks = throughput.setdefault(task_type, np.zeros(history_weeks, dtype=np.int64))
+            weeks[(today - day).days // 7] += completed_count
+
+        # 去掉该类型第一次完成之前的周，避免新用户的空白历史拉低吞吐量
+        for task_type, weeks in throughput.items():
+            throughput[task_type] = weeks[:np.flatnonzero(weeks).max() + 1]
+        return throughput
+
+    @staticmethod
+    def forecast_backlog(user_id: Optional[int], simulations: int = 2000, history_weeks: int = 26,
+                         horizon_weeks: int = 52, confidence: float = 0.85,
+                         seed: Optional[int] = None, today: Optional[date] = None) -> Dict[str, Any]:
+        """
+        用蒙特卡洛模拟预测未完成任务的完成日期
+
+        每种任务类型的每周完成数从该用户最近history_weeks周的历史中有放回抽样，
+        同一类型的未完成任务按截止日期先后依次完成。所有模拟一次性以NumPy矩阵计算。
+        没有完成历史的任务类型无法预测，结果中forecastable为False。
+
+        Args:
+            user_id: 用户ID
+            simulations: 模拟次数
+            history_weeks: 参与抽样的历史周数
+            horizon_weeks: 预测的最长周数，超出视为无法在预测期内完成
+            confidence: 判定截止日期有风险的概率阈值，按时完成概率低于该值即标记
+            seed: 随机数种子
+            today: 预测基准日期，默认为今天
+        """
+        today = today or date.today()
+        rng = np.random.default_rng(seed)
+        throughput = ForecastService._weekly_throughput(user_id, today, history_weeks)
+
+        query = db.session.query(Task.id, Task.title, Task.task_type, Task.deadline).filter(
+            Task.status != 'completed'
+        )
+        if user_id is not None:
+            query = query.filter(Task.user_id == user_id)
+        open_tasks: Dict[str, List[tuple]] = {}
+        for task in query.all():
+            open_tasks.setdefault(task.task_type, []).append(task)
+
+        task_results = []
+        unforecastable = []
+        # 每次模拟中全部任务完成所需的周数
+        backlog_weeks = np.zeros(simulations, dtype=np.int64)
+        for task_type, tasks in open_tasks.items():
+            history = throughput.get(task_type)
+            if history is None or not history.any():
+                unforecastable.extend(tasks)
+                continue
+
+            # 有截止日期的任务按截止日期先后排在前面
+            tasks.sort(key=lambda task: (task.deadline is None, task.deadline or date.max, task.id))
+
+            samples = rng.choice(history, size=(simulations, horizon_weeks), replace=True)
+            weeks = ForecastService._completion_weeks(np.cumsum(samples, axis=1), len(tasks))
+            backlog_weeks = np.maximum(backlog_weeks, weeks[:, -1])
+
+            p50, p85 = np.percentile(weeks, [50, 85], axis=0, method='higher')
+            deadline_weeks = np.array([
+                (task.deadline - today).days // 7 if task.deadline else horizon_weeks
+                for task in tasks
+            ])
+            # 在截止日期所在周（含）之前完成视为按时
+            on_time = (weeks <= deadline_weeks[None, :]).mean(axis=0)
+            for index, task in enumerate(tasks):
+                probability = None
+                if task.deadline:
+                    probability = round(float(on_time[index]), 3) if deadline_weeks[index] >= 0 else 0.0
+                task_results.append({
+                    'id': task.id,
+                    'title': task.title,
+                    'task_type': task.task_type,
+                    'deadline': task.deadline.isoformat() if task.deadline else None,
+                    'forecastable': True,
+                    'completion': {
+                        'p50': ForecastService._week_to_date(p50[index], today, horizon_weeks),
+                        'p85': ForecastService._week_to_date(p85[index], today, horizon_weeks)
+                    },
+                    'on_time_probability': probability,
+                    'at_risk': probability is not None and probability < confidence
+                })
+
+        for task in unforecastable:
+            task_results.append({
+                'id': task.id,
+                'title': task.title,
+                'task_type': task.task_type,
+                'deadline': task.deadline.isoformat() if task.deadline else None,
+                'forecastable': False,
+                'at_risk': False
+            })
+
+        forecastable = len(task_results) - len(unforecastable)
+        return {
+            'generated_on': today.isoformat(),
+            'simulations': simulations,
+            'open_tasks': len(task_results),
+            'backlog_completion': ForecastService._completion_dates(backlog_weeks, today, horizon_weeks) if forecastable else None,
+            'tasks': task_results,
+            'at_risk': [task['id'] for task in task_results if task['at_risk']]
+        }
+
+    @staticmethod
+    def _completion_weeks(cumulative: np.ndarray, count: int) -> np.ndarray:
+        """
+        计算每次模拟中第1..count个任务完成所在的周（从0开始）
+
+        第k个任务在累计完成数首次达到k的那一周完成。各行累计值单调不减，
+        给每行加上足够大的偏移后展平，用一次searchsorted同时求出所有(模拟, 任务)的结果；
+        预测期内无法完成时结果为预测周数。
+
+        Returns:
+            形状为 (模拟次数, count) 的数组
+        """
+        simulations, horizon_weeks = cumulative.shape
+        stride = int(cumulative[:, -1].max()) + count + 1
+        offsets = (np.arange(simulations, dtype=np.int64) * stride)[:, None]
+        targets = offsets + np.arange(1, count + 1)[None, :]
+        positions = np.searchsorted((cumulative + offsets).ravel(), targets.ravel(), side='left')
+        return positions.reshape(simulations, count) - (np.arange(simulations) * horizon_weeks)[:, None]
+
+    @staticmethod
+    def _week_to_date(week: float, today: date, horizon_weeks: int) -> Optional[str]:
+        """把第week周（从0开始）换算为该周结束的日期，超出预测期返回None"""
+        if week >= horizon_weeks:
+            return None
+        return (today + timedelta(days=int(week) * 7 + 6)).isoformat()
+
+    @staticmethod
+    def _completion_dates(weeks: np.ndarray, today: date, horizon_weeks: int) -> Dict[str, Optional[str]]:
+        """返回完成日期的50%和85%分位"""
+        return {
+            'p50': ForecastService._week_to_date(np.percentile(weeks, 50, method='higher'), today, horizon_weeks),
+            'p85': ForecastService._week_to_date(np.percentile(weeks, 85, method='higher'), today, horizon_weeks)
+        }
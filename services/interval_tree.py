@@ -0,0 +1,61 @@
+from typing import Any, Generic, List, Sequence, Tuple, TypeVar
+
+K = TypeVar('K')
+
+class IntervalTree(Generic[K]):
+    """静态区间树
+
+    区间按起点排序后存为隐式平衡二叉搜索树（子树为数组的一段，根为中点），
+    每个节点记录其子树中的最大终点。查询与[start, end]重叠（闭区间）的全部区间，
+    时间为O(log n + k)。树构建后不可修改，数据变化时整体重建。
+    """
+
+    def __init__(self, intervals: Sequence[Tuple[K, K, Any]]):
+        """
+        Args:
+            intervals: (起点, 终点, 值) 序列，起点不大于终点
+        """
+        items = sorted(intervals, key=lambda interval: interval[0])
+        self._starts: List[K] = [item[0] for item in items]
+        self._ends: List[K] = [item[1] for item in items]
+        self._values: List[Any] = [item[2] for item in items]
+        self._max_ends: List[K] = list(self._ends)
+        self._build(0, len(items))
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def _build(self, lo: int, hi: int) -> None:
+        """计算[lo, hi)子树中每个节点的最大终点"""
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        self._build(lo, mid)
+        self._build(mid + 1, hi)
+        max_end = self._ends[mid]
+        if lo < mid and self._max_ends[(lo + mid) // 2] > max_end:
+            max_end = self._max_ends[(lo + mid) // 2]
+        if mid + 1 < hi and self._max_ends[(mid + 1 + hi) // 2] > max_end:
+            max_end = self._max_ends[(mid + 1 + hi) // 2]
+        self._max_ends[mid] = max_end
+
+    def overlap(self, start: K, end: K) -> List[Any]:
+        """返回与闭区间[start, end]重叠的所有区间的值，按起点排序"""
+        result: List[Any] = []
+        self._search(0, len(self._values), start, end, result)
+        return result
+
+    def _search(self, lo: int, hi: int, start: K, end: K, result: List[Any]) -> None:
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        # 子树中所有区间都在查询区间之前结束
+        if self._max_ends[mid] < start:
+            return
+        self._search(lo, mid, start, end, result)
+        # 右子树的起点都不小于当前节点，当前节点已在查询区间之后开始时无需继续
+        if self._starts[mid] > end:
+            return
+        if self._ends[mid] >= start:
+            result.append(self._values[mid])
+        self._search(mid + 1, hi, start, end, result)
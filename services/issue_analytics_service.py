@@ -0,0 +1,156 @@
+from datetime import datetime
+from typing import Dict, Any, Optional
+from sqlalchemy import func, case
+from models import db, Issue
+from models.task import beijing_now
+from services.time_utils import to_naive, shift_month
+
+# 问题优先级，未设置的按medium统计，使其与medium合并为同一分组
+_priority = func.coalesce(Issue.priority, 'medium')
+
+# 已解决问题的解决耗时（小时）
+_resolve_hours = (func.julianday(Issue.resolved_at) - func.julianday(Issue.created_at)) * 24
+
+# 解决耗时统计的分位数
+RESOLVE_PERCENTILES = (0.5, 0.9)
+
+# 未解决问题的账龄分段：(上限天数, 名称)，上限为None表示不设上限
+ISSUE_AGE_BUCKETS = ((1, '0-1'), (7, '1-7'), (30, '7-30'), (None, '30+'))
+
+
+class IssueAnalyticsService:
+    """问题分析服务类"""
+
+    @staticmethod
+    def get_issue_analytics(user_id: Optional[int] = None, months: int = 6,
+                            now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        获取问题分析数据：各优先级的解决耗时、未解决问题账龄分布和每月解决率
+
+        每一项都是一次分组查询，查询次数与问题数量无关。
+
+        Args:
+            user_id: 用户ID，如果提供则只统计该用户的问题
+            months: 每月解决率包含的月份数（含当前月）
+            now: 计算账龄的基准时间，默认为当前北京时间
+        """
+        now = now or to_naive(beijing_now())
+        return {
+            'time_to_resolve': IssueAnalyticsService._time_to_resolve(user_id),
+            'open_aging': IssueAnalyticsService._open_aging(user_id, now),
+            'monthly': IssueAnalyticsService._monthly_resolution(user_id, months, now)
+        }
+
+    @staticmethod
+    def _time_to_resolve(user_id: Optional[int]) -> Dict[str, Any]:
+        """
+        按优先级统计解决耗时（小时）的平均值和分位数
+
+        子查询用窗口函数给每个优先级内的耗时排序，外层分组时取秩首次达到q*总数的耗时，
+        即最近秩分位数，整个计算在一条SQL中完成。
+        """
+        ranked = db.session.query(
+            _priority.label('priority'),
+            _resolve_hours.label('hours'),
+            func.row_number().over(partition_by=_priority, order_by=_resolve_hours).label('rank'),
+            func.count(Issue.id).over(partition_by=_priority).label('total')
+        ).filter(
+            Issue.status == 'resolved',
+            Issue.created_at.isnot(None),
+            Issue.resolved_at.isnot(None),
+            _resolve_hours >= 0
+        )
+        if user_id is not None:
+            ranked = ranked.filter(Issue.user_id == user_id)
+        ranked = ranked.subquery()
+
+        query = db.session.query(
+            ranked.c.priority,
+            func.count(),
+            func.avg(ranked.c.hours),
+            *[func.min(case((ranked.c.rank >= q * ranked.c.total, ranked.c.hours))) for q in RESOLVE_PERCENTILES]
+        ).group_by(ranked.c.priority)
+
+        result = {}
+        total_count = 0
+        total_hours = 0.0
+        for priority, count, avg_hours, *percentiles in query.all():
+            stats = {'count': count, 'mean_hours': round(avg_hours, 1)}
+            for q, value in zip(RESOLVE_PERCENTILES, percentiles):
+                stats[f'p{int(q * 100)}_hours'] = round(value, 1)
+            result[priority] = stats
+            total_count += count
+            total_hours += avg_hours * count
+
+        return {
+            'by_priority': result,
+            'count': total_count,
+            'mean_hours': round(total_hours / total_count, 1) if total_count else 0
+        }
+
+    @staticmethod
+    def _open_aging(user_id: Optional[int], now: datetime) -> Dict[str, Any]:
+        """按账龄分段和优先级统计未解决问题数"""
+        age_days = func.julianday(now.isoformat(sep=' ')) - func.julianday(Issue.created_at)
+        bucket = case(
+            *[(age_days < limit, name) for limit, name in ISSUE_AGE_BUCKETS if limit is not None],
+            else_=ISSUE_AGE_BUCKETS[-1][1]
+        )
+        query = db.session.query(bucket, _priority, func.count(Issue.id)).filter(
+            Issue.status == 'open',
+            Issue.created_at.isnot(None)
+        )
+        if user_id is not None:
+            query = query.filter(Issue.user_id == user_id)
+
+        buckets = {name: {'total': 0, 'high': 0, 'medium': 0, 'low': 0} for _, name in ISSUE_AGE_BUCKETS}
+        for name, priority, count in query.group_by(bucket, _priority).all():
+            buckets[name]['total'] += count
+            if priority in buckets[name]:
+                buckets[name][priority] += count
+
+        return {
+            'labels': [name for _, name in ISSUE_AGE_BUCKETS],
+            'buckets': buckets,
+            'total': sum(bucket['total'] for bucket in buckets.values())
+        }
+
+    @staticmethod
+    def _monthly_resolution(user_id: Optional[int], months: int, now: datetime) -> Dict[str, Any]:
+        """
+        每月新建问题数、其中已解决的数量和解决率，以及每月解决的问题数
+
+        解决率按问题的创建月份计算：当月新建的问题中目前已解决的比例。
+        """
+        first_month = shift_month(datetime(now.year, now.month, 1), -(months - 1))
+
+        created_month = func.strftime('%Y-%m', Issue.created_at)
+        created_query = db.session.query(
+            created_month,
+            func.count(Issue.id),
+            func.sum(case((Issue.status == 'resolved', 1), else_=0))
+        ).filter(Issue.created_at >= first_month)
+        if user_id is not None:
+            created_query = created_query.filter(Issue.user_id == user_id)
+        created = {month: (count, int(resolved or 0)) for month, count, resolved in created_query.group_by(created_month).all()}
+
+        resolved_month = func.strftime('%Y-%m', Issue.resolved_at)
+        resolved_query = db.session.query(resolved_month, func.count(Issue.id)).filter(
+            Issue.status == 'resolved',
+            Issue.resolved_at >= first_month
+        )
+        if user_id is not None:
+            resolved_query = resolved_query.filter(Issue.user_id == user_id)
+        resolved = dict(resolved_query.group_by(resolved_month).all())
+
+        labels = [shift_month(first_month, offset).strftime('%Y-%m') for offset in range(months)]
+        return {
+            'labels': labels,
+            'created': [created.get(month, (0, 0))[0] for month in labels],
+            'resolved_of_created': [created.get(month, (0, 0))[1] for month in labels],
+            'resolution_rate': [
+                round(created[month][1] / created[month][0], 3) if month in created else None
+                for month in labels
+            ],
+            'resolved': [resolved.get(month, 0) for month in labels]
+        }
@@ -2,11 +2,26 @@ from datetime import datetime, timezone
 from models.task import beijing_now
 from typing import List, Dict, Optional, Any
 import json
-from models import db, Issue
+from models import db, Issue, IssueSignature
+from config import Config
+from services.analytics_cache import analytics_cache
+from services.search_service import SearchService
+from services.similar_issue_index import similar_issue_index
+from services.pagination import keyset_page, DEFAULT_PAGE_SIZE
 
 class IssueService:
     """问题服务类"""
     
+    @staticmethod
+    def _store_signature(issue: Issue):
+        """计算问题的MinHash签名并写入签名表（问题需已有ID），返回签名，没有有效文本时删除签名行并返回None"""
+        signature = similar_issue_index.signature(issue.title, issue.description)
+        if signature is None:
+            IssueSignature.query.filter_by(issue_id=issue.id).delete()
+        else:
+            db.session.merge(IssueSignature(issue_id=issue.id, user_id=issue.user_id, signature=signature.tobytes()))
+        return signature
+    
     @staticmethod
     def get_open_issues(user_id: Optional[int] = None) -> List[Dict[str, Any]]:
         """获取所有开放的问题"""
@@ -32,7 +47,12 @@ class IssueService:
         )
         
         db.session.add(issue)
+        db.session.flush()
+        SearchService.index_issue(issue)
+        IssueService._store_signature(issue)
         db.session.commit()
+        analytics_cache.bump_user_version(user_id)
+        similar_issue_index.invalidate(user_id)
         return issue
     
     @staticmethod
@@ -45,6 +65,7 @@ class IssueService:
         issue.status = 'resolved'
         issue.resolved_at = beijing_now()
         db.session.commit()
+        analytics_cache.bump_user_version(issue.user_id)
         return True
     
     @staticmethod
@@ -54,8 +75,13 @@ class IssueService:
         if not issue:
             return False
         
+        user_id = issue.user_id
+        SearchService.remove('issue', issue_id)
+        IssueSignature.query.filter_by(issue_id=issue_id).delete()
         db.session.delete(issue)
         db.session.commit()
+        analytics_cache.bump_user_version(user_id)
+        similar_issue_index.invalidate(user_id)
         return True
     
     @staticmethod
@@ -76,6 +102,7 @@ class IssueService:
         
         # 更新数据库
         issue.solutions = json.dumps(solutions, ensure_ascii=False)
+        SearchService.index_issue(issue)
         db.session.commit()
         return True
     
@@ -109,6 +136,26 @@ class IssueService:
             query = query.filter_by(user_id=user_id)
         issues = query.order_by(Issue.created_at.desc()).all()
         return [issue.to_dict() for issue in issues]
+    
+    @staticmethod
+    def get_issues_page(user_id: Optional[int] = None, limit: int = DEFAULT_PAGE_SIZE,
+                        cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        按创建时间倒序分页获取问题
+        
+        Args:
+            user_id: 用户ID
+            limit: 每页条数
+            cursor: 上一页返回的next_cursor，为空表示第一页
+        
+        Raises:
+            ValueError: 游标无效
+        """
+        query = Issue.query
+        if user_id is not None:
+            query = query.filter_by(user_id=user_id)
+        issues, next_cursor = keyset_page(query, (Issue.created_at, Issue.id), cursor, limit)
+        return {'issues': [issue.to_dict() for issue in issues], 'next_cursor': next_cursor}
         
     @staticmethod
     def update_issue(issue_id: int, data: Dict[str, Any]) -> bool:
@@ -124,6 +171,77 @@ class IssueService:
             issue.description = data['description']
         if 'priority' in data:
             issue.priority = data['priority']
+        text_changed = 'title' in data or 'description' in data
+        if text_changed:
+            SearchService.index_issue(issue)
+            IssueService._store_signature(issue)
             
         db.session.commit()
-        return True
\ No newline at end of file
+        analytics_cache.bump_user_version(issue.user_id)
+        if text_changed:
+            similar_issue_index.invalidate(issue.user_id)
+        return True
+    
+    @staticmethod
+    def find_similar_issues(user_id: Optional[int], title: str, description: Optional[str] = None,
+                            exclude_issue_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        查找该用户标题和描述与给定文本近似重复的问题
+        
+        通过LSH索引取得候选问题，只读取候选问题的行；已解决且有成功解决方案的问题排在前面，
+        其余按估计相似度排序。
+        
+        Args:
+            user_id: 用户ID
+            title: 问题标题
+            description: 问题描述
+            exclude_issue_id: 需要排除的问题ID（新建问题时排除其自身）
+        
+        Returns:
+            问题列表，每项包含id、title、status、successful_solution和similarity
+        """
+        signature = similar_issue_index.signature(title, description)
+        if signature is None:
+            return []
+        matches = similar_issue_index.find(user_id, signature, Config.ISSUE_SIMILARITY_THRESHOLD, exclude_issue_id)
+        if not matches:
+            return []
+        
+        scores = dict(matches)
+        # 再次按用户过滤，签名表或索引中残留的其他用户的问题不会被返回
+        issues = Issue.query.filter(Issue.id.in_(scores), Issue.user_id == user_id).all()
+        issues.sort(key=lambda issue: (
+            not (issue.status == 'resolved' and issue.successful_solution),
+            -scores[issue.id],
+            -issue.id
+        ))
+        return [
+            {
+                'id': issue.id,
+                'title': issue.title,
+                'status': issue.status,
+                'successful_solution': issue.successful_solution,
+                'similarity': round(scores[issue.id], 3)
+            }
+            for issue in issues[:Config.ISSUE_SIMILARITY_LIMIT]
+        ]
+    
+    @staticmethod
+    def rebuild_signatures(batch_size: int = 1000) -> int:
+        """
+        根据现有问题重建签名表并提交
+        
+        Returns:
+            写入的签名数
+        """
+        IssueSignature.query.delete()
+        rows = []
+        query = db.session.query(Issue.id, Issue.user_id, Issue.title, Issue.description).order_by(Issue.id)
+        for issue_id, user_id, title, description in query.yield_per(batch_size):
+            signature = similar_issue_index.signature(title, description)
+            if signature is not None:
+                rows.append(IssueSignature(issue_id=issue_id, user_id=user_id, signature=signature.tobytes()))
+        db.session.add_all(rows)
+        db.session.commit()
+        similar_issue_index.clear()
+        return len(rows)
\ No newline at end of file
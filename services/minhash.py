@@ -0,0 +1,115 @@
+import re
+import zlib
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+import numpy as np
+
+# 哈希取模使用的梅森素数，签名值小于2^31，可以用uint32保存
+_PRIME = (1 << 31) - 1
+
+# 生成签名前去掉的字符：空白和常见中英文标点
+_STRIP_RE = re.compile(r'[\s\W_]+')
+
+
+def shingles(text: str, size: int = 2) -> Set[str]:
+    """
+    把文本切分为字符shingle集合
+
+    先转小写并去掉空白和标点，再取所有长度为size的连续子串；文本短于size时整体作为一个shingle。
+    字符级切分不依赖分词，对中文和中英混排同样适用。
+    """
+    normalized = _STRIP_RE.sub('', (text or '').lower())
+    if not normalized:
+        return set()
+    if len(normalized) <= size:
+        return {normalized}
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+class MinHasher:
+    """MinHash签名生成器
+
+    用num_perm个形如(a*x+b) mod p的哈希函数模拟随机排列，签名的每一位是shingle哈希值
+    在对应哈希函数下的最小值。两个集合签名中相等位的比例是其Jaccard相似度的无偏估计。
+    哈希函数由固定种子生成，签名可以持久化并在进程重启后继续使用。
+    """
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self._a = rng.randint(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, items: Iterable[str]) -> Optional[np.ndarray]:
+        """计算集合的签名，集合为空时返回None"""
+        # crc32在不同进程间稳定（内置hash会随进程随机化）
+        hashes = np.fromiter((zlib.crc32(item.encode('utf-8')) % _PRIME for item in items), dtype=np.uint64)
+        if not len(hashes):
+            return None
+        # a、b、x都小于2^31，乘积与和不会超出uint64
+        values = (np.outer(hashes, self._a) + self._b) % _PRIME
+        return values.min(axis=0).astype(np.uint32)
+
+    @staticmethod
+    def similarity(first: np.ndarray, second: np.ndarray) -> float:
+        """根据两个签名估计Jaccard相似度"""
+        return float(np.count_nonzero(first == second)) / len(first)
+
+
+class LSHIndex:
+    """MinHash签名的局部敏感哈希（LSH）索引
+
+    把签名分成bands段，每段rows位；两个签名只要有一段完全相同就成为候选。
+    Jaccard相似度为s的两项成为候选的概率为1-(1-s^rows)^bands，
+    16段×4位时相似度0.5附近的概率约为一半，0.8以上几乎必然命中，0.3以下很少命中。
+    查询只需计算bands次字典查找，与索引中的条目数无关。
+    """
+
+    def __init__(self, bands: int = 16, rows: int = 4):
+        self.bands = bands
+        self.rows = rows
+        self._buckets: List[Dict[bytes, Set[Hashable]]] = [{} for _ in range(bands)]
+        self._signatures: Dict[Hashable, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def add(self, key: Hashable, signature: np.ndarray) -> None:
+        """加入或替换一个签名"""
+        self.remove(key)
+        self._signatures[key] = signature
+        for buckets, band_key in zip(self._buckets, self._keys(signature)):
+            buckets.setdefault(band_key, set()).add(key)
+
+    def remove(self, key: Hashable) -> None:
+        """移除一个签名，不存在时忽略"""
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for buckets, band_key in zip(self._buckets, self._keys(signature)):
+            bucket = buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del buckets[band_key]
+
+    def query(self, signature: np.ndarray, threshold: float = 0.0) -> List[Tuple[Hashable, float]]:
+        """
+        查找候选项并按估计相似度从高到低返回
+
+        Args:
+            signature: 查询签名
+            threshold: 估计相似度下限，低于该值的候选项被过滤
+        """
+        candidates = set()
+        for buckets, band_key in zip(self._buckets, self._keys(signature)):
+            candidates.update(buckets.get(band_key, ()))
+        result = []
+        for key in candidates:
+            score = MinHasher.similarity(signature, self._signatures[key])
+            if score >= threshold:
+                result.append((key, score))
+        result.sort(key=lambda item: item[1], reverse=True)
+        return result
@@ -0,0 +1,71 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+from sqlalchemy import DateTime, literal, tuple_
+
+# 默认和最大每页条数
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """把排序键的值编码为不透明的游标字符串"""
+    payload = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    """
+    解码游标字符串，时间列的值转换回datetime
+
+    Raises:
+        ValueError: 游标无效
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError('无效的分页游标') from e
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError('无效的分页游标')
+    return [
+        datetime.fromisoformat(value) if isinstance(column.type, DateTime) and value is not None else value
+        for column, value in zip(columns, values)
+    ]
+
+
+def keyset_page(query, columns: Sequence[Any], cursor: Optional[str], limit: Optional[int]) -> Tuple[list, Optional[str]]:
+    """
+    按排序键倒序读取一页（键集分页）
+
+    以上一页最后一行的排序键作为游标，用行值比较定位下一页的起点，
+    配合以同样列结尾的索引，任意深度的翻页成本都与第一页相同。
+
+    Args:
+        query: 已加过滤条件的查询
+        columns: 排序键列，最后一列应唯一（通常为主键）
+        cursor: 上一页返回的游标，为空表示第一页
+        limit: 每页条数，为None时读取游标之后的全部行
+
+    Returns:
+        (本页的行, 下一页游标)，没有下一页时游标为None
+
+    Raises:
+        ValueError: 游标无效
+    """
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        query = query.filter(
+            tuple_(*columns) < tuple_(*[literal(value, column.type) for column, value in zip(columns, values)])
+        )
+    query = query.order_by(*[column.desc() for column in columns])
+    if limit is None:
+        return query.all(), None
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([getattr(rows[-1], column.key) for column in columns])
+    return rows, next_cursor
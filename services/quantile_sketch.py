@@ -0,0 +1,106 @@
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+class KLLSketch:
+    """KLL分位数草图
+
+    以分层压缩器保存样本：第h层的每个元素代表2^h个原始值。
+    某层超出容量时排序并隔一取一提升到上一层，因此空间为O(k)，
+    可增量更新、可合并，并能序列化为JSON存入数据库。
+    样本数不超过k时不做压缩，结果为精确值。
+    """
+
+    def __init__(self, k: int = 200, compactors: Optional[List[List[float]]] = None,
+                 n: int = 0, offsets: Optional[List[int]] = None):
+        self.k = k
+        self.compactors = compactors or [[]]
+        self.n = n
+        # 每层交替选择奇偶位置，保持结果确定且无偏
+        self.offsets = offsets or [0] * len(self.compactors)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.compactors) - level - 1
+        return max(2, int(self.k * (2 / 3) ** depth))
+
+    def _size(self) -> int:
+        return sum(len(compactor) for compactor in self.compactors)
+
+    def _max_size(self) -> int:
+        return sum(self._capacity(level) for level in range(len(self.compactors)))
+
+    def update(self, value: float) -> None:
+        """加入一个样本"""
+        self.compactors[0].append(value)
+        self.n += 1
+        if self._size() > self._max_size():
+            self._compress()
+
+    def extend(self, values: Iterable[float]) -> None:
+        """批量加入样本"""
+        for value in values:
+            self.update(value)
+
+    def _compress(self) -> None:
+        while self._size() > self._max_size():
+            for level in range(len(self.compactors)):
+                if len(self.compactors[level]) >= self._capacity(level):
+                    if level + 1 == len(self.compactors):
+                        self.compactors.append([])
+                        self.offsets.append(0)
+                    items = sorted(self.compactors[level])
+                    # 长度为奇数时保留一个元素在当前层
+                    keep = [items.pop()] if len(items) % 2 else []
+                    offset = self.offsets[level]
+                    self.offsets[level] = 1 - offset
+                    self.compactors[level + 1].extend(items[offset::2])
+                    self.compactors[level] = keep
+                    break
+
+    def merge(self, other: 'KLLSketch') -> None:
+        """合并另一个草图"""
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append([])
+            self.offsets.append(0)
+        for level, compactor in enumerate(other.compactors):
+            self.compactors[level].extend(compactor)
+        self.n += other.n
+        self._compress()
+
+    def quantile(self, q: float) -> Optional[float]:
+        """返回分位数q（0~1）的近似值（按加权秩取最近值），没有样本时返回None"""
+        weighted = sorted(
+            (value, 2 ** level)
+            for level, compactor in enumerate(self.compactors)
+            for value in compactor
+        )
+        if not weighted:
+            return None
+        total = sum(weight for _, weight in weighted)
+        target = q * total
+        cumulative = 0
+        for value, weight in weighted:
+            cumulative += weight
+            if cumulative >= target:
+                return value
+        return weighted[-1][0]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典格式"""
+        return {'k': self.k, 'n': self.n, 'compactors': self.compactors, 'offsets': self.offsets}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
+
+    @classmethod
+    def from_json(cls, data: Optional[str]) -> 'KLLSketch':
+        """从JSON字符串恢复草图，内容为空或无效时返回空草图"""
+        try:
+            values = json.loads(data) if data else {}
+        except (json.JSONDecodeError, TypeError):
+            values = {}
+        return cls(
+            k=values.get('k', 200),
+            compactors=values.get('compactors'),
+            n=values.get('n', 0),
+            offsets=values.get('offsets')
+        )
@@ -0,0 +1,219 @@
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy import insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from models import db, Task, TaskDailyRollup, TaskDurationSketch
+from models.task import beijing_now
+from services.quantile_sketch import KLLSketch
+from services.time_utils import to_naive
+
+class RollupService:
+    """任务每日完成汇总服务类
+
+    汇总行和完成时长草图在任务完成、取消完成和删除时与业务写入处于同一事务中更新，
+    调用方负责提交。
+    """
+
+    @staticmethod
+    def _upsert(model, key: Dict[str, Any], values: Dict[str, Any], updates: Dict[str, Any]) -> None:
+        """
+        按唯一键插入一行，键已存在时改为更新（INSERT ... ON CONFLICT DO UPDATE）
+
+        先查询再插入时，并发写入同一个键的两个请求都会插入，后提交的违反唯一约束；
+        upsert在一条语句中处理冲突。SQLite的唯一约束中NULL互不相等，没有用户的行不会触发冲突，
+        这些行先按键更新，没有更新到行时再插入。
+
+        Args:
+            model: 模型类
+            key: 唯一键的列值，必须包含user_id
+            values: 插入时其余列的值
+            updates: 键已存在时更新的列，值可以是引用当前列值的SQL表达式
+        """
+        if key['user_id'] is None:
+            conditions = [getattr(model, name).is_(None) if value is None else getattr(model, name) == value
+                          for name, value in key.items()]
+            if not db.session.query(model).filter(*conditions).update(updates, synchronize_session=False):
+                db.session.execute(insert(model).values(**key, **values))
+            return
+        statement = sqlite_insert(model).values(**key, **values)
+        db.session.execute(statement.on_conflict_do_update(index_elements=list(key), set_=updates))
+
+    @staticmethod
+    def _increment(user_id: Optional[int], day: date, task_type: str, **deltas: int) -> None:
+        """把计数增量累加到指定键的汇总行，行不存在时插入；累加在数据库中完成，并发更新不会丢失计数"""
+        values = {column: deltas.get(column, 0)
+                  for column in ('completed_count', 'total_elapsed_days', 'elapsed_count', 'deleted_count')}
+        RollupService._upsert(
+            TaskDailyRollup,
+            {'user_id': user_id, 'day': day, 'task_type': task_type},
+            values,
+            {column: getattr(TaskDailyRollup, column) + delta for column, delta in deltas.items()}
+        )
+
+    @staticmethod
+    def _duration_days(created_at: Optional[datetime], completed_at: Optional[datetime]) -> Optional[int]:
+        """处理时长（天）：结束日期-开始日期+1日，时间无效时返回None"""
+        created_at = to_naive(created_at)
+        completed_at = to_naive(completed_at)
+        if created_at is None or completed_at is None or completed_at < created_at:
+            return None
+        return (completed_at - created_at).days + 1
+
+    @staticmethod
+    def _save_sketch(user_id: Optional[int], task_type: str, sketch: KLLSketch) -> None:
+        """保存指定用户和任务类型的草图"""
+        values = {'sketch': sketch.to_json(), 'updated_at': beijing_now()}
+        RollupService._upsert(TaskDurationSketch, {'user_id': user_id, 'task_type': task_type}, values, values)
+
+    @staticmethod
+    def _add_duration(task: Task, completed_at: Optional[datetime]) -> None:
+        """
+        把一次完成的处理时长加入草图
+
+        调用前已在同一事务中写入汇总行并取得数据库写锁，其他请求无法在读取和保存之间提交草图。
+        只读取草图列，不经过会话的对象缓存，同一事务中多次更新时读到的是上一次保存的结果。
+        """
+        duration = RollupService._duration_days(task.created_at, completed_at)
+        if duration is None:
+            return
+        row = db.session.query(TaskDurationSketch.sketch).filter(
+            TaskDurationSketch.user_id == task.user_id,
+            TaskDurationSketch.task_type == task.task_type
+        ).first()
+        sketch = KLLSketch.from_json(row[0] if row else None)
+        sketch.update(duration)
+        RollupService._save_sketch(task.user_id, task.task_type, sketch)
+
+    @staticmethod
+    def _rebuild_sketch(user_id: Optional[int], task_type: str, exclude_task_id: Optional[int] = None) -> None:
+        """草图不支持删除样本，样本移除时重建该用户该类型的草图"""
+        query = db.session.query(Task.created_at, Task.completed_at).filter(
+            Task.user_id == user_id,
+            Task.task_type == task_type,
+            Task.status == 'completed'
+        )
+        if exclude_task_id is not None:
+            query = query.filter(Task.id != exclude_task_id)
+        sketch = KLLSketch()
+        for created_at, completed_at in query.yield_per(1000):
+            duration = RollupService._duration_days(created_at, completed_at)
+            if duration is not None:
+                sketch.update(duration)
+        RollupService._save_sketch(user_id, task_type, sketch)
+
+    @staticmethod
+    def _completion_key(task: Task, completed_at: Optional[datetime]) -> Optional[Tuple[date, Optional[int]]]:
+        """返回完成日期和完成耗时天数，没有完成时间时返回None"""
+        completed_at = to_naive(completed_at)
+        if completed_at is None:
+            return None
+        created_at = to_naive(task.created_at)
+        elapsed_days = (completed_at - created_at).days if created_at else None
+        return completed_at.date(), elapsed_days
+
+    @staticmethod
+    def record_completion(task: Task, completed_at: Optional[datetime], delta: int = 1) -> None:
+        """
+        记录任务进入（delta=1）或离开（delta=-1）已完成状态
+
+        Args:
+            task: 任务对象
+            completed_at: 该次完成对应的完成时间
+            delta: 计数变化量
+        """
+        key = RollupService._completion_key(task, completed_at)
+        if key is None:
+            return
+        day, elapsed_days = key
+
+        deltas = {'completed_count': delta}
+        if elapsed_days is not None:
+            deltas.update(total_elapsed_days=delta * elapsed_days, elapsed_count=delta)
+        RollupService._increment(task.user_id, day, task.task_type, **deltas)
+
+        if delta > 0:
+            RollupService._add_duration(task, completed_at)
+        else:
+            RollupService._rebuild_sketch(task.user_id, task.task_type, exclude_task_id=task.id)
+
+    @staticmethod
+    def record_deletion(task: Task) -> None:
+        """记录任务删除；已完成任务同时从完成汇总中扣除"""
+        if task.status == 'completed':
+            RollupService.record_completion(task, task.completed_at, delta=-1)
+
+        RollupService._increment(task.user_id, to_naive(beijing_now()).date(), task.task_type, deleted_count=1)
+
+    @staticmethod
+    def rebuild(chunk_size: int = 1000) -> int:
+        """
+        根据现有任务分批重建完成汇总和完成时长草图
+
+        删除计数无法从任务表恢复，因此会被保留。
+
+        Args:
+            chunk_size: 每批读取的任务数
+
+        Returns:
+            重建后的汇总行数
+        """
+        totals: Dict[Tuple[Optional[int], date, str], list] = {}
+        sketches: Dict[Tuple[Optional[int], str], KLLSketch] = {}
+        last_id = 0
+        while True:
+            rows = db.session.query(
+                Task.id, Task.user_id, Task.task_type, Task.created_at, Task.completed_at
+            ).filter(
+                Task.id > last_id,
+                Task.status == 'completed',
+                Task.completed_at.isnot(None)
+            ).order_by(Task.id).limit(chunk_size).all()
+            if not rows:
+                break
+
+            for task_id, user_id, task_type, created_at, completed_at in rows:
+                entry = totals.setdefault((user_id, completed_at.date(), task_type), [0, 0, 0])
+                entry[0] += 1
+                if created_at is not None:
+                    entry[1] += (completed_at - created_at).days
+                    entry[2] += 1
+                duration = RollupService._duration_days(created_at, completed_at)
+                if duration is not None:
+                    sketches.setdefault((user_id, task_type), KLLSketch()).update(duration)
+            last_id = rows[-1][0]
+
+        # 清零已有的完成计数，保留删除计数
+        TaskDailyRollup.query.update({
+            TaskDailyRollup.completed_count: 0,
+            TaskDailyRollup.total_elapsed_days: 0,
+            TaskDailyRollup.elapsed_count: 0
+        }, synchronize_session=False)
+        db.session.expire_all()
+
+        existing = {
+            (rollup.user_id, rollup.day, rollup.task_type): rollup
+            for rollup in TaskDailyRollup.query.all()
+        }
+        for key, (completed_count, total_elapsed_days, elapsed_count) in totals.items():
+            rollup = existing.get(key)
+            if rollup is None:
+                rollup = TaskDailyRollup(user_id=key[0], day=key[1], task_type=key[2], deleted_count=0)
+                db.session.add(rollup)
+            rollup.completed_count = completed_count
+            rollup.total_elapsed_days = total_elapsed_days
+            rollup.elapsed_count = elapsed_count
+        db.session.flush()
+
+        # 删除已无任何计数的汇总行
+        TaskDailyRollup.query.filter(
+            TaskDailyRollup.completed_count == 0,
+            TaskDailyRollup.deleted_count == 0
+        ).delete(synchronize_session=False)
+
+        # 草图整体替换
+        TaskDurationSketch.query.delete(synchronize_session=False)
+        for (user_id, task_type), sketch in sketches.items():
+            db.session.add(TaskDurationSketch(user_id=user_id, task_type=task_type, sketch=sketch.to_json()))
+
+        db.session.commit()
+        return TaskDailyRollup.query.count()
@@ -0,0 +1,230 @@
+import html
+import json
+import re
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy import text
+from models import db, Task, Issue, TaskReviewComment
+from models.search_index import SEARCH_INDEX_TABLE
+
+# 中日韩统一表意文字（基本区、扩展A区和兼容区）
+_CJK = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+# 连续的中文字符，或由字母数字组成的词（不含中文）
+_TOKEN_RE = re.compile(f'([{_CJK}]+)|((?:(?![{_CJK}])[^\\W_])+)')
+
+# 检索结果类型及其在rowid中的编码：rowid = 原记录ID * 4 + 类型编码，
+# 写入时可以按rowid直接定位并替换索引行，无需扫描不索引的列
+SEARCH_KINDS = {'task': 1, 'issue': 2, 'comment': 3}
+_KIND_NAMES = {code: kind for kind, code in SEARCH_KINDS.items()}
+
+# bm25各列权重（与建表列顺序一致），标题匹配的权重高于正文
+_BM25_WEIGHTS = '0, 0, 0, 0, 10.0, 1.0'
+
+# 摘要长度（字符）
+SNIPPET_LENGTH = 80
+
+
+def _rowid(kind: str, ref_id: int) -> int:
+    return ref_id * 4 + SEARCH_KINDS[kind]
+
+
+def _owner_token(user_id: Optional[int]) -> str:
+    return f'u{user_id}' if user_id is not None else 'unone'
+
+
+def tokenize(value: Optional[str]) -> str:
+    """
+    把文本转换为写入索引的词序列
+
+    unicode61分词器会把一段连续的中文当作一个词，因此先在Python中切分：
+    中文按相邻两字切分为二元词，并补上末尾单字，使任意单字都能以前缀查询命中；
+    字母数字词转为小写原样保留。
+    """
+    tokens = []
+    for cjk, word in _TOKEN_RE.findall(value or ''):
+        if cjk:
+            tokens.extend(cjk[i:i + 2] for i in range(len(cjk) - 1))
+            tokens.append(cjk[-1])
+        else:
+            tokens.append(word.lower())
+    return ' '.join(tokens)
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    把用户输入转换为FTS5查询表达式，各词之间为AND关系
+
+    中文词转换为二元词组成的短语（要求相邻出现），单个汉字和字母数字词使用前缀查询。
+    没有可检索的词时返回None。
+    """
+    terms = []
+    for cjk, word in _TOKEN_RE.findall(query):
+        if cjk and len(cjk) > 1:
+            terms.append('"' + ' '.join(cjk[i:i + 2] for i in range(len(cjk) - 1)) + '"')
+        else:
+            terms.append(f'"{(cjk or word).lower()}"*')
+    if not terms:
+        return None
+    return ' AND '.join(terms)
+
+
+def _snippet(value: str, terms: List[str]) -> str:
+    """截取第一个命中词附近的文本，用<mark>标记命中词，其余文本转义HTML"""
+    lowered = value.lower()
+    positions = [lowered.find(term) for term in terms if term in lowered]
+    start = max(min(positions) - SNIPPET_LENGTH // 4, 0) if positions else 0
+    excerpt = value[start:start + SNIPPET_LENGTH]
+
+    # 在原始文本上定位命中区间，再分段转义，避免匹配到转义后的HTML实体
+    parts = []
+    position = 0
+    if terms:
+        pattern = re.compile('|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+        for match in pattern.finditer(excerpt):
+            parts.append(html.escape(excerpt[position:match.start()]))
+            parts.append(f'<mark>{html.escape(match.group(0))}</mark>')
+            position = match.end()
+    parts.append(html.escape(excerpt[position:]))
+
+    prefix = '…' if start > 0 else ''
+    suffix = '…' if start + SNIPPET_LENGTH < len(value) else ''
+    return prefix + ''.join(parts) + suffix
+
+
+class SearchService:
+    """全文检索服务类
+
+    基于SQLite FTS5虚拟表检索任务标题和描述、问题标题、描述和解决方案以及复盘评论。
+    索引行与业务数据在同一事务中写入，由各服务在写操作提交前调用对应的index/remove方法维护。
+    """
+
+    @staticmethod
+    def _upsert(kind: str, ref_id: int, user_id: Optional[int], title: str, body: str,
+                title_tokens: str, task_id: Optional[int] = None) -> None:
+        rowid = _rowid(kind, ref_id)
+        db.session.execute(text(f'DELETE FROM {SEARCH_INDEX_TABLE} WHERE rowid = :rowid'), {'rowid': rowid})
+        db.session.execute(
+            text(f'INSERT INTO {SEARCH_INDEX_TABLE} '
+                 '(rowid, task_id, title, body, owner, title_tokens, body_tokens) '
+                 'VALUES (:rowid, :task_id, :title, :body, :owner, :title_tokens, :body_tokens)'),
+            {
+                'rowid': rowid,
+                'task_id': task_id,
+                'title': title,
+                'body': body,
+                'owner': _owner_token(user_id),
+                'title_tokens': title_tokens,
+                'body_tokens': tokenize(body)
+            }
+        )
+
+    @staticmethod
+    def index_task(task: Task) -> None:
+        """写入或更新任务的索引行（任务需已有ID）"""
+        SearchService._upsert('task', task.id, task.user_id, task.title, task.description or '',
+                              tokenize(task.title), task_id=task.id)
+
+    @staticmethod
+    def index_issue(issue: Issue) -> None:
+        """写入或更新问题的索引行，解决方案并入正文"""
+        try:
+            solutions = json.loads(issue.solutions) if issue.solutions else []
+        except (json.JSONDecodeError, TypeError):
+            solutions = []
+        body = '\n'.join([issue.description or ''] + [str(solution) for solution in solutions])
+        SearchService._upsert('issue', issue.id, issue.user_id, issue.title, body, tokenize(issue.title))
+
+    @staticmethod
+    def index_comment(comment: TaskReviewComment, task: Task) -> None:
+        """写入复盘评论的索引行，结果标题使用所属任务的标题（标题不参与检索）"""
+        SearchService._upsert('comment', comment.id, task.user_id, task.title, comment.content, '',
+                              task_id=task.id)
+
+    @staticmethod
+    def remove(kind: str, ref_id: int) -> None:
+        """删除一条索引行"""
+        db.session.execute(text(f'DELETE FROM {SEARCH_INDEX_TABLE} WHERE rowid = :rowid'),
+                           {'rowid': _rowid(kind, ref_id)})
+
+    @staticmethod
+    def remove_task(task_id: int) -> None:
+        """删除任务及其复盘评论的索引行，需在删除评论之前调用"""
+        comment_ids = [row[0] for row in db.session.query(TaskReviewComment.id).filter_by(task_id=task_id)]
+        for ref_id in comment_ids:
+            SearchService.remove('comment', ref_id)
+        SearchService.remove('task', task_id)
+
+    @staticmethod
+    def remove_user(user_id: int) -> None:
+        """删除用户的全部索引行，需在删除用户的同一事务中调用
+
+        检索只按owner令牌限定范围，而用户ID可能被之后注册的用户复用，
+        不删除会让新用户检索到已删除用户的数据。
+        """
+        db.session.execute(text(f'DELETE FROM {SEARCH_INDEX_TABLE} WHERE {SEARCH_INDEX_TABLE} MATCH :match'),
+                           {'match': f'owner : "{_owner_token(user_id)}"'})
+
+    @staticmethod
+    def rebuild(batch_size: int = 1000) -> int:
+        """
+        根据现有数据重建全文检索索引并提交
+
+        Returns:
+            写入的索引行数
+        """
+        db.session.execute(text(f'DELETE FROM {SEARCH_INDEX_TABLE}'))
+        count = 0
+        for task in Task.query.order_by(Task.id).yield_per(batch_size):
+            SearchService.index_task(task)
+            count += 1
+        for issue in Issue.query.order_by(Issue.id).yield_per(batch_size):
+            SearchService.index_issue(issue)
+            count += 1
+        comments = db.session.query(TaskReviewComment, Task).join(Task, Task.id == TaskReviewComment.task_id)
+        for comment, task in comments.order_by(TaskReviewComment.id).yield_per(batch_size):
+            SearchService.index_comment(comment, task)
+            count += 1
+        db.session.commit()
+        return count
+
+    @staticmethod
+    def search(user_id: Optional[int], query: str, kinds: Optional[Iterable[str]] = None,
+               limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        检索用户自己的任务、问题和复盘评论，按bm25相关度排序
+
+        Args:
+            user_id: 用户ID，只返回该用户的数据
+            query: 用户输入的检索词，多个词之间为AND关系
+            kinds: 结果类型（task、issue、comment），为空时检索全部类型
+            limit: 最多返回的结果数
+
+        Returns:
+            结果列表，每项包含type、id、task_id、title、snippet和score，snippet为带<mark>标记的HTML
+        """
+        terms = build_match_query(query)
+        if terms is None:
+            return []
+        match = f'owner : "{_owner_token(user_id)}" AND {{title_tokens body_tokens}} : ({terms})'
+
+        sql = (f'SELECT rowid, task_id, title, body, bm25({SEARCH_INDEX_TABLE}, {_BM25_WEIGHTS}) AS score '
+               f'FROM {SEARCH_INDEX_TABLE} WHERE {SEARCH_INDEX_TABLE} MATCH :match')
+        params: Dict[str, Any] = {'match': match, 'limit': limit}
+        if kinds:
+            codes = sorted({SEARCH_KINDS[kind] for kind in kinds})
+            sql += f' AND rowid % 4 IN ({", ".join(str(code) for code in codes)})'
+        sql += ' ORDER BY score LIMIT :limit'
+
+        highlight = [value.lower() for pair in _TOKEN_RE.findall(query) for value in pair if value]
+        results = []
+        for rowid, task_id, title, body, score in db.session.execute(text(sql), params):
+            results.append({
+                'type': _KIND_NAMES[rowid % 4],
+                'id': rowid // 4,
+                'task_id': task_id,
+                'title': title,
+                'snippet': _snippet(body if any(term in (body or '').lower() for term in highlight) else title,
+                                    highlight),
+                # bm25越小越相关，取反后越大越相关
+                'score': round(-score, 4)
+            })
+        return results
@@ -0,0 +1,98 @@
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import func
+from models import db, IssueSignature
+from services.minhash import MinHasher, LSHIndex, shingles
+
+# MinHash签名位数，LSH分段数×每段位数必须等于签名位数
+ISSUE_MINHASH_PERMUTATIONS = 64
+ISSUE_LSH_BANDS = 16
+ISSUE_LSH_ROWS = 4
+
+# 字符shingle长度
+ISSUE_SHINGLE_SIZE = 2
+
+
+class SimilarIssueIndex:
+    """相似问题索引
+
+    问题的标题和描述按字符shingle计算MinHash签名，签名保存在issue_signatures表中，
+    每个用户一个LSH索引，查询时直接从签名表加载（无需重新读取文本和计算签名）。
+    索引保存在进程内存中，其他进程的写入不会通知本进程，因此每次查询前先读取该用户
+    签名的数据版本（签名数和最后更新时间），版本变化时重新加载；本进程的写入还会由
+    IssueService直接使该用户的索引失效。
+    """
+
+    def __init__(self):
+        self.hasher = MinHasher(ISSUE_MINHASH_PERMUTATIONS)
+        self._indexes: Dict[Optional[int], Tuple[Tuple[Any, Any], LSHIndex]] = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        """应用启动时清空索引"""
+        self.clear()
+
+    def signature(self, title: str, description: Optional[str] = None) -> Optional[np.ndarray]:
+        """计算问题标题和描述的签名，没有有效字符时返回None"""
+        text = f'{title or ""}\n{description or ""}'
+        return self.hasher.signature(shingles(text, ISSUE_SHINGLE_SIZE))
+
+    @staticmethod
+    def _data_version(user_id: Optional[int]) -> Tuple[Any, Any]:
+        """
+        读取用户签名的数据版本
+
+        签名的写入都会更新updated_at，删除会减少签名数，两者都不变说明索引仍然有效；
+        查询只读取(user_id, updated_at)索引。
+        """
+        count, last_updated = db.session.query(
+            func.count(IssueSignature.issue_id), func.max(IssueSignature.updated_at)
+        ).filter(IssueSignature.user_id == user_id).one()
+        return count, last_updated
+
+    def _load(self, user_id: Optional[int]) -> LSHIndex:
+        """从签名表构建指定用户的LSH索引"""
+        index = LSHIndex(ISSUE_LSH_BANDS, ISSUE_LSH_ROWS)
+        rows = db.session.query(IssueSignature.issue_id, IssueSignature.signature).filter(
+            IssueSignature.user_id == user_id
+        )
+        for issue_id, signature in rows:
+            index.add(issue_id, np.frombuffer(signature, dtype=np.uint32))
+        return index
+
+    def find(self, user_id: Optional[int], signature: np.ndarray, threshold: float,
+             exclude_issue_id: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        查找与签名相似的问题
+
+        Returns:
+            (问题ID, 估计相似度)列表，按相似度从高到低排序
+        """
+        # 先读版本再加载：加载期间如有写入，保存的版本早于索引的内容，下次查询会再加载一次
+        version = self._data_version(user_id)
+        with self._lock:
+            cached = self._indexes.get(user_id)
+        if cached is not None and cached[0] == version:
+            index = cached[1]
+        else:
+            index = self._load(user_id)
+            with self._lock:
+                self._indexes[user_id] = (version, index)
+
+        with self._lock:
+            matches = index.query(signature, threshold)
+        return [(issue_id, score) for issue_id, score in matches if issue_id != exclude_issue_id]
+
+    def invalidate(self, user_id: Optional[int]) -> None:
+        """问题写入提交后丢弃该用户的索引，下次查询时重新加载"""
+        with self._lock:
+            self._indexes.pop(user_id, None)
+
+    def clear(self) -> None:
+        """丢弃所有用户的索引"""
+        with self._lock:
+            self._indexes.clear()
+
+
+similar_issue_index = SimilarIssueIndex()
@@ -0,0 +1,103 @@
+import json
+import queue
+import threading
+from typing import Any, Dict, Iterator, List, Optional
+
+# 每个订阅者最多积压的事件数，超过后丢弃积压并要求客户端重新同步
+TASK_EVENT_QUEUE_SIZE = 100
+
+class TaskEventHub:
+    """任务变更事件的进程内发布/订阅中心
+
+    每个SSE连接订阅一个队列，TaskService在写入提交后向该用户的所有队列发布事件，
+    其他浏览器标签页据此只更新单个日历事件。发起写入的标签页仍自行增量同步，不依赖推送。
+    订阅保存在进程内存中，多进程部署时各进程只能推送本进程内发生的变更，
+    因此推送接口默认关闭，由TASK_EVENT_STREAM_ENABLED开启。
+    """
+
+    def __init__(self):
+        self.heartbeat = 15
+        self._subscribers: Dict[Optional[int], List[queue.Queue]] = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        """读取心跳间隔配置（TASK_EVENT_HEARTBEAT）并清空订阅"""
+        self.heartbeat = app.config.get('TASK_EVENT_HEARTBEAT', self.heartbeat)
+        with self._lock:
+            self._subscribers.clear()
+
+    def subscribe(self, user_id: Optional[int]) -> queue.Queue:
+        """为指定用户新建一个事件队列"""
+        subscriber = queue.Queue(maxsize=TASK_EVENT_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(user_id, []).append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, user_id: Optional[int], subscriber: queue.Queue) -> None:
+        """移除事件队列"""
+        with self._lock:
+            subscribers = self._subscribers.get(user_id, [])
+            if subscriber in subscribers:
+                subscribers.remove(subscriber)
+            if not subscribers:
+                self._subscribers.pop(user_id, None)
+
+    def subscriber_count(self, user_id: Optional[int]) -> int:
+        """返回指定用户当前的订阅数"""
+        with self._lock:
+            return len(self._subscribers.get(user_id, []))
+
+    def publish(self, user_id: Optional[int], event_type: str, data: Dict[str, Any]) -> None:
+        """
+        向指定用户的所有订阅者发布事件
+
+        Args:
+            user_id: 用户ID
+            event_type: 事件类型，created、updated、deleted或resync
+            data: 事件数据
+        """
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, []))
+        for subscriber in subscribers:
+            self._put(subscriber, {'type': event_type, 'data': data})
+
+    def publish_all(self, event_type: str, data: Dict[str, Any]) -> None:
+        """向所有订阅者发布事件（批量更新无法逐条推送时使用）"""
+        with self._lock:
+            subscribers = [subscriber for items in self._subscribers.values() for subscriber in items]
+        for subscriber in subscribers:
+            self._put(subscriber, {'type': event_type, 'data': data})
+
+    def stream(self, user_id: Optional[int]) -> Iterator[str]:
+        """
+        生成指定用户的SSE消息流
+
+        每个事件输出为一条event: task消息；空闲超过心跳间隔时输出注释行，
+        既保持连接不被代理断开，也能及时发现客户端已断开并取消订阅。
+        """
+        subscriber = self.subscribe(user_id)
+        try:
+            # 客户端断线后3秒重连
+            yield 'retry: 3000\n\n'
+            while True:
+                try:
+                    event = subscriber.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    yield ': heartbeat\n\n'
+                    continue
+                yield f'event: task\ndata: {json.dumps(event, ensure_ascii=False)}\n\n'
+        finally:
+            self.unsubscribe(user_id, subscriber)
+
+    @staticmethod
+    def _put(subscriber: queue.Queue, event: Dict[str, Any]) -> None:
+        """放入事件；客户端消费过慢导致队列已满时，丢弃积压事件改为一条重新同步事件"""
+        try:
+            subscriber.put_nowait(event)
+        except queue.Full:
+            with subscriber.mutex:
+                subscriber.queue.clear()
+            subscriber.put_nowait({'type': 'resync', 'data': {}})
+
+
+task_events = TaskEventHub()
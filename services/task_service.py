@@ -1,20 +1,52 @@
 from datetime import datetime, date, timezone, timedelta
 from typing import List, Dict, Optional, Any
-from models import db, Task, TaskProgressHistory, TaskReviewComment
+from models import db, Task, TaskProgressHistory, TaskReviewComment, TaskTombstone
 from config import Config
 from models.task import beijing_now
+from services.rollup_service import RollupService
+from services.analytics_cache import analytics_cache
+from services.conflict_index import conflict_index
+from services.task_events import task_events
+from services.search_service import SearchService
+from services.time_utils import to_naive
+from services.pagination import keyset_page, encode_cursor, decode_cursor, DEFAULT_PAGE_SIZE
+
+# 增量同步时向令牌之前多取的秒数，覆盖令牌生成时尚未提交的写入
+SYNC_OVERLAP_SECONDS = 5
 
 class TaskService:
     """任务服务类"""
     
     @staticmethod
-    def get_all_tasks(exclude_completed: bool = False, status: str = None, user_id: int = None) -> List[Dict[str, Any]]:
-        """获取所有任务，如果提供user_id则只返回该用户的任务"""
+    def _after_write(user_id: Optional[int], event_type: Optional[str] = None,
+                     data: Optional[Dict[str, Any]] = None) -> None:
+        """
+        任务写入提交后，使该用户的分析缓存和冲突索引失效，并向该用户的订阅者推送变更事件
+        
+        Args:
+            user_id: 用户ID
+            event_type: 事件类型，created、updated或deleted，为空时不推送
+            data: 事件数据，创建和更新为任务字典，删除为{'id': 任务ID}
+        """
+        analytics_cache.bump_user_version(user_id)
+        conflict_index.invalidate(user_id)
+        if event_type:
+            task_events.publish(user_id, event_type, data)
+    
+    @staticmethod
+    def _task_query(exclude_completed: bool = False, status: str = None, user_id: int = None,
+                    start: Optional[date] = None, end: Optional[date] = None):
+        """构造任务列表查询的过滤条件"""
         query = Task.query
         
         if user_id:
             # 如果指定了用户ID，按用户过滤
             query = query.filter_by(user_id=user_id)
+        
+        if end is not None:
+            query = query.filter(Task.start_date < end)
+        if start is not None:
+            query = query.filter(db.func.coalesce(Task.deadline, Task.start_date) >= start)
             
         if status:
             # 如果指定了状态，按状态过滤
@@ -22,10 +54,137 @@ class TaskService:
         elif exclude_completed:
             # 如果排除已完成任务
             query = query.filter(Task.status != 'completed')
+        return query
+    
+    @staticmethod
+    def get_all_tasks(exclude_completed: bool = False, status: str = None, user_id: int = None,
+                      start: Optional[date] = None, end: Optional[date] = None) -> List[Dict[str, Any]]:
+        """
+        获取所有任务，如果提供user_id则只返回该用户的任务
+        
+        Args:
+            start: 时间窗口起始日期（包含）
+            end: 时间窗口结束日期（不包含），与FullCalendar的范围参数一致
         
-        tasks = query.all()
+        提供时间窗口时，只返回[start_date, deadline]区间与窗口重叠的任务；
+        没有截止日期的任务按开始日期当天计算。
+        """
+        tasks = TaskService._task_query(exclude_completed, status, user_id, start, end).all()
         return [task.to_dict() for task in tasks]
     
+    @staticmethod
+    def get_tasks_page(exclude_completed: bool = False, status: str = None, user_id: int = None,
+                       start: Optional[date] = None, end: Optional[date] = None,
+                       limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        按创建时间倒序分页获取任务，过滤条件与get_all_tasks相同
+        
+        Args:
+            limit: 每页条数
+            cursor: 上一页返回的next_cursor，为空表示第一页
+        
+        Raises:
+            ValueError: 游标无效
+        """
+        query = TaskService._task_query(exclude_completed, status, user_id, start, end)
+        tasks, next_cursor = keyset_page(query, (Task.created_at, Task.id), cursor, limit)
+        return {'tasks': [task.to_dict() for task in tasks], 'next_cursor': next_cursor}
+    
+    @staticmethod
+    def sync_token(now: Optional[datetime] = None) -> str:
+        """生成增量同步令牌，客户端以它作为下一次get_changes的since"""
+        return encode_cursor([now or to_naive(beijing_now())])
+    
+    @staticmethod
+    def get_changes(user_id: Optional[int], since: Optional[str] = None,
+                    now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        获取自同步令牌以来新建或更新的任务以及被删除的任务ID
+        
+        令牌编码了服务器时间。为避免与同时提交的写入擦肩而过，查询范围向前多取
+        SYNC_OVERLAP_SECONDS秒，客户端按ID覆盖即可，重复返回没有副作用。
+        没有令牌、或令牌早于删除记录的保留期时返回reset=True，客户端应全量刷新。
+        客户端应先应用deleted再应用changed。
+        
+        Args:
+            user_id: 用户ID
+            since: 上一次返回的next_token
+            now: 当前时间，默认为北京时间
+        
+        Raises:
+            ValueError: 令牌无效
+        """
+        now = now or to_naive(beijing_now())
+        next_token = TaskService.sync_token(now)
+        
+        retention = timedelta(days=Config.TASK_TOMBSTONE_RETENTION_DAYS)
+        since_time = decode_cursor(since, (Task.updated_at,))[0] if since else None
+        if since_time is None or since_time < now - retention:
+            return {'reset': True, 'changed': [], 'deleted': [], 'next_token': next_token}
+        
+        window_start = since_time - timedelta(seconds=SYNC_OVERLAP_SECONDS)
+        changed = Task.query.filter(
+            Task.user_id == user_id,
+            Task.updated_at > window_start
+        ).order_by(Task.updated_at, Task.id).all()
+        deleted = db.session.query(TaskTombstone.task_id).filter(
+            TaskTombstone.user_id == user_id,
+            TaskTombstone.deleted_at > window_start
+        ).order_by(TaskTombstone.deleted_at).all()
+        
+        return {
+            'reset': False,
+            'changed': [task.to_dict() for task in changed],
+            'deleted': [task_id for task_id, in deleted],
+            'next_token': next_token
+        }
+    
+    @staticmethod
+    def prune_tombstones(now: Optional[datetime] = None) -> int:
+        """删除超过保留期的任务删除记录，返回删除的行数"""
+        now = now or to_naive(beijing_now())
+        cutoff = now - timedelta(days=Config.TASK_TOMBSTONE_RETENTION_DAYS)
+        count = TaskTombstone.query.filter(TaskTombstone.deleted_at < cutoff).delete(synchronize_session=False)
+        db.session.commit()
+        return count
+    
+    @staticmethod
+    def promote_overdue_tasks(today: Optional[date] = None) -> int:
+        """
+        将已过截止日期但仍为pending的任务批量更新为in_progress
+        
+        使用一条集合UPDATE语句完成，供定时任务或手动调用。
+        
+        Returns:
+            被更新的任务数量
+        """
+        today = today or date.today()
+        count = Task.query.filter(
+            Task.status == 'pending',
+            Task.deadline.isnot(None),
+            Task.deadline < today
+        ).update({Task.status: 'in_progress', Task.updated_at: beijing_now()}, synchronize_session=False)
+        db.session.commit()
+        if count:
+            analytics_cache.bump_all()
+            # 批量更新无法逐条推送，通知所有客户端增量同步
+            task_events.publish_all('resync', {})
+        return count
+    
+    @staticmethod
+    def find_conflicts(user_id: Optional[int], start_date: date, deadline: Optional[date] = None,
+                       exclude_task_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        查找该用户与给定日期区间重叠的未完成高优先级任务
+        
+        Args:
+            user_id: 用户ID
+            start_date: 开始日期
+            deadline: 截止日期，为空时按开始日期当天计算
+            exclude_task_id: 需要排除的任务ID
+        """
+        return conflict_index.find_conflicts(user_id, start_date, deadline, exclude_task_id)
+    
     @staticmethod
     def get_pending_tasks() -> List[Task]:
         """获取待处理任务"""
@@ -70,7 +229,16 @@ class TaskService:
         )
         
         db.session.add(task)
+        db.session.flush()
+        SearchService.index_task(task)
+        
+        # 直接以已完成状态创建的任务记入完成汇总
+        if task.status == 'completed':
+            task.completed_at = beijing_now()
+            RollupService.record_completion(task, task.completed_at)
+        
         db.session.commit()
+        TaskService._after_write(task.user_id, 'created', task.to_dict())
         return task
     
     @staticmethod
@@ -80,17 +248,29 @@ class TaskService:
         if not task:
             return False
         
+        # 删除任务及其评论的检索索引（需在删除评论之前）
+        SearchService.remove_task(task_id)
+        
         # 1. 先删除任务进度历史记录
         TaskProgressHistory.query.filter_by(task_id=task_id).delete()
         
         # 2. 删除任务评论
         TaskReviewComment.query.filter_by(task_id=task_id).delete()
         
-        # 3. 最后删除任务本身
+        user_id = task.user_id
+        
+        # 3. 记录删除到每日汇总
+        RollupService.record_deletion(task)
+        
+        # 4. 写入删除记录，供增量同步传播删除
+        db.session.add(TaskTombstone(task_id=task_id, user_id=user_id))
+        
+        # 5. 最后删除任务本身
         db.session.delete(task)
         
         # 提交所有更改
         db.session.commit()
+        TaskService._after_write(user_id, 'deleted', {'id': task_id})
         return True
     
     @staticmethod
@@ -100,9 +280,15 @@ class TaskService:
         if not task:
             return False
         
+        # 重复完成时先扣除上一次的完成记录
+        if task.status == 'completed':
+            RollupService.record_completion(task, task.completed_at, delta=-1)
+        
         task.status = 'completed'
         task.completed_at = beijing_now()
+        RollupService.record_completion(task, task.completed_at)
         db.session.commit()
+        TaskService._after_write(task.user_id, 'updated', task.to_dict())
         return True
     
     @staticmethod
@@ -127,9 +313,12 @@ class TaskService:
             
             if new_status != old_status:
                 status_changed = True
+                if old_status == 'completed':
+                    RollupService.record_completion(task, task.completed_at, delta=-1)
                 task.status = new_status
                 if new_status == 'completed':
                     task.completed_at = beijing_now()
+                    RollupService.record_completion(task, task.completed_at)
                 else:
                     task.completed_at = None
         
@@ -166,37 +355,61 @@ class TaskService:
             db.session.add(history)
         
         db.session.commit()
+        TaskService._after_write(task.user_id, 'updated', task.to_dict())
         return {'success': True}
     
     @staticmethod
-    def get_task_history(task_id: int) -> Dict[str, Any]:
-        """获取任务历史"""
+    def get_task_history(task_id: int, limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        按操作时间倒序分页获取任务历史
+        
+        Args:
+            limit: 每页条数，为None时不分页，返回全部记录（旧调用方的行为）
+            cursor: 上一页返回的next_cursor，为空表示第一页
+        
+        Raises:
+            ValueError: 游标无效
+        """
         task = Task.query.get(task_id)
         if not task:
             return {'error': '任务不存在'}
         
-        history_records = TaskProgressHistory.query.filter_by(
-            task_id=task_id
-        ).order_by(TaskProgressHistory.operation_time.desc()).all()
+        history_records, next_cursor = keyset_page(
+            TaskProgressHistory.query.filter_by(task_id=task_id),
+            (TaskProgressHistory.operation_time, TaskProgressHistory.id),
+            cursor, limit
+        )
         
         return {
             'task_id': task_id,
             'task_title': task.title,
-            'history': [record.to_dict() for record in history_records]
+            'history': [record.to_dict() for record in history_records],
+            'next_cursor': next_cursor
         }
     
     @staticmethod
-    def get_task_comments(task_id: int) -> Dict[str, Any]:
-        """获取任务评论"""
+    def get_task_comments(task_id: int, limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        按创建时间倒序分页获取任务评论
+        
+        Args:
+            limit: 每页条数，为None时不分页，返回全部记录（旧调用方的行为）
+            cursor: 上一页返回的next_cursor，为空表示第一页
+        
+        Raises:
+            ValueError: 游标无效
+        """
         task = Task.query.get(task_id)
         if not task:
             return {'error': '任务不存在'}
         
-        comments = TaskReviewComment.query.filter_by(
-            task_id=task_id
-        ).order_by(TaskReviewComment.created_at.desc()).all()
+        comments, next_cursor = keyset_page(
+            TaskReviewComment.query.filter_by(task_id=task_id),
+            (TaskReviewComment.created_at, TaskReviewComment.id),
+            cursor, limit
+        )
         
-        return {'comments': [comment.to_dict() for comment in comments]}
+        return {'comments': [comment.to_dict() for comment in comments], 'next_cursor': next_cursor}
     
     @staticmethod
     def add_task_comment(task_id: int, content: str) -> Dict[str, Any]:
@@ -220,6 +433,8 @@ class TaskService:
         
         try:
             db.session.add(comment)
+            db.session.flush()
+            SearchService.index_comment(comment, task)
             db.session.commit()
             
             return {
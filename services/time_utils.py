@@ -0,0 +1,15 @@
+from datetime import datetime
+from typing import Optional
+
+
+def to_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """去掉时区信息，与数据库中读出的时间保持一致"""
+    if value is not None and value.tzinfo is not None:
+        return value.replace(tzinfo=None)
+    return value
+
+
+def shift_month(month_start: datetime, offset: int) -> datetime:
+    """返回相对month_start偏移offset个月的月初"""
+    index = month_start.year * 12 + month_start.month - 1 + offset
+    return month_start.replace(year=index // 12, month=index % 12 + 1, day=1)
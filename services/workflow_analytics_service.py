@@ -0,0 +1,205 @@
+from datetime import datetime, date, timedelta
+from typing import Dict, Any, List, Optional
+from sqlalchemy import or_
+from models import db, Task, TaskProgressHistory
+from config import Config
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    """计算已排序数据的分位数（线性插值）"""
+    if not sorted_values:
+        return 0
+    position = (len(sorted_values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    weight = position - lower
+    return sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+
+
+class WorkflowAnalyticsService:
+    """工作流步骤分析服务类"""
+
+    @staticmethod
+    def get_step_dwell_times(user_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        统计各任务类型中每个工作流步骤的停留时间（天）
+
+        按 (task_id, operation_time) 顺序流式读取一次进展变更记录：
+        步骤的停留时间从进入该步骤开始，到下一次进展变更为止；
+        已完成任务的最后一个步骤截止到完成时间，未完成任务的当前步骤不计入。
+
+        Args:
+            user_id: 用户ID，如果提供则只统计该用户的任务
+        """
+        query = db.session.query(
+            TaskProgressHistory.task_id,
+            TaskProgressHistory.operation_time,
+            TaskProgressHistory.old_progress,
+            TaskProgressHistory.new_progress,
+            Task.task_type,
+            Task.created_at,
+            Task.completed_at,
+            Task.status
+        ).join(Task, Task.id == TaskProgressHistory.task_id).filter(
+            # 只看进展变更，忽略仅状态变更的记录
+            or_(TaskProgressHistory.old_progress.isnot(None), TaskProgressHistory.new_progress.isnot(None))
+        )
+        if user_id is not None:
+            query = query.filter(Task.user_id == user_id)
+        query = query.order_by(
+            TaskProgressHistory.task_id,
+            TaskProgressHistory.operation_time,
+            TaskProgressHistory.id
+        ).yield_per(1000)
+
+        durations: Dict[str, Dict[str, List[float]]] = {}
+
+        def record(task_type: str, step: Optional[str], start: Optional[datetime], end: Optional[datetime]):
+            if not step or start is None or end is None:
+                return
+            days = (end - start).total_seconds() / 86400
+            if days >= 0:
+                durations.setdefault(task_type, {}).setdefault(step, []).append(days)
+
+        current_task = None
+        current_step = None
+        entered_at = None
+        task_info = None
+        for task_id, operation_time, old_progress, new_progress, task_type, created_at, completed_at, status in query:
+            if task_id != current_task:
+                # 结束上一个任务：已完成任务的最后一步截止到完成时间
+                if task_info and task_info[2] == 'completed':
+                    record(task_info[0], current_step, entered_at, task_info[1])
+                current_task = task_id
+                task_info = (task_type, completed_at, status)
+                current_step = old_progress
+                entered_at = created_at
+
+            record(task_type, current_step, entered_at, operation_time)
+            current_step = new_progress
+            entered_at = operation_time
+
+        if task_info and task_info[2] == 'completed':
+            record(task_info[0], current_step, entered_at, task_info[1])
+
+        result = {}
+        for task_type, steps in durations.items():
+            order = Config.DEFAULT_WORKFLOWS.get(task_type, [])
+            step_names = sorted(steps, key=lambda step: order.index(step) if step in order else len(order))
+            step_stats = []
+            for step in step_names:
+                values = sorted(steps[step])
+                step_stats.append({
+                    'step': step,
+                    'count': len(values),
+                    'avg_days': round(sum(values) / len(values), 2),
+                    'p50_days': round(_percentile(values, 0.5), 2),
+                    'p90_days': round(_percentile(values, 0.9), 2)
+                })
+            result[task_type] = step_stats
+
+        return {'task_types': result}
+
+    @staticmethod
+    def get_cumulative_flow(user_id: Optional[int], start: date, end: date) -> Dict[str, Any]:
+        """
+        获取累积流图数据：每天结束时各状态、各工作流步骤的任务数，以及每天完成的任务数
+
+        以任务创建时间、进展变更记录和完成时间构造事件，排序后一次线性扫描得到每日快照。
+        任务的初始状态和初始步骤取自第一条相应变更记录的原值；
+        没有状态变更记录的已完成任务在完成时间补一次"进入已完成"事件。
+
+        Args:
+            user_id: 用户ID，如果提供则只统计该用户的任务
+            start: 起始日期（包含）
+            end: 结束日期（包含）
+        """
+        task_query = db.session.query(Task.id, Task.created_at, Task.completed_at, Task.status, Task.progress)
+        history_query = db.session.query(
+            TaskProgressHistory.task_id,
+            TaskProgressHistory.operation_time,
+            TaskProgressHistory.old_status,
+            TaskProgressHistory.new_status,
+            TaskProgressHistory.old_progress,
+            TaskProgressHistory.new_progress
+        ).join(Task, Task.id == TaskProgressHistory.task_id)
+        if user_id is not None:
+            task_query = task_query.filter(Task.user_id == user_id)
+            history_query = history_query.filter(Task.user_id == user_id)
+        history_query = history_query.order_by(
+            TaskProgressHistory.task_id,
+            TaskProgressHistory.operation_time,
+            TaskProgressHistory.id
+        ).yield_per(1000)
+
+        transitions: Dict[int, List[tuple]] = {}
+        for task_id, operation_time, old_status, new_status, old_progress, new_progress in history_query:
+            transitions.setdefault(task_id, []).append(
+                (operation_time, old_status, new_status, old_progress, new_progress)
+            )
+
+        # 事件：(时间, 序号, 维度, 原值, 新值)；原值为None表示新进入
+        events = []
+        for task_id, created_at, completed_at, status, progress in task_query.yield_per(1000):
+            if created_at is None:
+                continue
+            task_transitions = transitions.get(task_id, [])
+            status_changes = [t for t in task_transitions if t[1] is not None or t[2] is not None]
+            progress_changes = [t for t in task_transitions if t[3] is not None or t[4] is not None]
+
+            initial_status = status_changes[0][1] if status_changes else status
+            if status == 'completed' and completed_at and (not status_changes or status_changes[-1][2] != 'completed'):
+                # 通过"完成任务"操作完成的任务没有状态变更记录
+                if not status_changes:
+                    initial_status = 'pending'
+                last_status = status_changes[-1][2] if status_changes else initial_status
+                status_changes.append((completed_at, last_status, 'completed', None, None))
+            initial_progress = progress_changes[0][3] if progress_changes else progress
+
+            events.append((created_at, len(events), 'status', None, initial_status))
+            if initial_progress:
+                events.append((created_at, len(events), 'progress', None, initial_progress))
+            for operation_time, old_status, new_status, _, _ in status_changes:
+                events.append((operation_time, len(events), 'status', old_status, new_status))
+            for operation_time, _, _, old_progress, new_progress in progress_changes:
+                events.append((operation_time, len(events), 'progress', old_progress, new_progress))
+
+        events.sort()
+
+        status_counts = {status: 0 for status in Config.VALID_TASK_STATUSES}
+        progress_counts: Dict[str, int] = {}
+        status_series = {status: [] for status in Config.VALID_TASK_STATUSES}
+        progress_series: Dict[str, List[int]] = {}
+        throughput = []
+        labels = []
+
+        index = 0
+        day = start
+        while day <= end:
+            completed_today = 0
+            while index < len(events) and events[index][0].date() <= day:
+                _, _, dimension, old_value, new_value = events[index]
+                counts = status_counts if dimension == 'status' else progress_counts
+                if old_value is not None and old_value in counts:
+                    counts[old_value] -= 1
+                if new_value is not None:
+                    counts[new_value] = counts.get(new_value, 0) + 1
+                if dimension == 'status' and new_value == 'completed' and events[index][0].date() == day:
+                    completed_today += 1
+                index += 1
+
+            labels.append(day.isoformat())
+            for status, count in status_counts.items():
+                status_series.setdefault(status, [0] * (len(labels) - 1)).append(count)
+            for step, count in progress_counts.items():
+                progress_series.setdefault(step, [0] * (len(labels) - 1)).append(count)
+            throughput.append(completed_today)
+            day += timedelta(days=1)
+
+        return {
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'labels': labels,
+            'status': status_series,
+            'progress': progress_series,
+            'throughput': throughput
+        }
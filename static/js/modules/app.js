@@ -24,16 +24,19 @@ class App {
             // 等待FullCalendar库加载完成
             await this.waitForFullCalendar();
             
-            // 初始化日历
+            // 一次请求获取首页所需数据
+            const dashboard = await this.loadDashboard();
+
+            // 初始化日历（日历在渲染时按可见时间窗口加载任务）
             this.calendarModule = await CalendarModule.init();
             this.calendar = this.calendarModule.getCalendar();
 
             // 初始化图表
-            this.chartModule = await ChartModule.init();
+            this.chartModule = await ChartModule.init(dashboard);
             this.taskAnalysisChart = this.chartModule.getChart();
 
             // 加载初始数据
-            await this.loadInitialData();
+            await this.loadInitialData(dashboard);
 
             // 初始化事件监听器
             this.initEventListeners();
@@ -68,20 +71,40 @@ class App {
         });
     }
 
+    /**
+     * 获取首页仪表盘数据，失败时返回null，由各模块自行加载
+     */
+    async loadDashboard() {
+        try {
+            const response = await fetch('/api/dashboard?sections=sync_token,analytics,statistics,issues,workflows');
+            if (!response.ok) {
+                return null;
+            }
+            return await response.json();
+        } catch (error) {
+            console.error('加载仪表盘数据失败:', error);
+            return null;
+        }
+    }
+
     /**
      * 加载初始数据
      */
-    async loadInitialData() {
+    async loadInitialData(dashboard = null) {
         try {
             // 初始化模块实例
             this.taskModule = TaskModule.init();
+            // 仪表盘令牌早于日历首次加载，此后第一次同步即可增量进行；没有令牌时首次同步全量刷新
+            this.taskModule.syncToken = dashboard ? dashboard.sync_token || null : null;
             this.issueModule = IssueModule.init();
             this.workflowModule = WorkflowModule.init();
             
+            // 订阅服务端推送的任务变更，日历逐条更新
+            this.taskModule.connectStream();
+            
             await Promise.all([
-                this.taskModule.loadTasks(),
-                this.issueModule.loadIssues(),
-                this.workflowModule.loadWorkflows()
+                this.issueModule.loadIssues(dashboard ? dashboard.issues : null),
+                this.workflowModule.loadWorkflows(dashboard ? dashboard.workflows : null)
             ]);
             
             // 初始化公告栏 - 确保异步等待
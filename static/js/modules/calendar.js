@@ -6,6 +6,9 @@
 class CalendarModule {
     constructor() {
         this.calendar = null;
+        // 月视图中某天进行中任务数超过该值时只显示每日数量，不加载任务事件
+        this.denseDayThreshold = 30;
+        this.dense = false;
     }
 
     /**
@@ -36,8 +39,11 @@ class CalendarModule {
                 center: 'title',
                 right: 'dayGridMonth,timeGridWeek,listWeek'
             },
-            events: '/api/tasks?exclude_completed=true',
             eventDisplay: 'block',
+            datesSet: () => {
+                // 切换月份/视图时只加载可见时间窗口内的任务
+                this.refreshEvents();
+            },
             eventColor: (info) => {
                 const priority = info.event.extendedProps.priority || 'medium';
                 return Utils.getPriorityColorHex(priority);
@@ -91,6 +97,7 @@ class CalendarModule {
 
     /**
      * 为事件添加工具提示
+     * 事件数据不含描述，首次悬停时再按需获取
      */
     addEventTooltip(info) {
         const event = info.event;
@@ -101,58 +108,71 @@ class CalendarModule {
             info.el.classList.add('task-overdue');
         }
         
+        this.setEventTooltip(info.el, event, null);
+        info.el.addEventListener('mouseenter', async () => {
+            try {
+                const response = await fetch(`/api/calendar/events/${event.id}/description`);
+                if (response.ok) {
+                    const data = await response.json();
+                    this.setEventTooltip(info.el, event, data.description);
+                }
+            } catch (error) {
+                console.error('加载任务描述失败:', error);
+            }
+        }, { once: true });
+    }
+
+    /**
+     * 设置事件工具提示内容
+     */
+    setEventTooltip(el, event, description) {
+        const props = event.extendedProps;
+        // 全天事件的end不包含当天，截止日期为end的前一天
+        let deadline = null;
+        if (event.end) {
+            const lastDay = new Date(event.end);
+            lastDay.setDate(lastDay.getDate() - 1);
+            deadline = this.formatDate(lastDay);
+        }
+        
         const tooltipContent = `
             <div class="tooltip-content">
                 <strong>${event.title}</strong><br>
                 类型: ${props.task_type || '未知'}<br>
                 状态: ${Utils.getStatusText(props.status)}<br>
-                ${props.description ? `描述: ${props.description}<br>` : ''}
-                ${props.start_date ? `开始: ${props.start_date}<br>` : ''}
-                ${props.deadline ? `截止: ${props.deadline}` : ''}
+                ${description ? `描述: ${description}<br>` : ''}
+                ${event.startStr ? `开始: ${event.startStr}<br>` : ''}
+                ${deadline ? `截止: ${deadline}` : ''}
             </div>
         `;
         
         // 使用Bootstrap的tooltip或自定义tooltip
-        info.el.setAttribute('title', tooltipContent);
-        info.el.setAttribute('data-bs-toggle', 'tooltip');
-        info.el.setAttribute('data-bs-html', 'true');
+        el.setAttribute('title', tooltipContent);
+        el.setAttribute('data-bs-toggle', 'tooltip');
+        el.setAttribute('data-bs-html', 'true');
     }
 
     /**
      * 刷新日历事件
+     * 服务端直接返回FullCalendar事件格式，只包含日历用到的字段
      */
     async refreshEvents() {
         if (this.calendar) {
             try {
-                const response = await fetch('/api/tasks?exclude_completed=true');
-                const tasks = await response.json();
+                const view = this.calendar.view;
+                await this.refreshDensity();
+                if (this.dense) {
+                    this.calendar.removeAllEvents();
+                    console.log('任务密集，月视图只显示每日任务数');
+                    return;
+                }
                 
-                const events = tasks.map(task => {
-                    const event = {
-                        id: task.id,
-                        title: `${task.title} [${task.progress || task.status}]`,
-                        start: task.start_date,
-                        allDay: true,
-                        extendedProps: {
-                            task_type: task.task_type,
-                            description: task.description,
-                            status: task.status,
-                            progress: task.progress,
-                            start_date: task.start_date,
-                            deadline: task.deadline,
-                            priority: task.priority
-                        }
-                    };
-                    
-                    // 如果有截止日期，设置结束日期为截止日期的下一天
-                    if (task.deadline) {
-                        const endDate = new Date(task.deadline);
-                        endDate.setDate(endDate.getDate() + 1);
-                        event.end = endDate.toISOString().split('T')[0];
-                    }
-                    
-                    return event;
+                const params = new URLSearchParams({
+                    start: this.formatDate(view.activeStart),
+                    end: this.formatDate(view.activeEnd)
                 });
+                const response = await fetch(`/api/calendar/events?${params.toString()}`);
+                const events = await response.json();
                 
                 this.calendar.removeAllEvents();
                 this.calendar.addEventSource(events);
@@ -165,7 +185,57 @@ class CalendarModule {
     }
 
     /**
-     * 添加单个事件
+     * 刷新月视图的每日任务数角标
+     * 按当前月份获取每天的进行中和已延期任务数，非月视图时清除角标
+     */
+    async refreshDensity() {
+        const view = this.calendar.view;
+        const calendarEl = document.getElementById('calendar');
+        calendarEl.querySelectorAll('.task-density-badge').forEach(badge => badge.remove());
+        if (view.type !== 'dayGridMonth') {
+            this.dense = false;
+            return;
+        }
+        
+        try {
+            const month = this.formatDate(view.currentStart).slice(0, 7);
+            const response = await fetch(`/api/calendar/density?month=${month}`);
+            if (!response.ok) {
+                this.dense = false;
+                return;
+            }
+            const density = await response.json();
+            this.dense = density.days.some(day => day.active > this.denseDayThreshold);
+            
+            density.days.forEach(day => {
+                const cellTop = calendarEl.querySelector(`.fc-daygrid-day[data-date="${day.date}"] .fc-daygrid-day-top`);
+                if (!cellTop || !day.active) {
+                    return;
+                }
+                const badge = document.createElement('span');
+                badge.className = `task-density-badge badge me-1 ${day.overdue ? 'bg-danger' : 'bg-secondary'}`;
+                badge.textContent = day.overdue ? `${day.active}/${day.overdue}` : `${day.active}`;
+                badge.title = `进行中 ${day.active} 个，其中已延期 ${day.overdue} 个`;
+                cellTop.prepend(badge);
+            });
+        } catch (error) {
+            this.dense = false;
+            console.error('加载每日任务数失败:', error);
+        }
+    }
+
+    /**
+     * 将Date格式化为本地日期字符串 YYYY-MM-DD
+     */
+    formatDate(date) {
+        const year = date.getFullYear();
+        const month = String(date.getMonth() + 1).padStart(2, '0');
+        const day = String(date.getDate()).padStart(2, '0');
+        return `${year}-${month}-${day}`;
+    }
+
+    /**
+     * 添加单个事件（任务数据来自增量同步或变更推送），字段与/api/calendar/events一致
      */
     addEvent(task) {
         if (this.calendar) {
@@ -176,25 +246,51 @@ class CalendarModule {
                 allDay: true,
                 extendedProps: {
                     task_type: task.task_type,
-                    description: task.description,
                     status: task.status,
-                    progress: task.progress,
-                    start_date: task.start_date,
-                    deadline: task.deadline,
-                    priority: task.priority
+                    priority: task.priority,
+                    is_overdue: task.is_overdue
                 }
             };
             
+            // 结束日期为截止日期的下一天
             if (task.deadline) {
-                const endDate = new Date(task.deadline);
+                const endDate = new Date(`${task.deadline}T00:00:00`);
                 endDate.setDate(endDate.getDate() + 1);
-                event.end = endDate.toISOString().split('T')[0];
+                event.end = this.formatDate(endDate);
             }
             
             this.calendar.addEvent(event);
         }
     }
 
+    /**
+     * 应用增量同步结果：先移除已删除的任务，再用变更后的任务替换对应事件
+     * 与refreshEvents一致，只显示未完成且与当前视图重叠的任务；月视图同时刷新每日任务数
+     */
+    async applyChanges(changed, deleted) {
+        if (!this.calendar) {
+            return;
+        }
+        await this.refreshDensity();
+        if (this.dense) {
+            return;
+        }
+        
+        const view = this.calendar.view;
+        const start = this.formatDate(view.activeStart);
+        const end = this.formatDate(view.activeEnd);
+
+        deleted.forEach(taskId => this.removeEvent(taskId));
+        changed.forEach(task => {
+            this.removeEvent(task.id);
+            const lastDay = task.deadline || task.start_date;
+            if (task.status !== 'completed' && task.start_date < end && lastDay >= start) {
+                this.addEvent(task);
+            }
+        });
+        console.log(`日历事件已增量更新: ${changed.length} 个变更, ${deleted.length} 个删除`);
+    }
+
     /**
      * 移除事件
      */
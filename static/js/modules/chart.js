@@ -12,9 +12,9 @@ class ChartModule {
     /**
      * 初始化图表模块
      */
-    static async init() {
+    static async init(dashboard = null) {
         const instance = new ChartModule();
-        await instance.initializeChart();
+        await instance.initializeChart(dashboard);
         window.ChartModule = instance;
         return instance;
     }
@@ -22,7 +22,7 @@ class ChartModule {
     /**
      * 初始化任务分析图表
      */
-    async initializeChart() {
+    async initializeChart(dashboard = null) {
         // 任务月份统计图表已移除
         
         // 初始化任务类型统计图表
@@ -78,13 +78,20 @@ class ChartModule {
         console.log('图表初始化完成');
         
         // 加载实际数据
-        await this.updateAnalytics();
+        await this.updateAnalytics(dashboard);
     }
 
     /**
      * 更新分析数据
+     * @param {Object|null} dashboard - 已从 /api/dashboard 获取的数据，提供时不再单独请求
      */
-    async updateAnalytics() {
+    async updateAnalytics(dashboard = null) {
+        if (dashboard && dashboard.analytics && dashboard.statistics) {
+            this.updateStatistics(dashboard.analytics);
+            this.updateTaskTypeChart(dashboard.statistics);
+            return;
+        }
+        
         try {
             // 获取月度分析数据（仅用于更新本月完成和平均用时）
             const response = await fetch('/api/analytics');
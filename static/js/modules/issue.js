@@ -30,7 +30,12 @@ class IssueModule {
     /**
      * 加载问题列表
      */
-    async loadIssues() {
+    async loadIssues(preloadedIssues = null) {
+        if (Array.isArray(preloadedIssues)) {
+            this.renderLoadedIssues(preloadedIssues);
+            return preloadedIssues;
+        }
+        
         try {
             const response = await fetch('/api/issues', {
                 cache: 'no-cache', // 添加缓存控制，确保每次都获取最新数据
@@ -55,22 +60,7 @@ class IssueModule {
             
             const issues = await response.json();
             
-            this.issues = issues;
-            this.displayIssues(issues);
-            
-            // 如果首页问题列表存在，强制刷新
-            const issuesList = document.getElementById('issuesList');
-            if (issuesList) {
-                const openIssues = issues.filter(issue => issue.status !== 'resolved');
-                if (openIssues.length === 0) {
-                    issuesList.innerHTML = '<div class="text-center text-muted py-4">暂无待解决问题</div>';
-                } else {
-                    const issuesHtml = openIssues.map(issue => this.createIssueElement(issue)).join('');
-                    issuesList.innerHTML = issuesHtml;
-                }
-            }
-            
-            console.log('问题加载完成');
+            this.renderLoadedIssues(issues);
             return issues;
         } catch (error) {
             console.error('加载问题失败:', error);
@@ -79,6 +69,28 @@ class IssueModule {
         }
     }
 
+    /**
+     * 显示已加载的问题列表
+     */
+    renderLoadedIssues(issues) {
+        this.issues = issues;
+        this.displayIssues(issues);
+        
+        // 如果首页问题列表存在，强制刷新
+        const issuesList = document.getElementById('issuesList');
+        if (issuesList) {
+            const openIssues = issues.filter(issue => issue.status !== 'resolved');
+            if (openIssues.length === 0) {
+                issuesList.innerHTML = '<div class="text-center text-muted py-4">暂无待解决问题</div>';
+            } else {
+                const issuesHtml = openIssues.map(issue => this.createIssueElement(issue)).join('');
+                issuesList.innerHTML = issuesHtml;
+            }
+        }
+        
+        console.log('问题加载完成');
+    }
+
     /**
      * 显示问题列表
      */
@@ -164,6 +176,15 @@ class IssueModule {
                 await this.loadIssues();
                 
                 Utils.showSuccess('问题添加成功');
+
+                // 提示近似重复的历史问题及其成功解决方案
+                if (data.similar_issues && data.similar_issues.length) {
+                    const lines = data.similar_issues.map(issue => {
+                        const solution = issue.successful_solution ? `：${issue.successful_solution}` : '';
+                        return `${issue.title}（${issue.status === 'resolved' ? '已解决' : '未解决'}）${solution}`;
+                    });
+                    Utils.showInfo(`发现相似的历史问题：\n${lines.join('\n')}`);
+                }
             } else {
                 Utils.showError(data.message || '添加问题失败');
             }
@@ -6,6 +6,10 @@
 class TaskModule {
     constructor() {
         this.currentTaskId = null;
+        // 增量同步令牌，由App用仪表盘返回的sync_token初始化；为空时下一次同步全量刷新
+        this.syncToken = null;
+        // 任务变更推送连接
+        this.eventSource = null;
     }
 
     /**
@@ -18,27 +22,72 @@ class TaskModule {
     }
 
     /**
-     * 加载任务列表
+     * 同步任务变更到日历
+     * 只获取上次同步以来变更和删除的任务；首次调用或令牌过期时全量刷新日历
      */
     async loadTasks() {
         try {
-            const response = await fetch('/api/tasks?exclude_completed=true');
-            const tasks = await response.json();
+            const params = this.syncToken ? `?since=${encodeURIComponent(this.syncToken)}` : '';
+            const response = await fetch(`/api/tasks/changes${params}`);
+            const changes = await response.json();
+            if (!response.ok) {
+                throw new Error(changes.error || '同步任务失败');
+            }
+            this.syncToken = changes.next_token;
             
             // 更新日历
             if (window.CalendarModule) {
-                await window.CalendarModule.refreshEvents();
+                if (changes.reset) {
+                    await window.CalendarModule.refreshEvents();
+                } else {
+                    window.CalendarModule.applyChanges(changes.changed, changes.deleted);
+                }
             }
             
-            console.log('任务加载完成');
-            return tasks;
+            console.log('任务同步完成');
+            return changes.changed;
         } catch (error) {
+            this.syncToken = null;
             console.error('加载任务失败:', error);
             Utils.showError('加载任务失败，请重试');
             return [];
         }
     }
 
+    /**
+     * 连接任务变更推送（SSE）
+     * 推送只用于接收其他标签页的变更：收到单条变更时只更新对应的日历事件，
+     * 断线重连后增量同步一次，补上断线期间的变更。服务端未启用推送时返回204，浏览器不再重连
+     */
+    connectStream() {
+        if (!window.EventSource || this.eventSource) {
+            return;
+        }
+        let reconnecting = false;
+        this.eventSource = new EventSource('/api/tasks/stream');
+        this.eventSource.addEventListener('open', () => {
+            if (reconnecting) {
+                reconnecting = false;
+                this.loadTasks();
+            }
+        });
+        this.eventSource.addEventListener('error', () => {
+            reconnecting = true;
+        });
+        this.eventSource.addEventListener('task', (message) => {
+            const event = JSON.parse(message.data);
+            if (event.type === 'resync') {
+                this.loadTasks();
+            } else if (window.CalendarModule) {
+                if (event.type === 'deleted') {
+                    window.CalendarModule.applyChanges([], [event.data.id]);
+                } else {
+                    window.CalendarModule.applyChanges([event.data], []);
+                }
+            }
+        });
+    }
+
     /**
      * 加载任务列表（用于任务列表模态框）
      */
@@ -770,7 +819,7 @@ class TaskModule {
                 taskProgressSelect.innerHTML = '';
                 taskProgressSelect.disabled = true;
                 
-                // 重新加载任务
+                // 增量同步日历（推送可能由其他进程的连接持有，不依赖推送看到自己的写入）
                 await this.loadTasks();
                 
                 // 更新分析数据
@@ -779,6 +828,12 @@ class TaskModule {
                 }
                 
                 Utils.showSuccess('任务添加成功');
+
+                // 与高优先级任务时间重叠时提示（不阻止创建）
+                if (data.conflicts && data.conflicts.length) {
+                    const titles = data.conflicts.map(task => `${task.title}（${task.start_date} ~ ${task.deadline || task.start_date}）`);
+                    Utils.showInfo(`${data.warning}：\n${titles.join('\n')}`);
+                }
             } else {
                 Utils.showError(data.message || '添加任务失败');
             }
@@ -993,7 +1048,7 @@ class TaskModule {
                 // 刷新任务详情
                 await this.refreshTaskDetails();
                 
-                // 重新加载任务
+                // 增量同步日历（推送可能由其他进程的连接持有，不依赖推送看到自己的写入）
                 await this.loadTasks();
                 
                 Utils.showSuccess('任务状态更新成功');
@@ -1053,7 +1108,7 @@ class TaskModule {
                     taskDetailsModal.hide();
                 }
                 
-                // 重新加载任务
+                // 增量同步日历（推送可能由其他进程的连接持有，不依赖推送看到自己的写入）
                 await this.loadTasks();
                 
                 // 更新分析数据
@@ -1100,7 +1155,7 @@ class TaskModule {
                     taskDetailsModal.hide();
                 }
                 
-                // 重新加载任务
+                // 增量同步日历（推送可能由其他进程的连接持有，不依赖推送看到自己的写入）
                 await this.loadTasks();
                 
                 // 更新分析数据
@@ -1308,7 +1363,7 @@ class TaskModule {
                 // 刷新任务详情
                 await this.refreshTaskDetails();
                 
-                // 重新加载任务
+                // 增量同步日历（推送可能由其他进程的连接持有，不依赖推送看到自己的写入）
                 await this.loadTasks();
                 
                 Utils.showSuccess('任务进展更新成功');
@@ -22,13 +22,16 @@ class WorkflowModule {
     /**
      * 加载工作流列表
      */
-    async loadWorkflows() {
+    async loadWorkflows(preloadedWorkflows = null) {
         try {
-            const response = await fetch('/api/workflows');
-            const data = await response.json();
-            
-            // API 返回的是 { workflows: [...] } 格式
-            const workflows = data.workflows || [];
+            let workflows = preloadedWorkflows;
+            if (!Array.isArray(workflows)) {
+                const response = await fetch('/api/workflows');
+                const data = await response.json();
+                
+                // API 返回的是 { workflows: [...] } 格式
+                workflows = data.workflows || [];
+            }
             
             // 按创建时间从新到旧排序
             workflows.sort((a, b) => new Date(b.created_at) - new Date(a.created_at));
@@ -8,7 +8,7 @@ from flask import Flask
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from app import create_app
-from models import db, Task, TaskReviewComment, Workflow, Issue
+from models import db, Task, TaskReviewComment, Workflow, Issue, User
 from config import config
 
 # 添加测试配置
@@ -46,6 +46,15 @@ def test_db(app):
     with app.app_context():
         yield db
 
+@pytest.fixture
+def sample_user(test_db):
+    """创建示例用户"""
+    user = User(username="tester", email="tester@example.com")
+    user.password = "password"
+    test_db.session.add(user)
+    test_db.session.commit()
+    return user
+
 @pytest.fixture
 def sample_workflow(test_db):
     """创建示例工作流"""
@@ -0,0 +1,207 @@
+import pytest
+from datetime import datetime, date, timedelta
+from models import Task
+from services import AnalyticsService, RollupService, TaskService, DashboardService
+from services.analytics_cache import analytics_cache
+
+
+@pytest.fixture
+def analytics_tasks(test_db, sample_user):
+    """创建用于统计分析的任务数据（另含一个其他用户的任务）"""
+    rows = [
+        ('管理报告', 'completed', 'high', datetime(2026, 3, 1, 9), datetime(2026, 3, 4, 18)),
+        ('管理报告', 'completed', 'medium', datetime(2026, 3, 1, 9), datetime(2026, 3, 1, 10)),
+        ('管理报告', 'pending', 'low', datetime(2026, 3, 2, 9), None),
+        ('商业计划', 'in_progress', 'high', datetime(2026, 3, 2, 9), None),
+        ('商业计划', 'completed', 'high', datetime(2026, 2, 1, 9), datetime(2026, 2, 11, 8)),
+        ('测试类型', 'pending', 'medium', datetime(2026, 3, 2, 9), None),
+    ]
+    tasks = []
+    for task_type, status, priority, created_at, completed_at in rows:
+        task = Task(title=f'{task_type}任务', task_type=task_type, status=status, priority=priority,
+                    start_date=created_at.date(), created_at=created_at,
+                    completed_at=completed_at, user_id=sample_user.id)
+        test_db.session.add(task)
+        tasks.append(task)
+    test_db.session.add(Task(title='其他用户任务', task_type='管理报告', status='completed', priority='high',
+                             start_date=date(2026, 3, 1), created_at=datetime(2026, 3, 1),
+                             completed_at=datetime(2026, 3, 2), user_id=sample_user.id + 1))
+    test_db.session.commit()
+    return tasks
+
+
+def test_get_task_statistics(test_db, sample_user, analytics_tasks):
+    """测试任务统计结果的结构与数值"""
+    RollupService.rebuild()
+    stats = AnalyticsService.get_task_statistics(user_id=sample_user.id)
+
+    assert stats == {
+        'total_tasks': 6,
+        'status_breakdown': {'pending': 2, 'in_progress': 1, 'completed': 3},
+        'priority_breakdown': {'high': 3, 'medium': 2, 'low': 1},
+        'task_types': {
+            '管理报告': {'total': 3, 'completed': 2, 'pending': 1, 'in_progress': 0,
+                     'avg_duration': 2.5, 'total_duration': 5, 'completed_count': 2,
+                     'p50_duration': 1, 'p90_duration': 4, 'p99_duration': 4},
+            '商业计划': {'total': 2, 'completed': 1, 'pending': 0, 'in_progress': 1,
+                     'avg_duration': 10.0, 'total_duration': 10, 'completed_count': 1,
+                     'p50_duration': 10, 'p90_duration': 10, 'p99_duration': 10},
+        }
+    }
+    # 按完成数量从高到低排序
+    assert list(stats['task_types']) == ['管理报告', '商业计划']
+
+    # 不指定用户时统计所有任务
+    assert AnalyticsService.get_task_statistics()['total_tasks'] == 7
+
+
+def test_get_org_statistics(test_db, sample_user, analytics_tasks):
+    """测试组织统计按用户分区的结果与单用户统计一致，活跃用户只统计存在的用户"""
+    RollupService.rebuild()
+    data = AnalyticsService.get_org_statistics()
+
+    assert data['user_count'] == 1
+    assert data['active_user_count'] == 1
+    users = {user['user_id']: user for user in data['users']}
+    assert users[sample_user.id]['username'] == 'tester'
+    assert users[sample_user.id]['statistics'] == AnalyticsService.get_task_statistics(user_id=sample_user.id)
+    # 没有对应用户记录的任务不出现在用户列表中，但计入组织汇总
+    assert sample_user.id + 1 not in users
+    assert data['totals'] == AnalyticsService.get_task_statistics()
+
+
+def test_get_analytics_data_monthly_series(test_db, sample_user):
+    """测试月度完成统计只统计当前用户，并支持自定义月份数"""
+    now = datetime.now()
+    this_month = now.replace(day=1, hour=12, minute=0, second=0, microsecond=0)
+    last_month = (this_month.replace(day=1) - timedelta(days=1)).replace(day=15)
+    rows = [
+        (sample_user.id, '管理报告', this_month - timedelta(days=4), this_month),
+        (sample_user.id, '管理报告', last_month - timedelta(days=2), last_month),
+        (sample_user.id, '商业计划', last_month - timedelta(days=6), last_month),
+        (sample_user.id + 1, '商业计划', this_month - timedelta(days=1), this_month),
+    ]
+    for user_id, task_type, created_at, completed_at in rows:
+        test_db.session.add(Task(title='完成任务', task_type=task_type, status='completed',
+                                 start_date=created_at.date(), created_at=created_at,
+                                 completed_at=completed_at, user_id=user_id))
+    test_db.session.commit()
+    RollupService.rebuild(chunk_size=2)
+
+    data = AnalyticsService.get_analytics_data(user_id=sample_user.id, months=3)
+
+    assert data['monthly_completed'] == 1
+    assert data['last_month_completed'] == 2
+    assert data['month_over_month_change'] == -50.0
+    assert data['total_completed'] == 3
+    assert data['average_days'] == 4.0
+    assert data['top_task_type'] == '管理报告'
+    assert data['chart_data']['data'] == [0, 2, 1]
+    assert data['chart_data']['labels'][-1] == f'{now.month}月'
+
+
+def test_analytics_cache_invalidated_by_task_writes(test_db, sample_user):
+    """测试分析缓存命中，并在任务写入后失效"""
+    analytics_cache.clear()
+    task = TaskService.create_task({'title': '缓存任务', 'task_type': '管理报告', 'user_id': sample_user.id})
+
+    def compute():
+        return AnalyticsService.get_task_statistics(user_id=sample_user.id)
+
+    first = analytics_cache.get_or_compute(sample_user.id, 'statistics', compute)
+    second = analytics_cache.get_or_compute(sample_user.id, 'statistics', compute)
+    assert second is first
+    assert analytics_cache.stats()['hits'] == 1
+    assert analytics_cache.stats()['misses'] == 1
+
+    # 其他用户的写入不影响当前用户的缓存
+    analytics_cache.bump_user_version(sample_user.id + 1)
+    assert analytics_cache.get_or_compute(sample_user.id, 'statistics', compute) is first
+
+    TaskService.complete_task(task.id)
+    third = analytics_cache.get_or_compute(sample_user.id, 'statistics', compute)
+    assert third['status_breakdown']['completed'] == 1
+    assert analytics_cache.stats()['misses'] == 2
+
+
+def test_get_time_series_buckets(test_db, sample_user, analytics_tasks):
+    """测试时间序列在SQL中分桶并补齐空桶"""
+    RollupService.rebuild()
+
+    created = AnalyticsService.get_time_series(sample_user.id, date(2026, 2, 23), date(2026, 3, 8),
+                                               bucket='week', metric='created')
+    assert created['labels'] == ['2026-02-23', '2026-03-02']
+    # 3月1日（周日）属于2月23日那一周
+    assert created['data'] == [2, 3]
+
+    completed = AnalyticsService.get_time_series(sample_user.id, date(2026, 1, 1), date(2026, 3, 31),
+                                                 bucket='month', metric='completed')
+    assert completed['labels'] == ['2026-01-01', '2026-02-01', '2026-03-01']
+    assert completed['data'] == [0, 1, 2]
+
+    daily = AnalyticsService.get_time_series(sample_user.id, date(2026, 3, 1), date(2026, 3, 4),
+                                             bucket='day', metric='completed')
+    assert daily['data'] == [1, 0, 0, 1]
+
+
+def test_get_time_series_overdue(test_db, sample_user):
+    """测试到期未按时完成的任务按截止日期分桶"""
+    rows = [
+        (date(2026, 1, 5), None),                       # 未完成，已过期
+        (date(2026, 1, 6), datetime(2026, 1, 6, 17)),   # 按时完成
+        (date(2026, 1, 6), datetime(2026, 1, 9, 10)),   # 延期完成
+    ]
+    for deadline, completed_at in rows:
+        test_db.session.add(Task(title='到期任务', task_type='管理报告', start_date=date(2026, 1, 1),
+                                 deadline=deadline, completed_at=completed_at,
+                                 status='completed' if completed_at else 'in_progress',
+                                 user_id=sample_user.id))
+    test_db.session.commit()
+
+    series = AnalyticsService.get_time_series(sample_user.id, date(2026, 1, 5), date(2026, 1, 6),
+                                              bucket='day', metric='overdue')
+    assert series['data'] == [1, 1]
+
+
+def test_dashboard_sections(test_db, sample_user, analytics_tasks):
+    """测试仪表盘按数据块返回，并与单独接口结果一致"""
+    data = DashboardService.get_dashboard(sample_user.id, ['tasks', 'completed_tasks', 'statistics'])
+
+    assert set(data) == {'tasks', 'completed_tasks', 'statistics'}
+    assert len(data['tasks']) == 3
+    assert len(data['completed_tasks']) == 3
+    assert data['statistics'] == AnalyticsService.get_task_statistics(user_id=sample_user.id)
+
+
+def test_dashboard_sync_token_starts_delta_sync(test_db, sample_user):
+    """测试仪表盘返回的同步令牌可直接用于首次增量同步"""
+    data = DashboardService.get_dashboard(sample_user.id, ['sync_token'])
+    assert set(data) == {'sync_token'}
+
+    task = TaskService.create_task({'title': '加载后新建', 'task_type': '管理报告', 'user_id': sample_user.id})
+
+    changes = TaskService.get_changes(sample_user.id, since=data['sync_token'])
+    assert changes['reset'] is False
+    assert [item['id'] for item in changes['changed']] == [task.id]
+
+
+def test_get_workload(test_db, sample_user):
+    """测试按优先级加权的每日任务负荷"""
+    rows = [
+        (date(2026, 4, 28), date(2026, 5, 2), 'high', 'in_progress'),   # 跨越窗口开始
+        (date(2026, 5, 2), date(2026, 5, 3), 'low', 'pending'),
+        (date(2026, 5, 3), None, 'medium', 'pending'),                   # 无截止日期只占一天
+        (date(2026, 5, 1), date(2026, 5, 4), 'high', 'completed'),       # 已完成任务不计入
+        (date(2026, 5, 4), date(2026, 5, 20), 'medium', 'pending'),      # 跨越窗口结束
+        (date(2026, 5, 4), date(2026, 5, 2), 'high', 'pending'),         # 截止日期早于开始日期的历史数据不计入
+    ]
+    for start_date, deadline, priority, status in rows:
+        test_db.session.add(Task(title='负荷任务', task_type='管理报告', start_date=start_date, deadline=deadline,
+                                 priority=priority, status=status, user_id=sample_user.id))
+    test_db.session.commit()
+
+    workload = AnalyticsService.get_workload(sample_user.id, date(2026, 5, 1), date(2026, 5, 5))
+
+    assert workload['labels'][0] == '2026-05-01'
+    assert workload['load'] == [3, 4, 3, 2, 2]
+    assert workload['count'] == [1, 2, 2, 1, 1]
@@ -0,0 +1,117 @@
+import threading
+import pytest
+from datetime import date
+from sqlalchemy import text
+from app import create_app
+from config import config
+from models import db, Task, User
+from services import AnalyticsService
+from services.analytics_snapshot import AnalyticsSnapshot, analytics_snapshot
+
+
+@pytest.fixture
+def snapshot_app(tmp_path):
+    """创建使用文件数据库并启用分析快照的应用"""
+    config['snapshot_testing'] = type('SnapshotTestingConfig', (config['default'],), {
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "primary.db"}',
+        'SQLITE_JOURNAL_MODE': 'WAL',
+        'ANALYTICS_SNAPSHOT_ENABLED': True,
+        'ANALYTICS_SNAPSHOT_PATH': str(tmp_path / 'snapshot.db'),
+        'ANALYTICS_SNAPSHOT_INTERVAL': 3600
+    })
+    app = create_app('snapshot_testing')
+    # 由测试手动刷新快照
+    analytics_snapshot.stop()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+    analytics_snapshot.enabled = False
+    del config['snapshot_testing']
+
+
+def _add_task(status):
+    db.session.add(Task(title='任务', task_type='管理报告', status=status, start_date=date(2026, 3, 1), user_id=1))
+    db.session.commit()
+
+
+def test_analytics_reads_from_snapshot(snapshot_app):
+    """测试分析查询读取快照，快照刷新前看不到主库的新写入"""
+    db.session.add(User(id=1, username='tester', email='tester@example.com', password_hash='x'))
+    _add_task('pending')
+
+    # 尚未生成快照时读取主库
+    assert analytics_snapshot.staleness() == {'source': 'primary'}
+    assert AnalyticsService.get_task_statistics(user_id=1)['total_tasks'] == 1
+
+    analytics_snapshot.refresh()
+    first_generation = analytics_snapshot.generation
+    _add_task('completed')
+    with snapshot_app.app_context():
+        assert AnalyticsService.get_task_statistics(user_id=1)['total_tasks'] == 1
+
+    analytics_snapshot.refresh()
+    with snapshot_app.app_context():
+        assert AnalyticsService.get_task_statistics(user_id=1)['total_tasks'] == 2
+        meta = analytics_snapshot.annotate({})['snapshot']
+        assert meta['source'] == 'snapshot'
+        assert meta['refresh_interval'] == 3600
+        assert meta['age_seconds'] >= 0
+    assert analytics_snapshot.generation not in (None, first_generation)
+
+
+def test_concurrent_refreshes_use_separate_temp_files(snapshot_app, tmp_path):
+    """测试并发刷新各自写入独立的临时文件，不会互相替换或报错，也不残留临时文件"""
+    db.session.add(User(id=1, username='tester', email='tester@example.com', password_hash='x'))
+    _add_task('pending')
+
+    errors = []
+
+    def refresh():
+        try:
+            for _ in range(5):
+                analytics_snapshot.refresh()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=refresh) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert analytics_snapshot.available
+    assert not list(tmp_path.glob('*.tmp'))
+    assert AnalyticsService.get_task_statistics(user_id=1)['total_tasks'] == 1
+
+
+def test_primary_uses_wal_and_app_does_not_start_refresher(snapshot_app):
+    """测试文件主库使用WAL模式（备份不阻塞写入），创建应用时不启动刷新线程"""
+    assert db.session.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+    assert analytics_snapshot._thread is None
+
+
+def test_single_refresher_and_shared_generation(snapshot_app):
+    """测试只有持有快照锁的进程刷新，其他进程从快照文件看到同一代快照"""
+    db.session.add(User(id=1, username='tester', email='tester@example.com', password_hash='x'))
+    _add_task('pending')
+
+    # 另一个实例模拟其他WSGI进程
+    other = AnalyticsSnapshot()
+    other.init_app(snapshot_app)
+    try:
+        assert analytics_snapshot._acquire_leader()
+        assert not other._acquire_leader()
+
+        analytics_snapshot.refresh()
+        assert other.available
+        assert other.generation == analytics_snapshot.generation
+
+        # 刷新进程停止后由其他进程接替
+        analytics_snapshot.stop()
+        assert other._acquire_leader()
+    finally:
+        other.stop()
+        other.enabled = False
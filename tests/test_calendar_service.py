@@ -0,0 +1,100 @@
+from datetime import date, timedelta
+from models import Task
+from services import CalendarService
+
+
+def _add_task(test_db, user, title, start_date, deadline=None, status='pending', progress=None, description=''):
+    task = Task(
+        title=title,
+        description=description,
+        task_type='管理报告',
+        start_date=start_date,
+        deadline=deadline,
+        status=status,
+        priority='high',
+        progress=progress,
+        user_id=user.id
+    )
+    test_db.session.add(task)
+    test_db.session.commit()
+    return task
+
+
+def test_events_use_fullcalendar_shape(test_db, sample_user):
+    """测试日历事件为FullCalendar格式：结束日期不包含截止日，标题附带进展，不含描述"""
+    future = date.today() + timedelta(days=10)
+    task = _add_task(test_db, sample_user, '报告', future, future + timedelta(days=2),
+                     progress='报告撰写', description='很长的描述')
+    _add_task(test_db, sample_user, '单日', future + timedelta(days=5))
+    _add_task(test_db, sample_user, '已完成', future, status='completed')
+
+    events = CalendarService.get_events(sample_user.id, future, future + timedelta(days=30))
+    assert events[0] == {
+        'id': task.id,
+        'title': '报告 [报告撰写]',
+        'start': future.isoformat(),
+        'end': (future + timedelta(days=3)).isoformat(),
+        'allDay': True,
+        'extendedProps': {'task_type': '管理报告', 'status': 'pending', 'priority': 'high', 'is_overdue': False}
+    }
+    assert events[1]['title'] == '单日 [pending]'
+    assert 'end' not in events[1]
+    assert len(events) == 2
+
+    # 时间窗口之外的任务不返回，包含已完成任务时返回
+    assert CalendarService.get_events(sample_user.id, future + timedelta(days=3), future + timedelta(days=5)) == []
+    assert len(CalendarService.get_events(sample_user.id, future, future + timedelta(days=30),
+                                          include_completed=True)) == 3
+
+
+def test_event_routes(client, test_db, sample_user):
+    """测试日历事件接口和按需加载描述接口只返回当前用户的数据"""
+    task = _add_task(test_db, sample_user, '报告', date(2026, 3, 2), date(2026, 3, 4), description='描述')
+    with client.session_transaction() as session:
+        session['_user_id'] = str(sample_user.id)
+
+    response = client.get('/api/calendar/events?start=2026-03-01&end=2026-04-01')
+    assert response.status_code == 200
+    assert [event['end'] for event in response.get_json()] == ['2026-03-05']
+    assert client.get('/api/calendar/events?start=bad').status_code == 400
+
+    response = client.get(f'/api/calendar/events/{task.id}/description')
+    assert response.get_json() == {'id': task.id, 'description': '描述'}
+    assert client.get(f'/api/calendar/events/{task.id + 1}/description').status_code == 404
+
+
+def test_density_matches_per_day_scan(test_db, sample_user):
+    """测试每日任务数与逐日逐任务判断的结果一致，跨月任务截断到当月"""
+    today = date(2026, 3, 15)
+    specs = [
+        (date(2026, 2, 20), date(2026, 3, 3), 'pending'),
+        (date(2026, 3, 1), date(2026, 3, 20), 'in_progress'),
+        (date(2026, 3, 10), None, 'pending'),
+        (date(2026, 3, 28), date(2026, 4, 10), 'pending'),
+        (date(2026, 3, 5), date(2026, 3, 8), 'completed'),
+        (date(2026, 1, 1), date(2026, 1, 31), 'pending'),
+    ]
+    for index, (start, deadline, status) in enumerate(specs):
+        _add_task(test_db, sample_user, f'任务{index}', start, deadline, status=status)
+
+    density = CalendarService.get_density(sample_user.id, date(2026, 3, 9), today=today)
+    assert density['month'] == '2026-03'
+    assert len(density['days']) == 31
+
+    for offset, day in enumerate(density['days']):
+        current = date(2026, 3, 1) + timedelta(days=offset)
+        active = [(start, deadline) for start, deadline, status in specs
+                  if status != 'completed' and start <= current <= (deadline or start)]
+        assert day['date'] == current.isoformat()
+        assert day['active'] == len(active)
+        assert day['overdue'] == sum(1 for _, deadline in active if deadline and deadline < today)
+
+    assert density['days'][1] == {'date': '2026-03-02', 'active': 2, 'overdue': 1}
+
+
+def test_density_route(client, sample_user):
+    """测试月份参数格式错误时返回400"""
+    with client.session_transaction() as session:
+        session['_user_id'] = str(sample_user.id)
+    assert client.get('/api/calendar/density?month=2026-02').get_json()['days'][-1]['date'] == '2026-02-28'
+    assert client.get('/api/calendar/density?month=2026-13').status_code == 400
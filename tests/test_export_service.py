@@ -0,0 +1,80 @@
+import csv
+import io
+import json
+from datetime import date
+from models import Task, Issue, TaskReviewComment
+from services import ExportService
+import services.export_service as export_service
+
+
+def _add_tasks(test_db, user_id, count):
+    for index in range(count):
+        test_db.session.add(Task(title=f'任务{index}', task_type='管理报告', start_date=date(2026, 3, 1),
+                                 user_id=user_id))
+    test_db.session.commit()
+
+
+def test_stream_csv_in_batches(test_db, sample_user, monkeypatch):
+    """测试CSV导出分批输出，只包含当前用户的数据"""
+    monkeypatch.setattr(export_service, 'EXPORT_BATCH_SIZE', 2)
+    _add_tasks(test_db, sample_user.id, 5)
+    _add_tasks(test_db, sample_user.id + 1, 1)
+
+    chunks = list(ExportService.stream('tasks', 'csv', sample_user.id))
+    # 表头单独输出，随后每2行输出一次
+    assert len(chunks) == 4
+
+    rows = list(csv.reader(io.StringIO(''.join(chunks).lstrip('\ufeff'))))
+    assert rows[0][:3] == ['id', 'title', 'description']
+    assert [row[1] for row in rows[1:]] == [f'任务{index}' for index in range(5)]
+    assert rows[1][4] == '2026-03-01'
+
+
+def test_stream_csv_escapes_formulas(test_db, sample_user):
+    """测试CSV导出对可能被当作公式的文本加单引号前缀，NDJSON保持原样"""
+    test_db.session.add(Task(title='=HYPERLINK("http://example.com")', description='-1+2',
+                             task_type='管理报告', start_date=date(2026, 3, 1), user_id=sample_user.id))
+    test_db.session.add(Issue(title='@SUM(A1)', description='+cmd', user_id=sample_user.id))
+    test_db.session.commit()
+
+    rows = list(csv.reader(io.StringIO(''.join(ExportService.stream('tasks', 'csv', sample_user.id)).lstrip('\ufeff'))))
+    assert rows[1][1:3] == ['\'=HYPERLINK("http://example.com")', "'-1+2"]
+    assert rows[1][0].isdigit()
+
+    rows = list(csv.reader(io.StringIO(''.join(ExportService.stream('issues', 'csv', sample_user.id)).lstrip('\ufeff'))))
+    assert rows[1][1:3] == ["'@SUM(A1)", "'+cmd"]
+
+    line = ''.join(ExportService.stream('issues', 'ndjson', sample_user.id)).splitlines()[0]
+    assert json.loads(line)['title'] == '@SUM(A1)'
+
+
+def test_stream_ndjson_joins_task_owner(test_db, sample_user):
+    """测试NDJSON导出评论时按所属任务的用户过滤"""
+    _add_tasks(test_db, sample_user.id, 1)
+    _add_tasks(test_db, sample_user.id + 1, 1)
+    for task in Task.query.all():
+        test_db.session.add(TaskReviewComment(task_id=task.id, content=f'{task.user_id}的评论'))
+    test_db.session.add(Issue(title='问题', user_id=sample_user.id))
+    test_db.session.commit()
+
+    lines = ''.join(ExportService.stream('comments', 'ndjson', sample_user.id)).splitlines()
+    assert [json.loads(line)['content'] for line in lines] == [f'{sample_user.id}的评论']
+
+    issues = [json.loads(line) for line in ''.join(ExportService.stream('issues', 'ndjson', sample_user.id)).splitlines()]
+    assert issues[0]['title'] == '问题'
+    assert issues[0]['status'] == 'open'
+
+
+def test_export_route(client, sample_user):
+    """测试导出接口返回流式附件并校验参数"""
+    with client.session_transaction() as session:
+        session['_user_id'] = str(sample_user.id)
+
+    response = client.get('/api/export/tasks?format=ndjson')
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'application/x-ndjson'
+    assert 'attachment' in response.headers['Content-Disposition']
+
+    assert client.get('/api/export/users').status_code == 404
+    assert client.get('/api/export/tasks?format=xml').status_code == 400
@@ -0,0 +1,68 @@
+import time
+from datetime import date, timedelta
+from models import Task, TaskDailyRollup
+from services import ForecastService
+
+TODAY = date(2026, 6, 1)
+
+
+def _add_rollup(test_db, user, day, task_type, count):
+    test_db.session.add(TaskDailyRollup(user_id=user.id, day=day, task_type=task_type, completed_count=count,
+                                        total_elapsed_days=0, elapsed_count=0, deleted_count=0))
+
+
+def test_forecast_backlog(test_db, sample_user):
+    """测试按历史周吞吐量预测完成日期并标记有风险的任务"""
+    # 过去8周每周稳定完成2个管理报告
+    for week in range(8):
+        _add_rollup(test_db, sample_user, TODAY - timedelta(days=7 * week + 1), '管理报告', 2)
+    deadlines = [TODAY + timedelta(days=30), TODAY + timedelta(days=3), None, TODAY + timedelta(days=5)]
+    for index, deadline in enumerate(deadlines):
+        test_db.session.add(Task(title=f'报告{index}', task_type='管理报告', start_date=TODAY,
+                                 deadline=deadline, status='in_progress', user_id=sample_user.id))
+    test_db.session.add(Task(title='无历史', task_type='创新管理', start_date=TODAY,
+                             deadline=TODAY + timedelta(days=3), user_id=sample_user.id))
+    test_db.session.commit()
+
+    result = ForecastService.forecast_backlog(sample_user.id, simulations=500, seed=7, today=TODAY)
+    tasks = {task['title']: task for task in result['tasks']}
+
+    assert result['open_tasks'] == 5
+    # 截止日期早的两个任务第一周即可完成
+    assert tasks['报告1']['completion']['p50'] == (TODAY + timedelta(days=6)).isoformat()
+    assert tasks['报告1']['on_time_probability'] == 1.0
+    assert tasks['报告3']['on_time_probability'] == 1.0
+    assert tasks['报告0']['at_risk'] is False
+    # 无截止日期的任务排在最后，第二周完成
+    assert tasks['报告2']['completion']['p50'] == (TODAY + timedelta(days=13)).isoformat()
+    assert result['backlog_completion']['p85'] == (TODAY + timedelta(days=13)).isoformat()
+    assert tasks['无历史']['forecastable'] is False
+
+
+def test_forecast_backlog_flags_unlikely_deadlines(test_db, sample_user):
+    """测试吞吐量不足时标记截止日期有风险"""
+    _add_rollup(test_db, sample_user, TODAY - timedelta(days=1), '商业计划', 1)
+    for index in range(5):
+        test_db.session.add(Task(title=f'计划{index}', task_type='商业计划', start_date=TODAY,
+                                 deadline=TODAY + timedelta(days=6), user_id=sample_user.id))
+    test_db.session.commit()
+
+    start = time.perf_counter()
+    result = ForecastService.forecast_backlog(sample_user.id, simulations=2000, seed=1, today=TODAY)
+    elapsed = time.perf_counter() - start
+
+    # 每周只能完成1个，除最早的任务外都无法按时完成
+    assert len(result['at_risk']) == 4
+    assert elapsed < 1
+
+
+def test_forecast_ignores_completion_on_window_boundary(test_db, sample_user):
+    """测试恰好在历史窗口起点当天的完成记录不计入（不会越过周槽位）"""
+    _add_rollup(test_db, sample_user, TODAY - timedelta(days=26 * 7), '管理报告', 3)
+    _add_rollup(test_db, sample_user, TODAY - timedelta(days=26 * 7 - 1), '管理报告', 1)
+    test_db.session.commit()
+
+    throughput = ForecastService._weekly_throughput(sample_user.id, TODAY, 26)
+    assert len(throughput['管理报告']) == 26
+    assert throughput['管理报告'].sum() == 1
+    assert ForecastService.forecast_backlog(sample_user.id, simulations=100, seed=1, today=TODAY)['open_tasks'] == 0
@@ -0,0 +1,28 @@
+import random
+from services.interval_tree import IntervalTree
+
+
+def test_overlap_matches_linear_scan():
+    """测试区间树查询结果与逐个比较一致"""
+    rng = random.Random(7)
+    intervals = []
+    for index in range(300):
+        start = rng.randint(0, 1000)
+        intervals.append((start, start + rng.randint(0, 60), index))
+    tree = IntervalTree(intervals)
+    assert len(tree) == 300
+
+    for _ in range(200):
+        start = rng.randint(-50, 1050)
+        end = start + rng.randint(0, 80)
+        expected = sorted(value for s, e, value in intervals if s <= end and e >= start)
+        assert sorted(tree.overlap(start, end)) == expected
+
+
+def test_overlap_is_inclusive_and_handles_empty_tree():
+    """测试区间端点相接视为重叠，空树返回空列表"""
+    tree = IntervalTree([(1, 3, 'a'), (5, 5, 'b')])
+    assert tree.overlap(3, 4) == ['a']
+    assert tree.overlap(4, 4) == []
+    assert tree.overlap(0, 10) == ['a', 'b']
+    assert IntervalTree([]).overlap(0, 10) == []
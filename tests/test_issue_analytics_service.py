@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+from models import Issue
+from services import IssueAnalyticsService
+
+
+def _add_issue(test_db, user, title, created_at, priority='medium', resolved_after=None):
+    issue = Issue(title=title, priority=priority, created_at=created_at, user_id=user.id)
+    if resolved_after is not None:
+        issue.status = 'resolved'
+        issue.resolved_at = created_at + resolved_after
+    test_db.session.add(issue)
+    test_db.session.commit()
+    return issue
+
+
+def test_issue_analytics(test_db, sample_user):
+    """测试解决耗时分位数、账龄分段和每月解决率"""
+    now = datetime(2026, 5, 20, 12, 0)
+    for hours in (1, 2, 3, 4, 10):
+        _add_issue(test_db, sample_user, f'高{hours}', datetime(2026, 5, 1), 'high', timedelta(hours=hours))
+    _add_issue(test_db, sample_user, '低', datetime(2026, 4, 10), 'low', timedelta(hours=48))
+    _add_issue(test_db, sample_user, '新问题', now - timedelta(hours=5), 'high')
+    _add_issue(test_db, sample_user, '一周内', now - timedelta(days=3))
+    _add_issue(test_db, sample_user, '很久以前', now - timedelta(days=90), 'low')
+
+    data = IssueAnalyticsService.get_issue_analytics(sample_user.id, months=3, now=now)
+
+    high = data['time_to_resolve']['by_priority']['high']
+    assert high == {'count': 5, 'mean_hours': 4.0, 'p50_hours': 3.0, 'p90_hours': 10.0}
+    assert data['time_to_resolve']['by_priority']['low']['p50_hours'] == 48.0
+    assert data['time_to_resolve']['count'] == 6
+
+    aging = data['open_aging']
+    assert aging['total'] == 3
+    assert aging['buckets']['0-1'] == {'total': 1, 'high': 1, 'medium': 0, 'low': 0}
+    assert aging['buckets']['1-7']['medium'] == 1
+    assert aging['buckets']['7-30']['total'] == 0
+    assert aging['buckets']['30+']['low'] == 1
+
+    monthly = data['monthly']
+    assert monthly['labels'] == ['2026-03', '2026-04', '2026-05']
+    assert monthly['created'] == [0, 1, 7]
+    assert monthly['resolved_of_created'] == [0, 1, 5]
+    assert monthly['resolution_rate'] == [None, 1.0, round(5 / 7, 3)]
+    assert monthly['resolved'] == [0, 1, 5]
+
+
+def test_unset_priority_merges_with_medium(test_db, sample_user):
+    """测试未设置优先级的问题与medium合并统计，而不是互相覆盖"""
+    now = datetime(2026, 5, 20, 12, 0)
+    for hours in (2, 4):
+        _add_issue(test_db, sample_user, f'中{hours}', datetime(2026, 5, 1), 'medium', timedelta(hours=hours))
+    _add_issue(test_db, sample_user, '未设置', datetime(2026, 5, 1), None, timedelta(hours=6))
+    _add_issue(test_db, sample_user, '未设置未解决', now - timedelta(hours=2), None)
+    _add_issue(test_db, sample_user, '中未解决', now - timedelta(hours=3))
+
+    data = IssueAnalyticsService.get_issue_analytics(sample_user.id, months=1, now=now)
+
+    assert data['time_to_resolve']['by_priority'] == {
+        'medium': {'count': 3, 'mean_hours': 4.0, 'p50_hours': 4.0, 'p90_hours': 6.0}
+    }
+    assert data['time_to_resolve']['count'] == 3
+    assert data['open_aging']['buckets']['0-1'] == {'total': 2, 'high': 0, 'medium': 2, 'low': 0}
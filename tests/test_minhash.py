@@ -0,0 +1,43 @@
+import random
+from services.minhash import MinHasher, LSHIndex, shingles
+
+
+def test_shingles_ignore_case_whitespace_and_punctuation():
+    """测试shingle切分忽略大小写、空白和标点，短文本整体作为一个shingle"""
+    assert shingles('服务器，宕机 A') == {'服务', '务器', '器宕', '宕机', '机a'}
+    assert shingles('Ab') == {'ab'}
+    assert shingles(' ，。') == set()
+
+
+def test_signature_similarity_estimates_jaccard():
+    """测试签名估计的相似度接近真实Jaccard相似度，签名在不同实例间稳定"""
+    hasher = MinHasher(256)
+    first = {f'item{i}' for i in range(100)}
+    second = {f'item{i}' for i in range(50, 150)}
+    estimate = MinHasher.similarity(hasher.signature(first), hasher.signature(second))
+    assert abs(estimate - 50 / 150) < 0.1
+    assert (MinHasher(256).signature(first) == hasher.signature(first)).all()
+    assert hasher.signature([]) is None
+
+
+def test_lsh_finds_near_duplicates_and_supports_removal():
+    """测试LSH索引找到近似重复项、过滤低相似度候选项，并支持替换和移除"""
+    rng = random.Random(3)
+    hasher = MinHasher(64)
+    alphabet = '服务器数据库网络磁盘内存告警超时失败重启部署'
+    texts = {key: ''.join(rng.choice(alphabet) for _ in range(40)) for key in range(200)}
+    index = LSHIndex(16, 4)
+    for key, text in texts.items():
+        index.add(key, hasher.signature(shingles(text)))
+    assert len(index) == 200
+
+    query = hasher.signature(shingles(texts[7] + '补充'))
+    matches = index.query(query, threshold=0.5)
+    assert matches[0][0] == 7
+    assert all(score >= 0.5 for _, score in matches)
+
+    index.add(7, hasher.signature(shingles('完全不同的内容')))
+    assert 7 not in [key for key, _ in index.query(query, threshold=0.5)]
+    index.remove(7)
+    index.remove(7)
+    assert len(index) == 199
@@ -0,0 +1,36 @@
+import random
+from services.quantile_sketch import KLLSketch
+
+
+def test_kll_sketch_exact_for_small_inputs():
+    """测试样本数较少时结果精确"""
+    sketch = KLLSketch()
+    sketch.extend([5, 1, 4, 2, 3])
+
+    assert sketch.quantile(0.5) == 3
+    assert sketch.quantile(0.99) == 5
+    assert KLLSketch().quantile(0.5) is None
+
+
+def test_kll_sketch_bounded_and_mergeable():
+    """测试大量样本时空间有界、可合并且误差可控"""
+    rng = random.Random(42)
+    values = [rng.random() * 100 for _ in range(20000)]
+
+    left = KLLSketch()
+    left.extend(values[:10000])
+    right = KLLSketch.from_json(KLLSketch().to_json())
+    right.extend(values[10000:])
+    left.merge(right)
+
+    assert left.n == 20000
+    assert sum(len(compactor) for compactor in left.compactors) < 1000
+
+    ordered = sorted(values)
+    for q in (0.5, 0.9, 0.99):
+        estimate = left.quantile(q)
+        rank = sum(1 for value in ordered if value <= estimate) / len(ordered)
+        assert abs(rank - q) < 0.02
+
+    restored = KLLSketch.from_json(left.to_json())
+    assert restored.quantile(0.5) == left.quantile(0.5)
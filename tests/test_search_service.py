@@ -0,0 +1,92 @@
+from models import User
+from services import SearchService, TaskService, IssueService
+from services.auth_service import AuthService
+from services.search_service import tokenize, build_match_query, _snippet
+
+
+def test_tokenize_and_query_handle_cjk():
+    """测试中文按二元词切分并补末尾单字，查询词转换为短语和前缀查询"""
+    assert tokenize('年度Report报告 v2') == '年度 度 report 报告 告 v2'
+    assert build_match_query('年度报告 API 任') == '"年度 度报 报告" AND "api"* AND "任"*'
+    assert build_match_query('  ，。!') is None
+
+
+def test_snippet_marks_raw_text_not_html_entities():
+    """测试命中词在原始文本上定位，不会匹配到转义后的HTML实体"""
+    assert _snippet('R&D amp', ['amp']) == 'R&amp;D <mark>amp</mark>'
+    assert _snippet('say "quot" <b>', ['quot']) == 'say &quot;<mark>quot</mark>&quot; &lt;b&gt;'
+    assert _snippet('a<b', ['<b']) == 'a<mark>&lt;b</mark>'
+
+
+def test_search_ranks_scopes_and_tracks_writes(test_db, sample_user):
+    """测试检索按相关度排序、只返回当前用户的数据，并随任务、问题和评论的写入更新"""
+    other = User(username='other', email='other@example.com')
+    other.password = 'password'
+    test_db.session.add(other)
+    test_db.session.commit()
+
+    in_title = TaskService.create_task({'title': '年度预算报告', 'task_type': '管理报告', 'user_id': sample_user.id,
+                                        'description': '汇总各部门数据', 'status': 'completed'})
+    in_body = TaskService.create_task({'title': '季度总结', 'task_type': '管理报告', 'user_id': sample_user.id,
+                                       'description': '附上预算执行情况和<附件>'})
+    TaskService.create_task({'title': '预算审核', 'task_type': '管理报告', 'user_id': other.id})
+    issue = IssueService.create_issue({'title': '服务器告警', 'description': '磁盘空间不足'}, sample_user.id)
+    TaskService.add_task_comment(in_title.id, '预算口径需要提前与财务确认')
+
+    results = SearchService.search(sample_user.id, '预算')
+    # 标题命中排在正文命中之前，其他用户的任务不返回
+    assert (results[0]['type'], results[0]['id']) == ('task', in_title.id)
+    assert sorted((result['type'], result['id']) for result in results[1:]) == [('comment', 1), ('task', in_body.id)]
+    comment = next(result for result in results if result['type'] == 'comment')
+    assert comment['task_id'] == in_title.id and comment['title'] == '年度预算报告'
+    # 摘要转义HTML并标记命中词
+    body_match = next(result for result in results if result['type'] == 'task' and result['id'] == in_body.id)
+    assert body_match['snippet'] == '附上<mark>预算</mark>执行情况和&lt;附件&gt;'
+
+    # 单字、类型过滤和多词AND
+    assert [result['id'] for result in SearchService.search(sample_user.id, '警', kinds=['issue'])] == [issue.id]
+    assert SearchService.search(sample_user.id, '预算 磁盘') == []
+
+    # 问题的解决方案并入索引，删除后不再返回
+    IssueService.add_solution(issue.id, '清理日志 logrotate')
+    assert [result['id'] for result in SearchService.search(sample_user.id, 'logrot')] == [issue.id]
+    IssueService.delete_issue(issue.id)
+    assert SearchService.search(sample_user.id, '告警') == []
+
+    # 删除任务同时删除其评论的索引
+    TaskService.delete_task(in_title.id)
+    assert [result['id'] for result in SearchService.search(sample_user.id, '预算')] == [in_body.id]
+
+    # 重建索引得到相同的结果
+    assert SearchService.rebuild() == 2
+    assert [result['id'] for result in SearchService.search(sample_user.id, '预算')] == [in_body.id]
+
+
+def test_search_route(client, sample_user):
+    """测试检索接口参数校验"""
+    with client.session_transaction() as session:
+        session['_user_id'] = str(sample_user.id)
+    assert client.get('/api/search?q=').status_code == 400
+    assert client.get('/api/search?q=预算&type=user').status_code == 400
+    assert client.get('/api/search?q=预算&limit=500').status_code == 400
+    assert client.get('/api/search?q=预算').get_json() == {'query': '预算', 'results': []}
+
+
+def test_deleted_user_results_not_visible_to_reused_id(test_db, sample_user):
+    """测试删除用户后其索引行随之删除，复用同一ID的新用户检索不到旧数据"""
+    other = User(username='other', email='other@example.com')
+    other.password = 'password'
+    test_db.session.add(other)
+    test_db.session.commit()
+    other_id = other.id
+    TaskService.create_task({'title': '机密项目报告', 'task_type': '管理报告', 'user_id': other_id})
+    TaskService.create_task({'title': '机密预算', 'task_type': '管理报告', 'user_id': sample_user.id})
+
+    AuthService.delete_user(other)
+    reused = User(id=other_id, username='newcomer', email='newcomer@example.com')
+    reused.password = 'password'
+    test_db.session.add(reused)
+    test_db.session.commit()
+
+    assert SearchService.search(other_id, '机密') == []
+    assert len(SearchService.search(sample_user.id, '机密')) == 1
@@ -0,0 +1,110 @@
+import numpy as np
+from models import Issue, IssueSignature, User
+from services import IssueService
+from services.auth_service import AuthService
+from services.similar_issue_index import similar_issue_index
+
+
+def test_similar_issues_prefer_resolved_with_solution(test_db, sample_user):
+    """测试推荐近似重复的问题，已解决且有成功方案的排在前面，随问题的修改和删除更新"""
+    unresolved = IssueService.create_issue({'title': '数据库连接池耗尽导致接口超时',
+                                            'description': '高峰期大量请求等待连接'}, sample_user.id)
+    solved = IssueService.create_issue({'title': '数据库连接池耗尽导致接口超时报错',
+                                        'description': '高峰期大量请求等待连接'}, sample_user.id)
+    IssueService.add_solution(solved.id, '调大连接池并缩短事务')
+    IssueService.mark_solution_successful(solved.id, 0)
+    IssueService.resolve_issue(solved.id)
+    IssueService.create_issue({'title': '前端页面样式错乱', 'description': '按钮重叠'}, sample_user.id)
+
+    similar = IssueService.find_similar_issues(sample_user.id, '数据库连接池耗尽，接口超时', '高峰期大量请求等待连接')
+    assert [issue['id'] for issue in similar] == [solved.id, unresolved.id]
+    assert similar[0]['successful_solution'] == '调大连接池并缩短事务'
+    assert IssueService.find_similar_issues(sample_user.id, '数据库连接池耗尽导致接口超时', '高峰期大量请求等待连接',
+                                            exclude_issue_id=unresolved.id)[0]['id'] == solved.id
+
+    # 其他用户看不到
+    assert IssueService.find_similar_issues(sample_user.id + 1, '数据库连接池耗尽导致接口超时') == []
+
+    # 修改和删除后索引增量更新
+    IssueService.update_issue(unresolved.id, {'title': '打印机缺纸', 'description': ''})
+    IssueService.delete_issue(solved.id)
+    assert IssueService.find_similar_issues(sample_user.id, '数据库连接池耗尽导致接口超时', '高峰期大量请求等待连接') == []
+    assert IssueSignature.query.count() == 2
+
+
+def test_index_loads_persisted_signatures(test_db, sample_user):
+    """测试索引从签名表加载而不重新计算，签名表可以从问题重建"""
+    issue = IssueService.create_issue({'title': '邮件发送失败', 'description': 'SMTP认证错误'}, sample_user.id)
+    stored = IssueSignature.query.get(issue.id)
+    expected = similar_issue_index.signature(issue.title, issue.description)
+    assert (np.frombuffer(stored.signature, dtype=np.uint32) == expected).all()
+
+    # 模拟重启：清空内存索引后仍能从签名表找到
+    similar_issue_index.clear()
+    assert [item['id'] for item in IssueService.find_similar_issues(sample_user.id, '邮件发送失败', 'SMTP认证错误')] == [issue.id]
+
+    test_db.session.add(Issue(title='历史问题：邮件发送失败', description='SMTP认证错误', user_id=sample_user.id))
+    test_db.session.commit()
+    assert IssueService.rebuild_signatures() == 2
+    assert len(IssueService.find_similar_issues(sample_user.id, '邮件发送失败', 'SMTP认证错误')) == 2
+
+
+def test_index_reloads_after_writes_from_other_processes(test_db, sample_user):
+    """测试其他进程写入签名表（不经过本进程的失效通知）后，本进程的索引重新加载"""
+    first = IssueService.create_issue({'title': '定时任务没有执行', 'description': 'cron日志为空'}, sample_user.id)
+    assert [item['id'] for item in IssueService.find_similar_issues(sample_user.id, '定时任务没有执行', 'cron日志为空')] == [first.id]
+
+    # 直接写数据库，模拟其他工作进程新建问题
+    second = Issue(title='定时任务没有执行！', description='cron日志为空', user_id=sample_user.id)
+    test_db.session.add(second)
+    test_db.session.flush()
+    signature = similar_issue_index.signature(second.title, second.description)
+    test_db.session.add(IssueSignature(issue_id=second.id, user_id=sample_user.id, signature=signature.tobytes()))
+    test_db.session.commit()
+    assert sorted(item['id'] for item in IssueService.find_similar_issues(sample_user.id, '定时任务没有执行', 'cron日志为空')) == \
+        [first.id, second.id]
+
+    # 其他进程修改问题文本后签名更新
+    other_signature = similar_issue_index.signature('打印机卡纸', '')
+    IssueSignature.query.filter_by(issue_id=first.id).update({'signature': other_signature.tobytes()})
+    test_db.session.commit()
+    assert [item['id'] for item in IssueService.find_similar_issues(sample_user.id, '定时任务没有执行', 'cron日志为空')] == [second.id]
+
+
+def test_deleted_user_issues_not_suggested_to_reused_id(test_db, sample_user):
+    """测试删除用户后其签名随之删除，复用同一ID的新用户看不到旧问题；残留的签名也会被按用户过滤"""
+    other = User(username='other', email='other@example.com')
+    other.password = 'password'
+    test_db.session.add(other)
+    test_db.session.commit()
+    other_id = other.id
+    IssueService.create_issue({'title': '机密系统登录失败', 'description': '令牌过期'}, other_id)
+    assert len(IssueService.find_similar_issues(other_id, '机密系统登录失败', '令牌过期')) == 1
+
+    AuthService.delete_user(other)
+    assert IssueSignature.query.filter_by(user_id=other_id).count() == 0
+    reused = User(id=other_id, username='newcomer', email='newcomer@example.com')
+    reused.password = 'password'
+    test_db.session.add(reused)
+    test_db.session.commit()
+    assert IssueService.find_similar_issues(other_id, '机密系统登录失败', '令牌过期') == []
+
+    # 签名行的用户与问题不一致时（例如历史残留），读取候选问题时再次按用户过滤
+    issue = IssueService.create_issue({'title': '报表导出乱码', 'description': 'Excel打开乱码'}, sample_user.id)
+    IssueSignature.query.filter_by(issue_id=issue.id).update({'user_id': other_id})
+    test_db.session.commit()
+    similar_issue_index.clear()
+    assert IssueService.find_similar_issues(other_id, '报表导出乱码', 'Excel打开乱码') == []
+
+
+def test_similar_issue_routes(client, sample_user):
+    """测试创建问题时返回相似问题，提交前查询接口参数校验"""
+    with client.session_transaction() as session:
+        session['_user_id'] = str(sample_user.id)
+    client.post('/api/issues', json={'title': '报表导出缓慢', 'description': '导出一万行需要一分钟'})
+    response = client.post('/api/issues', json={'title': '报表导出很缓慢', 'description': '导出一万行需要一分钟'})
+    assert [issue['title'] for issue in response.get_json()['similar_issues']] == ['报表导出缓慢']
+
+    assert client.get('/api/issues/similar').status_code == 400
+    response = client.get('/api/issues/similar?title=报表导出缓慢&description=导出一万行需要一分钟')
+    assert len(response.get_json()['similar_issues']) == 2
@@ -0,0 +1,85 @@
+import json
+from services import TaskService
+from services.task_events import TaskEventHub, task_events, TASK_EVENT_QUEUE_SIZE
+
+
+def test_publish_reaches_only_the_users_subscribers():
+    """测试事件只发送给对应用户的订阅者，取消订阅后不再接收"""
+    hub = TaskEventHub()
+    first = hub.subscribe(1)
+    second = hub.subscribe(1)
+    other = hub.subscribe(2)
+
+    hub.publish(1, 'deleted', {'id': 5})
+    assert first.get_nowait() == {'type': 'deleted', 'data': {'id': 5}}
+    assert second.get_nowait() == {'type': 'deleted', 'data': {'id': 5}}
+    assert other.empty()
+
+    hub.unsubscribe(1, first)
+    hub.publish(1, 'deleted', {'id': 6})
+    assert first.empty()
+    assert hub.subscriber_count(1) == 1
+
+
+def test_full_queue_collapses_to_resync():
+    """测试订阅者积压过多时丢弃积压事件，改为一条重新同步事件"""
+    hub = TaskEventHub()
+    subscriber = hub.subscribe(1)
+    for task_id in range(TASK_EVENT_QUEUE_SIZE + 1):
+        hub.publish(1, 'deleted', {'id': task_id})
+    assert subscriber.qsize() == 1
+    assert subscriber.get_nowait()['type'] == 'resync'
+
+
+def test_stream_formats_events_and_unsubscribes_on_close():
+    """测试SSE消息格式和心跳，连接关闭后取消订阅"""
+    hub = TaskEventHub()
+    hub.heartbeat = 0.01
+    stream = hub.stream(1)
+    assert next(stream) == 'retry: 3000\n\n'
+    assert hub.subscriber_count(1) == 1
+
+    assert next(stream) == ': heartbeat\n\n'
+    hub.publish(1, 'updated', {'id': 3, 'title': '任务'})
+    message = next(stream)
+    assert message.startswith('event: task\ndata: ')
+    assert json.loads(message[len('event: task\ndata: '):]) == {'type': 'updated', 'data': {'id': 3, 'title': '任务'}}
+
+    stream.close()
+    assert hub.subscriber_count(1) == 0
+
+
+def test_task_service_publishes_mutations(test_db, sample_user):
+    """测试任务创建、完成、状态更新和删除后推送对应事件"""
+    subscriber = task_events.subscribe(sample_user.id)
+    try:
+        task = TaskService.create_task({'title': '推送任务', 'task_type': '临时报告', 'user_id': sample_user.id})
+        TaskService.update_task_status(task.id, {'status': 'in_progress'})
+        TaskService.complete_task(task.id)
+        TaskService.delete_task(task.id)
+
+        events = [subscriber.get_nowait() for _ in range(4)]
+        assert [event['type'] for event in events] == ['created', 'updated', 'updated', 'deleted']
+        assert events[0]['data']['title'] == '推送任务'
+        assert events[1]['data']['status'] == 'in_progress'
+        assert events[2]['data']['status'] == 'completed'
+        assert events[3]['data'] == {'id': task.id}
+        assert subscriber.empty()
+    finally:
+        task_events.unsubscribe(sample_user.id, subscriber)
+
+
+def test_stream_route_requires_opt_in(app, client, sample_user):
+    """测试未开启推送时接口返回204（浏览器不再重连），开启后返回事件流"""
+    with client.session_transaction() as session:
+        session['_user_id'] = str(sample_user.id)
+    assert client.get('/api/tasks/stream').status_code == 204
+
+    app.config['TASK_EVENT_STREAM_ENABLED'] = True
+    response = client.get('/api/tasks/stream', buffered=False)
+    try:
+        assert response.mimetype == 'text/event-stream'
+        assert next(response.response) == b'retry: 3000\n\n'
+    finally:
+        response.close()
+    assert task_events.subscriber_count(sample_user.id) == 0
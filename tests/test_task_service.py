@@ -0,0 +1,286 @@
+import threading
+import pytest
+from datetime import date, datetime, timedelta
+from app import create_app
+from config import config
+from models import db, Task, TaskDailyRollup, TaskDurationSketch, TaskReviewComment, User
+from services import TaskService, RollupService
+from services.quantile_sketch import KLLSketch
+from models.task import beijing_now
+from services.time_utils import to_naive
+from services.pagination import MAX_PAGE_SIZE
+
+
+def _add_task(test_db, user, title, start_date, deadline=None, status='pending'):
+    task = Task(
+        title=title,
+        task_type='管理报告',
+        start_date=start_date,
+        deadline=deadline,
+        status=status,
+        user_id=user.id
+    )
+    test_db.session.add(task)
+    test_db.session.commit()
+    return task
+
+
+def test_get_all_tasks_date_window(test_db, sample_user):
+    """测试按时间窗口获取任务"""
+    _add_task(test_db, sample_user, '窗口之前', date(2026, 1, 1), date(2026, 1, 31))
+    _add_task(test_db, sample_user, '跨越窗口开始', date(2026, 2, 20), date(2026, 3, 5))
+    _add_task(test_db, sample_user, '窗口之内', date(2026, 3, 10), date(2026, 3, 12))
+    _add_task(test_db, sample_user, '无截止日期', date(2026, 3, 15))
+    _add_task(test_db, sample_user, '跨越整个窗口', date(2025, 12, 1), date(2026, 6, 1))
+    _add_task(test_db, sample_user, '窗口之后', date(2026, 4, 1), date(2026, 4, 3))
+
+    tasks = TaskService.get_all_tasks(user_id=sample_user.id, start=date(2026, 3, 1), end=date(2026, 4, 1))
+    titles = sorted(task['title'] for task in tasks)
+
+    assert titles == sorted(['跨越窗口开始', '窗口之内', '无截止日期', '跨越整个窗口'])
+
+    # 不提供时间窗口时返回全部任务
+    assert len(TaskService.get_all_tasks(user_id=sample_user.id)) == 6
+
+
+def test_to_dict_is_read_only_and_promote_overdue(test_db, sample_user):
+    """测试序列化不写库，过期任务由批量任务统一更新状态"""
+    today = date.today()
+    overdue = _add_task(test_db, sample_user, '已过期', today - timedelta(days=10), today - timedelta(days=1))
+    future = _add_task(test_db, sample_user, '未开始', today + timedelta(days=1), today + timedelta(days=5))
+
+    assert overdue.to_dict()['status'] == 'in_progress'
+    test_db.session.expire_all()
+    assert Task.query.get(overdue.id).status == 'pending'
+
+    assert TaskService.promote_overdue_tasks() == 1
+    test_db.session.expire_all()
+    assert Task.query.get(overdue.id).status == 'in_progress'
+    assert Task.query.get(future.id).status == 'pending'
+
+
+def test_daily_rollup_follows_task_writes(test_db, sample_user):
+    """测试完成、取消完成和删除任务时同步更新每日汇总"""
+    task = _add_task(test_db, sample_user, '汇总任务', date.today())
+
+    assert TaskService.complete_task(task.id)
+    rollup = TaskDailyRollup.query.filter_by(user_id=sample_user.id, task_type='管理报告').one()
+    assert rollup.completed_count == 1
+    assert rollup.elapsed_count == 1
+
+    assert TaskService.update_task_status(task.id, {'status': 'in_progress'})['success']
+    assert rollup.completed_count == 0
+    assert rollup.elapsed_count == 0
+
+    assert TaskService.update_task_status(task.id, {'status': 'completed'})['success']
+    assert rollup.completed_count == 1
+
+    assert TaskService.delete_task(task.id)
+    assert rollup.completed_count == 0
+    assert rollup.deleted_count == 1
+
+    # 重建后删除计数保留，完成计数与任务表一致
+    RollupService.rebuild()
+    rollup = TaskDailyRollup.query.filter_by(user_id=sample_user.id, task_type='管理报告').one()
+    assert rollup.completed_count == 0
+    assert rollup.deleted_count == 1
+
+
+def test_rollup_without_user_updates_single_row(test_db):
+    """测试没有用户的任务（唯一约束不约束NULL）也只维护一行汇总"""
+    first = Task(title='无用户一', task_type='管理报告')
+    second = Task(title='无用户二', task_type='管理报告')
+    test_db.session.add_all([first, second])
+    test_db.session.commit()
+    TaskService.complete_task(first.id)
+    TaskService.complete_task(second.id)
+    TaskService.delete_task(first.id)
+
+    rollup = TaskDailyRollup.query.filter(TaskDailyRollup.user_id.is_(None)).one()
+    assert rollup.completed_count == 1
+    assert rollup.deleted_count == 1
+
+
+def test_concurrent_completions_upsert_rollup_and_sketch(tmp_path):
+    """测试并发完成同一用户、同一天、同一类型的任务时汇总行和草图不冲突也不丢失计数"""
+    config['rollup_concurrency'] = type('RollupConcurrencyConfig', (config['default'],), {
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "primary.db"}',
+        'SQLITE_JOURNAL_MODE': 'WAL'
+    })
+    try:
+        app = create_app('rollup_concurrency')
+        with app.app_context():
+            db.create_all()
+            user = User(username='tester', email='tester@example.com', password_hash='x')
+            db.session.add(user)
+            db.session.commit()
+            user_id = user.id
+            tasks = [Task(title=f'并发{i}', task_type='临时报告', user_id=user_id) for i in range(6)]
+            db.session.add_all(tasks)
+            db.session.commit()
+            task_ids = [task.id for task in tasks]
+
+        barrier = threading.Barrier(len(task_ids))
+        errors = []
+
+        def complete(task_id):
+            with app.app_context():
+                try:
+                    barrier.wait()
+                    TaskService.complete_task(task_id)
+                except Exception as e:
+                    errors.append(e)
+                finally:
+                    db.session.remove()
+
+        threads = [threading.Thread(target=complete, args=(task_id,)) for task_id in task_ids]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with app.app_context():
+            assert errors == []
+            assert TaskDailyRollup.query.filter_by(user_id=user_id).one().completed_count == len(task_ids)
+            sketch = TaskDurationSketch.query.filter_by(user_id=user_id, task_type='临时报告').one()
+            assert KLLSketch.from_json(sketch.sketch).n == len(task_ids)
+            db.session.remove()
+    finally:
+        del config['rollup_concurrency']
+
+
+def test_duration_sketch_follows_completion(test_db, sample_user):
+    """测试完成时长草图随完成和取消完成增量更新"""
+    first = TaskService.create_task({'title': '任务一', 'task_type': '临时报告', 'user_id': sample_user.id})
+    second = TaskService.create_task({'title': '任务二', 'task_type': '临时报告', 'user_id': sample_user.id})
+    TaskService.complete_task(first.id)
+    TaskService.complete_task(second.id)
+
+    sketch = KLLSketch.from_json(TaskDurationSketch.query.filter_by(user_id=sample_user.id, task_type='临时报告').one().sketch)
+    assert sketch.n == 2
+    assert sketch.quantile(0.5) == 1
+
+    TaskService.update_task_status(second.id, {'status': 'in_progress'})
+    sketch = KLLSketch.from_json(TaskDurationSketch.query.filter_by(user_id=sample_user.id, task_type='临时报告').one().sketch)
+    assert sketch.n == 1
+
+
+def test_find_conflicts_tracks_task_writes(test_db, sample_user):
+    """测试冲突检查只返回重叠的未完成高优先级任务，并随任务写入失效"""
+    TaskService.create_task({'title': '高优先级', 'task_type': '管理报告', 'priority': 'high',
+                             'start_date': '2026-03-01', 'deadline': '2026-03-10', 'user_id': sample_user.id})
+    TaskService.create_task({'title': '普通优先级', 'task_type': '管理报告', 'priority': 'medium',
+                             'start_date': '2026-03-01', 'deadline': '2026-03-10', 'user_id': sample_user.id})
+
+    conflicts = TaskService.find_conflicts(sample_user.id, date(2026, 3, 10), date(2026, 3, 20))
+    assert [task['title'] for task in conflicts] == ['高优先级']
+    assert TaskService.find_conflicts(sample_user.id, date(2026, 3, 11)) == []
+
+    # 新建任务后索引失效并重建
+    late = TaskService.create_task({'title': '新任务', 'task_type': '临时报告', 'priority': 'high',
+                                    'start_date': '2026-03-15', 'user_id': sample_user.id})
+    conflicts = TaskService.find_conflicts(sample_user.id, date(2026, 3, 1), date(2026, 3, 31))
+    assert sorted(task['title'] for task in conflicts) == ['新任务', '高优先级']
+    assert len(TaskService.find_conflicts(sample_user.id, date(2026, 3, 1), date(2026, 3, 31),
+                                          exclude_task_id=late.id)) == 1
+
+    # 已完成任务不再参与冲突检查
+    TaskService.complete_task(late.id)
+    assert TaskService.find_conflicts(sample_user.id, date(2026, 3, 15)) == []
+
+
+def test_find_conflicts_sees_writes_from_other_processes(test_db, sample_user):
+    """测试其他进程的写入（不经过本进程的失效通知）也会让缓存的区间树重建"""
+    TaskService.create_task({'title': '高优先级', 'task_type': '管理报告', 'priority': 'high',
+                             'start_date': '2026-03-01', 'deadline': '2026-03-10', 'user_id': sample_user.id})
+    assert len(TaskService.find_conflicts(sample_user.id, date(2026, 3, 5))) == 1
+
+    # 直接写数据库，模拟其他工作进程处理的请求
+    other = Task(title='其他进程新建', task_type='临时报告', priority='high', start_date=date(2026, 3, 5),
+                 user_id=sample_user.id)
+    test_db.session.add(other)
+    test_db.session.commit()
+    assert sorted(task['title'] for task in TaskService.find_conflicts(sample_user.id, date(2026, 3, 5))) == \
+        ['其他进程新建', '高优先级']
+
+    test_db.session.delete(other)
+    test_db.session.commit()
+    assert [task['title'] for task in TaskService.find_conflicts(sample_user.id, date(2026, 3, 5))] == ['高优先级']
+
+
+def test_keyset_pagination(test_db, sample_user):
+    """测试任务列表和任务历史按游标分页，翻页结果不重不漏"""
+    created_at = datetime(2026, 3, 1, 9)
+    for index in range(5):
+        # 前两个任务创建时间相同，由id区分先后
+        test_db.session.add(Task(title=f'任务{index}', task_type='管理报告', start_date=date(2026, 3, 1),
+                                 created_at=created_at + timedelta(hours=max(index - 1, 0)),
+                                 user_id=sample_user.id))
+    test_db.session.commit()
+
+    titles = []
+    cursor = None
+    while True:
+        page = TaskService.get_tasks_page(user_id=sample_user.id, limit=2, cursor=cursor)
+        assert len(page['tasks']) <= 2
+        titles.extend(task['title'] for task in page['tasks'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    assert titles == ['任务4', '任务3', '任务2', '任务1', '任务0']
+
+    with pytest.raises(ValueError):
+        TaskService.get_tasks_page(user_id=sample_user.id, cursor='invalid')
+
+    task = Task.query.filter_by(title='任务0').one()
+    for status in ('in_progress', 'completed', 'in_progress'):
+        TaskService.update_task_status(task.id, {'status': status})
+    first = TaskService.get_task_history(task.id, limit=2)
+    second = TaskService.get_task_history(task.id, limit=2, cursor=first['next_cursor'])
+    assert [record['new_value'] for record in first['history'] + second['history']] == ['进行中', '已完成', '进行中']
+    ids = [record['id'] for record in first['history'] + second['history']]
+    assert ids == sorted(ids, reverse=True)
+    assert second['next_cursor'] is None
+
+    # 未指定limit的旧调用方拿到全部记录，不受每页条数上限限制
+    full = TaskService.get_task_history(task.id)
+    assert [record['id'] for record in full['history']] == ids
+    assert full['next_cursor'] is None
+
+    test_db.session.add_all([TaskReviewComment(task_id=task.id, content=f'评论{i}') for i in range(MAX_PAGE_SIZE + 1)])
+    test_db.session.commit()
+    comments = TaskService.get_task_comments(task.id)
+    assert len(comments['comments']) == MAX_PAGE_SIZE + 1
+    assert comments['next_cursor'] is None
+    assert len(TaskService.get_task_comments(task.id, limit=MAX_PAGE_SIZE)['comments']) == MAX_PAGE_SIZE
+
+
+def test_get_changes_with_tombstones(test_db, sample_user):
+    """测试增量同步返回令牌之后的变更和删除，过期或缺失的令牌要求全量刷新"""
+    first = TaskService.get_changes(sample_user.id)
+    assert first['reset'] is True
+
+    now = to_naive(beijing_now())
+    old = TaskService.create_task({'title': '旧任务', 'task_type': '管理报告', 'user_id': sample_user.id})
+    Task.query.filter_by(id=old.id).update({Task.updated_at: now - timedelta(hours=2)})
+    test_db.session.commit()
+    token = TaskService.get_changes(sample_user.id, now=now - timedelta(hours=1))['next_token']
+
+    changed = TaskService.create_task({'title': '新任务', 'task_type': '管理报告', 'user_id': sample_user.id})
+    removed = TaskService.create_task({'title': '删除任务', 'task_type': '管理报告', 'user_id': sample_user.id})
+    removed_id = removed.id
+    TaskService.delete_task(removed_id)
+
+    changes = TaskService.get_changes(sample_user.id, token, now=now + timedelta(minutes=1))
+    assert changes['reset'] is False
+    assert [task['id'] for task in changes['changed']] == [changed.id]
+    assert changes['deleted'] == [removed_id]
+
+    # 超过删除记录保留期的令牌需要全量刷新，过期的删除记录可以清理
+    later = now + timedelta(days=31)
+    assert TaskService.get_changes(sample_user.id, token, now=later)['reset'] is True
+    assert TaskService.prune_tombstones(now=later) == 1
+
+    with pytest.raises(ValueError):
+        TaskService.get_changes(sample_user.id, 'invalid')
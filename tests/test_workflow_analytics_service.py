@@ -0,0 +1,69 @@
+from datetime import datetime, date
+from models import Task, TaskProgressHistory
+from services import WorkflowAnalyticsService
+
+
+def _add_history(test_db, task, operation_time, old_progress, new_progress):
+    test_db.session.add(TaskProgressHistory(
+        task_id=task.id,
+        operation_time=operation_time,
+        old_progress=old_progress,
+        new_progress=new_progress
+    ))
+
+
+def test_get_step_dwell_times(test_db, sample_user):
+    """测试按任务类型统计工作流步骤停留时间"""
+    completed = Task(title='已完成', task_type='临时报告', status='completed', start_date=date(2026, 1, 1),
+                     created_at=datetime(2026, 1, 1), completed_at=datetime(2026, 1, 8), user_id=sample_user.id)
+    open_task = Task(title='进行中', task_type='临时报告', status='in_progress', start_date=date(2026, 1, 1),
+                     created_at=datetime(2026, 1, 1), user_id=sample_user.id)
+    other = Task(title='其他用户', task_type='临时报告', status='in_progress', start_date=date(2026, 1, 1),
+                 created_at=datetime(2026, 1, 1), user_id=sample_user.id + 1)
+    test_db.session.add_all([completed, open_task, other])
+    test_db.session.commit()
+
+    _add_history(test_db, completed, datetime(2026, 1, 2), None, '需求确认')
+    _add_history(test_db, completed, datetime(2026, 1, 4), '需求确认', '资料收集')
+    # 仅状态变更的记录不影响步骤停留时间
+    test_db.session.add(TaskProgressHistory(task_id=completed.id, operation_time=datetime(2026, 1, 5),
+                                            old_status='in_progress', new_status='completed'))
+    _add_history(test_db, open_task, datetime(2026, 1, 1), None, '需求确认')
+    _add_history(test_db, open_task, datetime(2026, 1, 7), '需求确认', '资料收集')
+    _add_history(test_db, other, datetime(2026, 1, 1), None, '需求确认')
+    _add_history(test_db, other, datetime(2026, 1, 31), '需求确认', '资料收集')
+    test_db.session.commit()
+
+    result = WorkflowAnalyticsService.get_step_dwell_times(user_id=sample_user.id)
+    steps = result['task_types']['临时报告']
+
+    assert [step['step'] for step in steps] == ['需求确认', '资料收集']
+    assert steps[0] == {'step': '需求确认', 'count': 2, 'avg_days': 4.0, 'p50_days': 4.0, 'p90_days': 5.6}
+    # 未完成任务的当前步骤不计入
+    assert steps[1] == {'step': '资料收集', 'count': 1, 'avg_days': 4.0, 'p50_days': 4.0, 'p90_days': 4.0}
+
+
+def test_get_cumulative_flow(test_db, sample_user):
+    """测试按天重建各状态和各步骤的任务数"""
+    first = Task(title='任务一', task_type='临时报告', status='completed', progress='资料收集',
+                 start_date=date(2026, 1, 1), created_at=datetime(2026, 1, 1, 9),
+                 completed_at=datetime(2026, 1, 3, 15), user_id=sample_user.id)
+    second = Task(title='任务二', task_type='临时报告', status='in_progress', progress='需求确认',
+                  start_date=date(2026, 1, 2), created_at=datetime(2026, 1, 2, 9), user_id=sample_user.id)
+    test_db.session.add_all([first, second])
+    test_db.session.commit()
+
+    _add_history(test_db, first, datetime(2026, 1, 2, 10), '需求确认', '资料收集')
+    test_db.session.add(TaskProgressHistory(task_id=second.id, operation_time=datetime(2026, 1, 3, 10),
+                                            old_status='pending', new_status='in_progress'))
+    test_db.session.commit()
+
+    flow = WorkflowAnalyticsService.get_cumulative_flow(sample_user.id, date(2026, 1, 1), date(2026, 1, 4))
+
+    assert flow['labels'] == ['2026-01-01', '2026-01-02', '2026-01-03', '2026-01-04']
+    assert flow['status']['pending'] == [1, 2, 0, 0]
+    assert flow['status']['in_progress'] == [0, 0, 1, 1]
+    assert flow['status']['completed'] == [0, 0, 1, 1]
+    assert flow['progress']['需求确认'] == [1, 1, 1, 1]
+    assert flow['progress']['资料收集'] == [0, 1, 1, 1]
+    assert flow['throughput'] == [0, 0, 1, 0]